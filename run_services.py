@@ -8,14 +8,8 @@ import pydantic
 services = [
     ("services.equity_capture.main", 8001),
     ("services.forex_capture.main", 8002),
-    ("services.forex_systemA_capture.main", 8017),
-    ("services.forex_systemB_capture.main", 8018),
-    ("services.forex_FOentry_capture.main", 8019),
-    ("services.forex_BOentry_capture.main", 8020),
-    ("services.equity_systemA_capture.main", 8021),
-    ("services.equity_systemB_capture.main", 8022),
-    ("services.equity_FOentry_capture.main", 8027),
-    ("services.equity_BOentry_capture.main", 8023),
+    # Forex/equity System A/B and FO/BO entry capture, all served by one process
+    ("services.capture_host.main", 8017),
     ("services.equity_trade_validation.main", 8011),
     ("services.equity_termsheet_capture.main", 8013),
     ("services.forex_termsheet_capture.main", 8014),
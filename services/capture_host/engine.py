@@ -0,0 +1,43 @@
+import logging
+from fastapi import APIRouter, HTTPException, File, UploadFile
+from services.csv_ingest import CsvIngester
+from services.capture_host.sources import CAPTURE_SOURCES
+
+logger = logging.getLogger(__name__)
+
+# One ingester per source, shared by every router built for it
+_ingesters = {}
+
+def get_ingester(name):
+    if name not in _ingesters:
+        source = CAPTURE_SOURCES[name]
+        _ingesters[name] = CsvIngester(source['collection'], source['fields'], constants=source.get('constants'))
+    return _ingesters[name]
+
+def build_source_router(name):
+    """
+    Router with the CSV upload and health endpoints of one capture source.
+    Sources with extra endpoints add them to the returned router.
+    """
+    source = CAPTURE_SOURCES[name]
+    ingester = get_ingester(name)
+    router = APIRouter()
+
+    # Plain def: the ingest blocks on file and Firestore I/O, so FastAPI runs it in its threadpool
+    def upload_csv(file: UploadFile = File(...)):
+        try:
+            return ingester.ingest(file.file)
+        except Exception as e:
+            logger.error(f"{name} CSV upload failed: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def health_check():
+        """Health check endpoint"""
+        return {"status": "ok"}
+
+    upload_name = source['upload_path'].strip('/')
+    router.add_api_route(source['upload_path'], upload_csv, methods=["POST"], name=upload_name,
+                         operation_id=f"{name}_{upload_name}")
+    router.add_api_route("/health", health_check, methods=["GET"], name="health_check",
+                         operation_id=f"{name}_health_check")
+    return router
@@ -0,0 +1,43 @@
+import os
+import logging
+import importlib
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+import uvicorn
+import services.firebase_client  # noqa: F401  # pylint: disable=unused-import  # Ensure Firebase is initialized
+from services.capture_host.sources import CAPTURE_SOURCES
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CAPTURE_HOST_PORT = int(os.environ.get('CAPTURE_HOST_PORT', '8017'))
+# Comma separated subset of CAPTURE_SOURCES to serve; all of them by default
+CAPTURE_HOST_SOURCES = [name.strip() for name in os.environ.get('CAPTURE_HOST_SOURCES', '').split(',') if name.strip()] \
+    or list(CAPTURE_SOURCES)
+
+app = FastAPI(title="Capture Host", version="1.0.0")
+
+# Add CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+# Every source is served by this one process, sharing its Firestore client and repository caches
+for name in CAPTURE_HOST_SOURCES:
+    source = CAPTURE_SOURCES[name]
+    routes = importlib.import_module(source['routes'])
+    app.include_router(routes.router, prefix=source['prefix'])
+    logger.info(f"Serving {name} capture at {source['prefix']}")
+
+@app.get("/health")
+async def health_check():
+    """Health check endpoint"""
+    return {"status": "ok", "sources": CAPTURE_HOST_SOURCES}
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=CAPTURE_HOST_PORT)
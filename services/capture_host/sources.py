@@ -0,0 +1,76 @@
+from services.csv_ingest import FOREX_CSV_FIELDS, EQUITY_CSV_FIELDS, EQUITY_ENTRY_CSV_FIELDS
+
+# One entry per capture source served by the capture host. The prefix and
+# upload path are the ones each source had as its own service, so clients
+# only need to point at the host's port. 'routes' is the module whose router
+# serves the source; 'port' is the standalone port it used before.
+CAPTURE_SOURCES = {
+    'forex_systemA': {
+        'routes': 'services.forex_systemA_capture.api.routes',
+        'prefix': '/api/forex-systemA-capture',
+        'upload_path': '/upload_systemA_csv',
+        'collection': 'fx_systemA_capture',
+        'fields': FOREX_CSV_FIELDS,
+        'port': 8017,
+    },
+    'forex_systemB': {
+        'routes': 'services.forex_systemB_capture.api.routes',
+        'prefix': '/api/forex-systemB-capture',
+        'upload_path': '/upload_systemB_csv',
+        'collection': 'fx_systemB_capture',
+        'fields': FOREX_CSV_FIELDS,
+        'port': 8018,
+    },
+    'forex_FOentry': {
+        'routes': 'services.forex_FOentry_capture.api.routes',
+        'prefix': '/api/forex-FOentry-capture',
+        'upload_path': '/upload_FOentry_csv',
+        'collection': 'fx_FOentry_capture',
+        'fields': FOREX_CSV_FIELDS,
+        'port': 8019,
+    },
+    'forex_BOentry': {
+        'routes': 'services.forex_BOentry_capture.api.routes',
+        'prefix': '/api/forex-BOentry-capture',
+        'upload_path': '/upload_BOentry_csv',
+        'collection': 'fx_BOentry_capture',
+        'fields': FOREX_CSV_FIELDS,
+        'port': 8020,
+    },
+    'equity_systemA': {
+        'routes': 'services.equity_systemA_capture.api.routes',
+        'prefix': '/api/equity-systemA-capture',
+        'upload_path': '/upload_systemA_csv',
+        'collection': 'eq_systemA_capture',
+        'fields': EQUITY_CSV_FIELDS,
+        'constants': {'Source': 'SystemA'},
+        'port': 8021,
+    },
+    'equity_systemB': {
+        'routes': 'services.equity_systemB_capture.api.routes',
+        'prefix': '/api/equity-systemB-capture',
+        'upload_path': '/upload_systemB_csv',
+        'collection': 'eq_systemB_capture',
+        'fields': EQUITY_CSV_FIELDS,
+        'constants': {'Source': 'SystemB'},
+        'port': 8022,
+    },
+    'equity_FOentry': {
+        'routes': 'services.equity_FOentry_capture.api.routes',
+        'prefix': '/api/equity-FOentry-capture',
+        'upload_path': '/upload_FOentry_csv',
+        'collection': 'eq_FOentry_capture',
+        'fields': EQUITY_ENTRY_CSV_FIELDS,
+        'constants': {'Source': 'FrontOffice'},
+        'port': 8027,
+    },
+    'equity_BOentry': {
+        'routes': 'services.equity_BOentry_capture.api.routes',
+        'prefix': '/api/equity-BOentry-capture',
+        'upload_path': '/upload_BOentry_csv',
+        'collection': 'eq_BOentry_capture',
+        'fields': EQUITY_ENTRY_CSV_FIELDS,
+        'constants': {'Source': 'BackOffice'},
+        'port': 8023,
+    },
+}
@@ -0,0 +1,144 @@
+import io
+import os
+import csv
+import logging
+from services.firebase_client import get_firestore_client
+from services.firestore_batch import BatchWriter
+
+logger = logging.getLogger(__name__)
+
+# Rows queued before a flush, so an upload of any size holds a bounded number of writes
+INGEST_FLUSH_ROWS = int(os.environ.get('CSV_INGEST_FLUSH_ROWS', '2000'))
+# Stored rows echoed back in the response; the count always covers the whole file
+INGEST_PREVIEW_ROWS = int(os.environ.get('CSV_INGEST_PREVIEW_ROWS', '100'))
+# Row errors reported in full; later ones are only counted
+INGEST_MAX_ERRORS = int(os.environ.get('CSV_INGEST_MAX_ERRORS', '1000'))
+
+# Output field and the CSV columns it may come from, in order of preference
+FOREX_CSV_FIELDS = [
+    ('Trade ID', ('Trade ID', 'TradeID')),
+    ('Instrument', ('Instrument', 'CurrencyPair')),
+    ('FX Rate', ('FX Rate', 'FXRate', 'FxRate', 'Rate')),  # Keep original name
+    ('Notional Amount', ('Notional Amount', 'NotionalAmount', 'NotionalA')),  # Keep original name
+    ('Buy/Sell', ('Buy/Sell', 'BuySell')),
+    ('Settlement Date', ('Settlement Date', 'ValueDate', 'SettlementDate')),
+    ('Counterparty', ('Counterparty',)),
+    ('Product Type', ('Product Type', 'ProductType')),
+]
+
+EQUITY_CSV_FIELDS = [
+    ('Trade ID', ('Trade ID', 'TradeID')),
+    ('Trade Type', ('Trade Type', 'TradeType', 'Buy/Sell', 'BuySell')),
+    ('Quantity', ('Quantity',)),
+    ('Symbol', ('Symbol',)),
+    ('Price', ('Price',)),
+    ('Trade Value', ('Trade Value', 'TradeValue')),
+]
+
+EQUITY_ENTRY_CSV_FIELDS = EQUITY_CSV_FIELDS + [
+    ('Settlement Date', ('Settlement Date', 'SettlementDate')),
+]
+
+def normalize_column(name):
+    """Column names match ignoring surrounding spaces, inner spaces, underscores and case"""
+    return name.strip().replace(' ', '').replace('_', '').lower()
+
+def resolve_columns(header, fields):
+    """Index of the CSV column feeding each field (None when the file has none of its candidates)"""
+    positions = {}
+    for index, name in enumerate(header):
+        # A repeated column name keeps its last occurrence
+        positions[normalize_column(name)] = index
+    resolved = []
+    for field, candidates in fields:
+        index = next((positions[key] for key in map(normalize_column, candidates) if key in positions), None)
+        resolved.append((field, index))
+    return resolved
+
+class CsvIngester:
+    """
+    Streams an uploaded CSV into one Firestore collection.
+
+    The header is resolved to column positions once, rows are parsed one at a
+    time straight from the upload's spooled file and their documents committed
+    through BatchWriter every INGEST_FLUSH_ROWS rows, so memory stays constant
+    whatever the file size. Documents are keyed by Trade ID (auto ID when
+    blank). Malformed rows and failed writes are reported per row and do not
+    stop the rest of the file.
+    """
+
+    def __init__(self, collection, fields, constants=None, firestore_db=None):
+        self.collection = collection
+        self.fields = fields
+        self.constants = constants or {}
+        self._db = firestore_db
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = get_firestore_client()
+        return self._db
+
+    def ingest(self, fileobj):
+        """
+        Store every row of a binary CSV file object.
+        Returns {"count", "stored", "errors", "error_count"}: count is the rows written and
+        stored a preview of the first rows parsed.
+        """
+        text = io.TextIOWrapper(fileobj, encoding='utf-8', newline='')
+        try:
+            return self._ingest(csv.reader(text))
+        finally:
+            # Leave the upload's own file open for the framework to close
+            text.detach()
+
+    def _ingest(self, reader):
+        writer = BatchWriter(self.db)
+        header = next(reader, None)
+        if header is None:
+            return {"count": 0, "stored": [], "errors": [], "error_count": 0}
+        resolved = resolve_columns(header, self.fields)
+        width = len(header)
+        preview = []
+        errors = []
+        error_count = 0
+        queued = 0
+
+        def report(new_errors):
+            nonlocal error_count
+            error_count += len(new_errors)
+            errors.extend(new_errors[:max(0, INGEST_MAX_ERRORS - len(errors))])
+
+        for row_number, values in enumerate(reader, start=1):
+            if not values:
+                continue
+            if len(values) > width:
+                report([{"row": row_number, "error": f"Expected {width} columns, found {len(values)}"}])
+                continue
+            data = {field: values[index].strip() if index is not None and index < len(values) else ''
+                    for field, index in resolved}
+            data.update(self.constants)
+            doc_id = data.get('Trade ID') or None
+            if doc_id and '/' in doc_id:
+                report([{"row": row_number, "TradeID": doc_id, "error": "Trade ID may not contain '/'"}])
+                continue
+            writer.set(self.collection, doc_id, data, ref=row_number)
+            queued += 1
+            if len(preview) < INGEST_PREVIEW_ROWS:
+                preview.append(data)
+            if writer.pending_count() >= INGEST_FLUSH_ROWS:
+                report(self._row_errors(writer.flush()))
+        report(self._row_errors(writer.flush()))
+
+        logger.info(f"Ingested {writer.written} of {queued} rows into {self.collection}; {error_count} row errors")
+        return {
+            "count": writer.written,
+            "stored": preview,
+            "errors": errors,
+            "error_count": error_count,
+        }
+
+    @staticmethod
+    def _row_errors(write_errors):
+        return [{"row": error["ref"], "TradeID": error["doc_id"], "error": error["error"]}
+                for error in write_errors]
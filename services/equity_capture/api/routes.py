@@ -1,10 +1,12 @@
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException
 from shared.models import Trade
 from services.equity_capture.services.capture_service import trade_capture_service
 import json
 import os
 from services.equity_capture.db.trade_repository import trade_repository
+from services.forex_capture.services.client_directory import client_directory
+from services.firestore_paging import parse_fields
 
 router = APIRouter()
 
@@ -29,8 +31,17 @@ async def bulk_capture_trades(trades: List[Trade]):
     return results
 
 @router.get("/trades")
-def get_trades():
-    return [t.dict() for t in trade_repository.load_trades()]
+def get_trades(page_size: Optional[int] = None, after: Optional[str] = None,
+               fields: Optional[str] = None, raw: bool = False):
+    """
+    Trades in trade ID order. page_size returns one page as {"items", "next_after"};
+    fields (comma separated) or raw return the stored documents without validation.
+    """
+    trades, next_after = trade_repository.list_trades(page_size=page_size, after=after,
+                                                      fields=parse_fields(fields), raw=raw)
+    if page_size:
+        return {"items": trades, "next_after": next_after}
+    return trades
 
 @router.get("/trades/{trade_id}", response_model=Trade)
 async def get_trade(trade_id: str):
@@ -123,21 +134,8 @@ async def debug_collections():
 async def get_client_ids():
     """Get list of unique client IDs from unified_data collection with ClientID_Forex field"""
     try:
-        db = trade_repository.db
-        
-        # Get client IDs specifically from unified_data collection
-        unified_collection = db.collection("unified_data")
-        docs = list(unified_collection.stream())
-        print(f"[DEBUG] Found {len(docs)} documents in unified_data collection")
-        
-        client_ids = []
-        for doc in docs:
-            doc_data = doc.to_dict()
-            # Get ClientID_Forex field specifically
-            client_id = doc_data.get('ClientID_Forex')
-            if client_id and client_id not in client_ids:
-                client_ids.append(client_id)
-        
+        # Served from the in-process client directory; Firestore is only read when it expires
+        client_ids = client_directory.client_ids()
         print(f"[DEBUG] Found {len(client_ids)} unique ClientID_Forex values: {client_ids}")
         return {"client_ids": client_ids}
     except Exception as e:
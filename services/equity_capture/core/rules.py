@@ -1,5 +1,7 @@
 import json
 import os
+from shared.models import Trade
+from services.schema_compiler import compile_schema
 
 RULES_PATH = os.path.join(os.path.dirname(__file__), "trade_rules.json")
 
@@ -51,4 +53,6 @@ trade_schema = {
     "CollateralRequired": float,
     "MarginType": str,
     "MarginStatus": str
-} 
\ No newline at end of file
+}
+
+trade_row_schema = compile_schema(trade_schema, model=Trade, rules=trade_rules)
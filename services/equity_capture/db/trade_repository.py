@@ -5,6 +5,8 @@ from shared.models import Trade
 from typing import List, Optional
 import os
 from services.firebase_client import get_firestore_client
+from services.firestore_paging import page_documents
+from services.equity_capture.core.rules import trade_row_schema
 
 TRADES_FILE = os.path.join(os.path.dirname(__file__), 'trades.json')
 
@@ -12,22 +14,45 @@ class TradeRepository:
     def __init__(self, file_path=TRADES_FILE):
         self.file_path = file_path
         self.db = get_firestore_client()
+        self.collection_name = "trades"
 
     def save_trade(self, trade: Trade):
-        self.db.collection("trades").document(trade.trade_id).set(trade.dict(by_alias=True))
+        self.db.collection(self.collection_name).document(trade.trade_id).set(trade.dict(by_alias=True))
 
     def load_trades(self) -> List[Trade]:
-        docs = self.db.collection("trades").stream()
+        docs = self.db.collection(self.collection_name).stream()
         return [Trade.parse_obj(doc.to_dict()) for doc in docs]
 
+    def list_trades(self, page_size: int = None, after: str = None, fields: List[str] = None, raw: bool = False):
+        """
+        trades documents for the listing endpoint, in trade ID order.
+
+        By default each document comes back as Trade.dict() would give it, built
+        straight from the stored values; only documents the compiled schema cannot
+        settle go through Trade.parse_obj. raw (or a fields projection) returns the
+        stored documents as they are.
+
+        Returns:
+            (documents, trade ID to pass as after for the next page or None)
+        """
+        docs, next_after = page_documents(self.db.collection(self.collection_name),
+                                          page_size=page_size, after=after, fields=fields)
+        if raw or fields:
+            return [data for _, data in docs], next_after
+        trades = []
+        for _, data in docs:
+            coerced = trade_row_schema.coerce_row(data)
+            trades.append(coerced[0] if coerced is not None else Trade.parse_obj(data).dict())
+        return trades, next_after
+
     def get_trade(self, trade_id: str) -> Optional[Trade]:
-        doc = self.db.collection("trades").document(trade_id).get()
+        doc = self.db.collection(self.collection_name).document(trade_id).get()
         if doc.exists:
             return Trade.parse_obj(doc.to_dict())
         return None
 
     def _load_trades_raw(self) -> List[dict]:
-        docs = self.db.collection("trades").stream()
+        docs = self.db.collection(self.collection_name).stream()
         return [doc.to_dict() for doc in docs]
 
 trade_repository = TradeRepository() 
\ No newline at end of file
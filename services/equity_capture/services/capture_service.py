@@ -1,19 +1,14 @@
 from shared.models import Trade
 from typing import List, Optional
 from services.equity_capture.db.trade_repository import trade_repository
-from services.equity_capture.core.rules import trade_rules
+from services.equity_capture.core.rules import trade_rules, trade_row_schema
 
 class TradeCaptureService:
     def add_trade(self, trade: Trade) -> Trade:
-        # Rule: Quantity min
-        if trade.quantity < trade_rules["quantity"]["min"]:
-            raise ValueError(f"Quantity must be at least {trade_rules['quantity']['min']}")
-        # Rule: Price min
-        if trade.price < trade_rules["price"]["min"]:
-            raise ValueError(f"Price must be at least {trade_rules['price']['min']}")
-        # Rule: Allowed trade types
-        if trade.trade_type not in trade_rules["trade_type"]["allowed"]:
-            raise ValueError(f"TradeType must be one of {trade_rules['trade_type']['allowed']}")
+        # Rules: Quantity/Price minimums and allowed trade types, checked in trade_rules.json order
+        broken = trade_row_schema.check_rules(trade.dict())
+        if broken:
+            raise ValueError(broken[0])
         # Rule: Unique TradeID
         if trade_rules.get("unique_trade_id") and self.get_trade(trade.trade_id):
             raise ValueError(f"TradeID '{trade.trade_id}' already exists")
@@ -1,18 +1,18 @@
 from typing import List
-from fastapi import APIRouter, HTTPException, File, UploadFile, Form
+from fastapi import HTTPException
 from services.forex_capture.models import Forex
 from services.forex_capture.services.capture_service import forex_capture_service
 import json
 import os
 from services.forex_capture.db.forex_repository import forex_repository
-import csv
-from services.firebase_client import get_firestore_client
+from services.capture_host.engine import build_source_router
 
 REQUIRED_COLUMNS = [
     'Trade ID', 'Instrument', 'CurrencyPair', 'Quantity', 'Price', 'Buy/Sell', 'Settlement Date', 'Counterparty', 'Product Type'
 ]
 
-router = APIRouter()
+# Upload and health endpoints come from the shared capture engine
+router = build_source_router('equity_systemA')
 
 @router.post("/forex", response_model=Forex)
 async def add_forex(forex: Forex):
@@ -52,42 +52,3 @@ async def get_forex(TradeID: str):
     if forex:
         return forex
     raise HTTPException(status_code=404, detail="Forex not found")
-
-@router.post("/upload_systemA_csv")
-async def upload_systemA_csv(file: UploadFile = File(...)):
-    db = get_firestore_client()
-    content = await file.read()
-    decoded = content.decode('utf-8').splitlines()
-    reader = csv.DictReader(decoded)
-    results = []
-    for row in reader:
-        # Normalize keys: strip spaces, lower-case, remove underscores
-        norm_row = {k.strip().replace(' ', '').replace('_', '').lower(): v.strip() for k, v in row.items()}
-        # Helper to get value by possible keys
-        def get_val(*keys):
-            for key in keys:
-                k = key.strip().replace(' ', '').replace('_', '').lower()
-                if k in norm_row:
-                    return norm_row[k]
-            return ''
-        data = {
-            'Trade ID': get_val('Trade ID', 'TradeID'),
-            'Trade Type': get_val('Trade Type', 'TradeType', 'Buy/Sell', 'BuySell'),
-            'Quantity': get_val('Quantity'),
-            'Symbol': get_val('Symbol'),
-            'Price': get_val('Price'),
-            'Trade Value': get_val('Trade Value', 'TradeValue'),
-            'Source': 'SystemA'
-        }
-        doc_id = data['Trade ID'] or None
-        if doc_id:
-            db.collection('eq_systemA_capture').document(doc_id).set(data)
-        else:
-            db.collection('eq_systemA_capture').add(data)
-        results.append(data)
-    return {"count": len(results), "stored": results}
-
-@router.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "ok"}
\ No newline at end of file
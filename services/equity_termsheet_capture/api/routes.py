@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, Body
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from services.equity_termsheet_capture.services.capture_service import equity_termsheet_capture_service
+from services.firestore_paging import parse_fields
 
 router = APIRouter()
 
@@ -20,10 +21,14 @@ async def capture_single_termsheet(termsheet: Dict[str, Any] = Body(...)):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/equity-termsheets", response_model=List[Dict[str, Any]])
-async def list_termsheets():
-    """List all termsheets from Firebase"""
-    return equity_termsheet_capture_service.list_termsheets()
+@router.get("/equity-termsheets")
+async def list_termsheets(page_size: Optional[int] = None, after: Optional[str] = None, fields: Optional[str] = None):
+    """List termsheets from Firebase in Trade ID order; page_size returns one page as {"items", "next_after"}"""
+    termsheets, next_after = equity_termsheet_capture_service.page_termsheets(
+        page_size=page_size, after=after, fields=parse_fields(fields))
+    if page_size:
+        return {"items": termsheets, "next_after": next_after}
+    return termsheets
 
 @router.get("/equity-termsheets/{tradeId}", response_model=Dict[str, Any])
 async def get_termsheet_by_id(tradeId: str):
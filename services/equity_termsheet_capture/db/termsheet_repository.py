@@ -1,6 +1,7 @@
 import json
 import os
 from services.firebase_client import get_firestore_client
+from services.firestore_paging import page_documents
 
 COLLECTION_NAME = "eq_termsheets"
 
@@ -35,6 +36,25 @@ def load_termsheets():
         print(f"Error loading termsheets from Firebase: {e}")
         return []
 
+def page_termsheets(page_size=None, after=None, fields=None):
+    """
+    Termsheets in document ID (Trade ID) order, each with its 'id' like load_termsheets().
+
+    Returns (termsheets, document ID to pass as after for the next page or None)
+    """
+    try:
+        db = get_firestore_client()
+        docs, next_after = page_documents(db.collection(COLLECTION_NAME),
+                                          page_size=page_size, after=after, fields=fields)
+        termsheets = []
+        for doc_id, termsheet_data in docs:
+            termsheet_data['id'] = doc_id  # Add document ID for reference
+            termsheets.append(termsheet_data)
+        return termsheets, next_after
+    except Exception as e:
+        print(f"Error loading termsheets from Firebase: {e}")
+        return [], None
+
 def save_termsheets(termsheets):
     """Save termsheets to Firebase collection using Trade ID as document name"""
     try:
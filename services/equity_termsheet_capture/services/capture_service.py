@@ -1,4 +1,4 @@
-from services.equity_termsheet_capture.db.termsheet_repository import load_termsheets, save_termsheets, add_termsheet, get_termsheet_by_trade_id
+from services.equity_termsheet_capture.db.termsheet_repository import load_termsheets, page_termsheets, save_termsheets, add_termsheet, get_termsheet_by_trade_id
 import json
 import os
 from datetime import datetime
@@ -168,6 +168,10 @@ class EquityTermsheetCaptureService:
         """List all termsheets from Firebase"""
         return load_termsheets()
 
+    def page_termsheets(self, page_size=None, after=None, fields=None):
+        """One page of termsheets from Firebase, with the ID that starts the next one"""
+        return page_termsheets(page_size=page_size, after=after, fields=fields)
+
     def get_termsheet_by_trade_id(self, trade_id):
         """Get a specific termsheet by Trade ID from Firebase"""
         return get_termsheet_by_trade_id(trade_id)
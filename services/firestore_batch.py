@@ -0,0 +1,137 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Firestore rejects batches with more than 500 writes
+MAX_BATCH_SIZE = 500
+
+class BatchWriter:
+    """
+    Collects Firestore set() writes per collection and commits them as
+    WriteBatches, flushing several batches concurrently.
+
+    Each write carries a caller supplied ref (e.g. a row number or TradeID).
+    A batch is atomic, so when a commit fails its writes are retried one by
+    one and only the writes that still fail are reported, keyed by ref.
+    Writes queued together with set_group() always share a batch, including
+    on retry, so they are stored all or nothing.
+
+    As with one set() after another, the last write to a document wins: a
+    plain set() replaces any write already queued for the same document, and
+    when merge or grouped writes share a document the batches of that flush
+    are committed in order instead of concurrently.
+    """
+
+    def __init__(self, db, batch_size=400, max_workers=4):
+        self.db = db
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        self.max_workers = max(1, max_workers)
+        # key -> {slot: (ref, [(collection, doc_id, data, merge), ...], superseded writes)}
+        self._pending = {}
+        self._documents = set()
+        self._ordered = False
+        self.written = 0
+        self.batches_committed = 0
+
+    def _note(self, collection, doc_id):
+        document = (collection, str(doc_id)) if doc_id else None
+        if document is not None:
+            if document in self._documents:
+                self._ordered = True
+            self._documents.add(document)
+        return document
+
+    def set(self, collection, doc_id, data, ref=None, merge=False):
+        units = self._pending.setdefault(collection, {})
+        document = (collection, str(doc_id)) if doc_id else None
+        superseded = 0
+        if document is not None and not merge:
+            # A plain set() overwrites the whole document, so an earlier one queued for it never needs committing
+            previous = units.pop(document, None)
+            if previous is not None:
+                superseded = len(previous[1]) + previous[2]
+                self._documents.discard(document)
+            slot = document
+        else:
+            slot = object()
+        self._note(collection, doc_id)
+        units[slot] = (ref, [(collection, doc_id, data, merge)], superseded)
+
+    def set_group(self, writes, ref=None):
+        """Queue (collection, doc_id, data[, merge]) writes that must be committed together"""
+        writes = [(collection, doc_id, data, rest[0] if rest else False) for collection, doc_id, data, *rest in writes]
+        if len(writes) > self.batch_size:
+            raise ValueError(f"A write group may hold at most {self.batch_size} writes")
+        for collection, doc_id, _data, _merge in writes:
+            self._note(collection, doc_id)
+        key = '+'.join(dict.fromkeys(write[0] for write in writes))
+        self._pending.setdefault(key, {})[object()] = (ref, writes, 0)
+
+    def pending_count(self):
+        return sum(len(unit[1]) for units in self._pending.values() for unit in units.values())
+
+    def _chunks(self):
+        for key, units in self._pending.items():
+            chunk = []
+            size = 0
+            for unit in units.values():
+                if chunk and size + len(unit[1]) > self.batch_size:
+                    yield key, chunk
+                    chunk = []
+                    size = 0
+                chunk.append(unit)
+                size += len(unit[1])
+            if chunk:
+                yield key, chunk
+
+    def _document(self, collection, doc_id):
+        col_ref = self.db.collection(collection)
+        return col_ref.document(str(doc_id)) if doc_id else col_ref.document()
+
+    def _commit(self, writes):
+        batch = self.db.batch()
+        for collection, doc_id, data, merge in writes:
+            batch.set(self._document(collection, doc_id), data, merge=merge)
+        batch.commit()
+
+    def _commit_chunk(self, key, units):
+        try:
+            self._commit([write for _ref, writes, _superseded in units for write in writes])
+            return sum(len(writes) + superseded for _ref, writes, superseded in units), 1, []
+        except Exception as e:
+            logger.warning(f"Batch commit to {key} failed ({e}); retrying {len(units)} writes individually")
+        written = 0
+        errors = []
+        for ref, writes, superseded in units:
+            collection, doc_id, data, merge = writes[0]
+            try:
+                if len(writes) == 1:
+                    self._document(collection, doc_id).set(data, merge=merge)
+                else:
+                    self._commit(writes)
+                written += len(writes) + superseded
+            except Exception as e:
+                errors.append({"ref": ref, "collection": collection, "doc_id": doc_id, "error": str(e)})
+        return written, 0, errors
+
+    def flush(self):
+        """Commit everything queued so far and return the per-write errors"""
+        chunks = list(self._chunks())
+        ordered = self._ordered
+        self._pending = {}
+        self._documents = set()
+        self._ordered = False
+        if not chunks:
+            return []
+        errors = []
+        if len(chunks) == 1 or self.max_workers == 1 or ordered:
+            results = [self._commit_chunk(key, units) for key, units in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks))) as pool:
+                results = list(pool.map(lambda chunk: self._commit_chunk(*chunk), chunks))
+        for written, committed, chunk_errors in results:
+            self.written += written
+            self.batches_committed += committed
+            errors.extend(chunk_errors)
+        return errors
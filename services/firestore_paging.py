@@ -0,0 +1,45 @@
+import os
+import re
+
+# Largest page a client may ask for
+MAX_PAGE_SIZE = int(os.environ.get('FIRESTORE_MAX_PAGE_SIZE', '1000'))
+
+# Firestore's name for the document ID in order_by() and cursors
+DOCUMENT_ID = '__name__'
+
+_SIMPLE_FIELD = re.compile(r'^[A-Za-z_][A-Za-z_0-9]*$')
+
+def field_path(name):
+    """Quote a field name for Firestore when it is not a plain identifier (e.g. 'Counterparty ID')"""
+    if _SIMPLE_FIELD.match(name):
+        return name
+    return '`' + name.replace('\\', '\\\\').replace('`', '\\`') + '`'
+
+def parse_fields(fields):
+    """'TradeID, CurrencyPair' -> ['TradeID', 'CurrencyPair']; None when no projection was asked for"""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    return list(dict.fromkeys(names)) or None
+
+def page_documents(collection, page_size=None, after=None, fields=None):
+    """
+    Documents of a collection in document ID order, as (id, data) pairs.
+
+    With page_size, one page is read (one extra document tells whether another
+    page follows) and next_after is the ID to pass as after for the next page,
+    or None on the last one. fields projects the documents server side.
+
+    Returns (documents, next_after).
+    """
+    query = collection.order_by(DOCUMENT_ID)
+    if fields:
+        query = query.select([field_path(name) for name in fields])
+    if after:
+        query = query.start_after({DOCUMENT_ID: collection.document(after)})
+    if not page_size:
+        return [(doc.id, doc.to_dict()) for doc in query.stream()], None
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    docs = list(query.limit(page_size + 1).stream())
+    next_after = docs[page_size - 1].id if len(docs) > page_size else None
+    return [(doc.id, doc.to_dict()) for doc in docs[:page_size]], next_after
@@ -1,4 +1,5 @@
-from typing import List
+from typing import List, Optional
+from functools import lru_cache
 from fastapi import APIRouter, HTTPException, Request
 from services.forex_capture.models import Forex
 from services.forex_capture.services.capture_service import forex_capture_service
@@ -6,6 +7,8 @@ from services.forex_capture.services.unified_data_service import UnifiedDataServ
 import json
 import os
 from services.forex_capture.db.forex_repository import forex_repository
+from services.forex_capture.core.rules import forex_row_schema
+from services.firestore_paging import parse_fields
 try:
     from services.firebase_client import get_firestore_client
     FIREBASE_AVAILABLE = True
@@ -16,203 +19,204 @@ except ImportError:
 router = APIRouter()
 unified_data_service = UnifiedDataService()
 
-def normalize_csv_data(data: dict) -> dict:
-    """
-    Normalize CSV data to handle spacing and minor variations in column names.
-    This ensures robust mapping from CSV to the Forex model.
-    """
-    normalized = {}
+# Mapping from common variations of CSV column names to exact model aliases.
+# Source columns are matched after stripping spaces and lowercasing.
+COLUMN_MAPPING = {
+    # TradeID variations (CRITICAL - must be first)
+    "tradeid": "TradeID",
+    "trade id": "TradeID", 
+    "trade_id": "TradeID",
+    "Trade ID": "TradeID",
+    "TRADEID": "TradeID",
+    "TRADE_ID": "TradeID",
     
-    # Add debugging to see what columns we're receiving
-    print(f"[DEBUG] Received CSV columns: {list(data.keys())}")
+    # Handle common spacing variations
+    "counterparty_id": "Counterparty ID",
+    "counterparty id": "Counterparty ID",
+    "CounterpartyID": "Counterparty ID",
+    "custodian_name": "Custodian_Name",
+    "custodian name": "Custodian_Name",
+    "CustodianName": "Custodian_Name",
+    "exception_type": "Exception Type",
+    "exception type": "Exception Type",
+    "ExceptionType": "Exception Type",
+    "exception_description": "Exception Description",
+    "exception description": "Exception Description",
+    "ExceptionDescription": "Exception Description",
+    "exception_resolution": "Exception Resolution",
+    "exception resolution": "Exception Resolution",
+    "ExceptionResolution": "Exception Resolution",
+    "reporting_regulation": "Reporting Regulation",
+    "reporting regulation": "Reporting Regulation",
+    "ReportingRegulation": "Reporting Regulation",
+    "exception_reason": "Exception Reason",
+    "exception reason": "Exception Reason",
+    "ExceptionReason": "Exception Reason",
+    "reporting_resolution": "Reporting Resolution",
+    "reporting resolution": "Reporting Resolution",
+    "ReportingResolution": "Reporting Resolution",
+    "trading_venue": "Trading Venue",
+    "trading venue": "Trading Venue",
+    "TradingVenue": "Trading Venue",
+    "country_of_trade": "Country_of_Trade",
+    "country of trade": "Country_of_Trade",
+    "CountryOfTrade": "Country_of_Trade",
+    "instrument_status": "Instrument_Status",
+    "instrument status": "Instrument_Status",
+    "InstrumentStatus": "Instrument_Status",
+    "clientid_equity": "ClientID_Equity",
+    "client id equity": "ClientID_Equity",
+    "ClientIDEquity": "ClientID_Equity",
+    "kyc_status_equity": "KYC_Status_Equity",
+    "kyc status equity": "KYC_Status_Equity",
+    "KYCStatusEquity": "KYC_Status_Equity",
+    "reference_data_validated": "Reference_Data_Validated",
+    "reference data validated": "Reference_Data_Validated",
+    "ReferenceDataValidated": "Reference_Data_Validated",
+    "margin_type": "Margin_Type",
+    "margin type": "Margin_Type",
+    "MarginType": "Margin_Type",
+    "margin_status": "Margin_Status",
+    "margin status": "Margin_Status",
+    "MarginStatus": "Margin_Status",
+    "client_approval_status_equity": "Client_Approval_Status_Equity",
+    "client approval status equity": "Client_Approval_Status_Equity",
+    "ClientApprovalStatusEquity": "Client_Approval_Status_Equity",
+    "clientid_forex": "ClientID_Forex",
+    "client id forex": "ClientID_Forex",
+    "ClientIDForex": "ClientID_Forex",
+    "kyc_status_forex": "KYC_Status_Forex",
+    "kyc status forex": "KYC_Status_Forex",
+    "KYCStatusForex": "KYC_Status_Forex",
+    "expense_approval_status": "Expense_Approval_Status",
+    "expense approval status": "Expense_Approval_Status",
+    "ExpenseApprovalStatus": "Expense_Approval_Status",
+    "client_approval_status_forex": "Client Approval Status(forex)",
+    "client approval status forex": "Client Approval Status(forex)",
+    "ClientApprovalStatusForex": "Client Approval Status(forex)",
+    "custodian_ac_no": "Custodian_Ac_no",
+    "custodian ac no": "Custodian_Ac_no",
+    "CustodianAcNo": "Custodian_Ac_no",
+    "beneficiary_client_id": "Beneficiary_Client_ID",
+    "beneficiary client id": "Beneficiary_Client_ID",
+    "BeneficiaryClientID": "Beneficiary_Client_ID",
+    "settlement_cycle": "Settlement_Cycle",
+    "settlement cycle": "Settlement_Cycle",
+    "SettlementCycle": "Settlement_Cycle",
+    "effectivedate_equity": "EffectiveDate_Equity",
+    "effective date equity": "EffectiveDate_Equity",
+    "EffectiveDateEquity": "EffectiveDate_Equity",
+    "confirmationstatus_equity": "ConfirmationStatus_Equity",
+    "confirmation status equity": "ConfirmationStatus_Equity",
+    "ConfirmationStatusEquity": "ConfirmationStatus_Equity",
+    "swift_equity": "SWIFT_Equity",
+    "swift equity": "SWIFT_Equity",
+    "SwiftEquity": "SWIFT_Equity",
+    "beneficiaryname_equity": "BeneficiaryName_Equity",
+    "beneficiary name equity": "BeneficiaryName_Equity",
+    "BeneficiaryNameEquity": "BeneficiaryName_Equity",
     
-    # Define mapping from common variations to exact model aliases
-    column_mapping = {
-        # TradeID variations (CRITICAL - must be first)
-        "tradeid": "TradeID",
-        "trade id": "TradeID", 
-        "trade_id": "TradeID",
-        "Trade ID": "TradeID",
-        "TRADEID": "TradeID",
-        "TRADE_ID": "TradeID",
-        
-        # Handle common spacing variations
-        "counterparty_id": "Counterparty ID",
-        "counterparty id": "Counterparty ID",
-        "CounterpartyID": "Counterparty ID",
-        "custodian_name": "Custodian_Name",
-        "custodian name": "Custodian_Name",
-        "CustodianName": "Custodian_Name",
-        "exception_type": "Exception Type",
-        "exception type": "Exception Type",
-        "ExceptionType": "Exception Type",
-        "exception_description": "Exception Description",
-        "exception description": "Exception Description",
-        "ExceptionDescription": "Exception Description",
-        "exception_resolution": "Exception Resolution",
-        "exception resolution": "Exception Resolution",
-        "ExceptionResolution": "Exception Resolution",
-        "reporting_regulation": "Reporting Regulation",
-        "reporting regulation": "Reporting Regulation",
-        "ReportingRegulation": "Reporting Regulation",
-        "exception_reason": "Exception Reason",
-        "exception reason": "Exception Reason",
-        "ExceptionReason": "Exception Reason",
-        "reporting_resolution": "Reporting Resolution",
-        "reporting resolution": "Reporting Resolution",
-        "ReportingResolution": "Reporting Resolution",
-        "trading_venue": "Trading Venue",
-        "trading venue": "Trading Venue",
-        "TradingVenue": "Trading Venue",
-        "country_of_trade": "Country_of_Trade",
-        "country of trade": "Country_of_Trade",
-        "CountryOfTrade": "Country_of_Trade",
-        "instrument_status": "Instrument_Status",
-        "instrument status": "Instrument_Status",
-        "InstrumentStatus": "Instrument_Status",
-        "clientid_equity": "ClientID_Equity",
-        "client id equity": "ClientID_Equity",
-        "ClientIDEquity": "ClientID_Equity",
-        "kyc_status_equity": "KYC_Status_Equity",
-        "kyc status equity": "KYC_Status_Equity",
-        "KYCStatusEquity": "KYC_Status_Equity",
-        "reference_data_validated": "Reference_Data_Validated",
-        "reference data validated": "Reference_Data_Validated",
-        "ReferenceDataValidated": "Reference_Data_Validated",
-        "margin_type": "Margin_Type",
-        "margin type": "Margin_Type",
-        "MarginType": "Margin_Type",
-        "margin_status": "Margin_Status",
-        "margin status": "Margin_Status",
-        "MarginStatus": "Margin_Status",
-        "client_approval_status_equity": "Client_Approval_Status_Equity",
-        "client approval status equity": "Client_Approval_Status_Equity",
-        "ClientApprovalStatusEquity": "Client_Approval_Status_Equity",
-        "clientid_forex": "ClientID_Forex",
-        "client id forex": "ClientID_Forex",
-        "ClientIDForex": "ClientID_Forex",
-        "kyc_status_forex": "KYC_Status_Forex",
-        "kyc status forex": "KYC_Status_Forex",
-        "KYCStatusForex": "KYC_Status_Forex",
-        "expense_approval_status": "Expense_Approval_Status",
-        "expense approval status": "Expense_Approval_Status",
-        "ExpenseApprovalStatus": "Expense_Approval_Status",
-        "client_approval_status_forex": "Client Approval Status(forex)",
-        "client approval status forex": "Client Approval Status(forex)",
-        "ClientApprovalStatusForex": "Client Approval Status(forex)",
-        "custodian_ac_no": "Custodian_Ac_no",
-        "custodian ac no": "Custodian_Ac_no",
-        "CustodianAcNo": "Custodian_Ac_no",
-        "beneficiary_client_id": "Beneficiary_Client_ID",
-        "beneficiary client id": "Beneficiary_Client_ID",
-        "BeneficiaryClientID": "Beneficiary_Client_ID",
-        "settlement_cycle": "Settlement_Cycle",
-        "settlement cycle": "Settlement_Cycle",
-        "SettlementCycle": "Settlement_Cycle",
-        "effectivedate_equity": "EffectiveDate_Equity",
-        "effective date equity": "EffectiveDate_Equity",
-        "EffectiveDateEquity": "EffectiveDate_Equity",
-        "confirmationstatus_equity": "ConfirmationStatus_Equity",
-        "confirmation status equity": "ConfirmationStatus_Equity",
-        "ConfirmationStatusEquity": "ConfirmationStatus_Equity",
-        "swift_equity": "SWIFT_Equity",
-        "swift equity": "SWIFT_Equity",
-        "SwiftEquity": "SWIFT_Equity",
-        "beneficiaryname_equity": "BeneficiaryName_Equity",
-        "beneficiary name equity": "BeneficiaryName_Equity",
-        "BeneficiaryNameEquity": "BeneficiaryName_Equity",
-        
-        # Enhanced Account Number mappings for Equity
-        "account_number_equity": "Account_Number_Equity",
-        "account number equity": "Account_Number_Equity",
-        "AccountNumberEquity": "Account_Number_Equity",
-        "account_equity": "Account_Number_Equity",
-        "accountequity": "Account_Number_Equity",
-        "account_equity_number": "Account_Number_Equity",
-        "equity_account_number": "Account_Number_Equity",
-        "equityaccountnumber": "Account_Number_Equity",
-        
-        "aba_equity": "ABA_Equity",
-        "ABAEquity": "ABA_Equity",
-        "aba_equit": "ABA_Equity",  # Handle truncated version
-        "bsb_equity": "BSB_Equity",
-        "BSBEquity": "BSB_Equity",
-        "bsb_equit": "BSB_Equity",  # Handle truncated version
-        "iban_equity": "IBAN_Equity",
-        "IBANEquity": "IBAN_Equity",
-        "iban_equ": "IBAN_Equity",  # Handle truncated version
-        "sort_equity": "SORT_Equity",
-        "SortEquity": "SORT_Equity",
-        "sort_equ": "SORT_Equity",  # Handle truncated version
-        "zengin_equity": "Zengin_Equity",
-        "ZenginEquity": "Zengin_Equity",
-        "zengin_eq": "Zengin_Equity",  # Handle truncated version
-        "settlement_method_equity": "Settlement_Method_Equity",
-        "settlement method equity": "Settlement_Method_Equity",
-        "SettlementMethodEquity": "Settlement_Method_Equity",
-        "settlemen": "Settlement_Method_Equity",  # Handle truncated version
-        
-        "effectivedate_forex": "EffectiveDate_Forex",
-        "effective date forex": "EffectiveDate_Forex",
-        "EffectiveDateForex": "EffectiveDate_Forex",
-        "effectived": "EffectiveDate_Forex",  # Handle truncated version
-        "confirmationstatus_forex": "ConfirmationStatus_Forex",
-        "confirmation status forex": "ConfirmationStatus_Forex",
-        "ConfirmationStatusForex": "ConfirmationStatus_Forex",
-        "confirmat": "ConfirmationStatus_Forex",  # Handle truncated version
-        
-        # Enhanced Account Number mappings for Forex
-        "account_number_forex": "Account Number_Forex",
-        "account number forex": "Account Number_Forex",
-        "AccountNumberForex": "Account Number_Forex",
-        "account_forex": "Account Number_Forex",
-        "accountforex": "Account Number_Forex",
-        "account_forex_number": "Account Number_Forex",
-        "forex_account_number": "Account Number_Forex",
-        "forexaccountnumber": "Account Number_Forex",
-        "account number_forex": "Account Number_Forex",  # Handle space variation
-        
-        "swift_forex": "SWIFT_Forex",
-        "swift forex": "SWIFT_Forex",
-        "SwiftForex": "SWIFT_Forex",
-        "beneficiaryname_forex": "BeneficiaryName_Forex",
-        "beneficiary name forex": "BeneficiaryName_Forex",
-        "BeneficiaryNameForex": "BeneficiaryName_Forex",
-        "aba_forex": "ABA_Forex",
-        "ABAForex": "ABA_Forex",
-        "bsb_forex": "BSB_Forex",
-        "BSBForex": "BSB_Forex",
-        "iban_forex": "IBAN_Forex",
-        "IBANForex": "IBAN_Forex",
-        "sort_forex": "SORT_Forex",
-        "SortForex": "SORT_Forex",
-        "zengin_forex": "Zengin_Forex",
-        "ZenginForex": "Zengin_Forex",
-        "settlement_method_forex": "Settlement_Method_Forex",
-        "settlement method forex": "Settlement_Method_Forex",
-        "SettlementMethodForex": "Settlement_Method_Forex",
-    }
+    # Enhanced Account Number mappings for Equity
+    "account_number_equity": "Account_Number_Equity",
+    "account number equity": "Account_Number_Equity",
+    "AccountNumberEquity": "Account_Number_Equity",
+    "account_equity": "Account_Number_Equity",
+    "accountequity": "Account_Number_Equity",
+    "account_equity_number": "Account_Number_Equity",
+    "equity_account_number": "Account_Number_Equity",
+    "equityaccountnumber": "Account_Number_Equity",
+    
+    "aba_equity": "ABA_Equity",
+    "ABAEquity": "ABA_Equity",
+    "aba_equit": "ABA_Equity",  # Handle truncated version
+    "bsb_equity": "BSB_Equity",
+    "BSBEquity": "BSB_Equity",
+    "bsb_equit": "BSB_Equity",  # Handle truncated version
+    "iban_equity": "IBAN_Equity",
+    "IBANEquity": "IBAN_Equity",
+    "iban_equ": "IBAN_Equity",  # Handle truncated version
+    "sort_equity": "SORT_Equity",
+    "SortEquity": "SORT_Equity",
+    "sort_equ": "SORT_Equity",  # Handle truncated version
+    "zengin_equity": "Zengin_Equity",
+    "ZenginEquity": "Zengin_Equity",
+    "zengin_eq": "Zengin_Equity",  # Handle truncated version
+    "settlement_method_equity": "Settlement_Method_Equity",
+    "settlement method equity": "Settlement_Method_Equity",
+    "SettlementMethodEquity": "Settlement_Method_Equity",
+    "settlemen": "Settlement_Method_Equity",  # Handle truncated version
+    
+    "effectivedate_forex": "EffectiveDate_Forex",
+    "effective date forex": "EffectiveDate_Forex",
+    "EffectiveDateForex": "EffectiveDate_Forex",
+    "effectived": "EffectiveDate_Forex",  # Handle truncated version
+    "confirmationstatus_forex": "ConfirmationStatus_Forex",
+    "confirmation status forex": "ConfirmationStatus_Forex",
+    "ConfirmationStatusForex": "ConfirmationStatus_Forex",
+    "confirmat": "ConfirmationStatus_Forex",  # Handle truncated version
+    
+    # Enhanced Account Number mappings for Forex
+    "account_number_forex": "Account Number_Forex",
+    "account number forex": "Account Number_Forex",
+    "AccountNumberForex": "Account Number_Forex",
+    "account_forex": "Account Number_Forex",
+    "accountforex": "Account Number_Forex",
+    "account_forex_number": "Account Number_Forex",
+    "forex_account_number": "Account Number_Forex",
+    "forexaccountnumber": "Account Number_Forex",
+    "account number_forex": "Account Number_Forex",  # Handle space variation
     
-    for key, value in data.items():
+    "swift_forex": "SWIFT_Forex",
+    "swift forex": "SWIFT_Forex",
+    "SwiftForex": "SWIFT_Forex",
+    "beneficiaryname_forex": "BeneficiaryName_Forex",
+    "beneficiary name forex": "BeneficiaryName_Forex",
+    "BeneficiaryNameForex": "BeneficiaryName_Forex",
+    "aba_forex": "ABA_Forex",
+    "ABAForex": "ABA_Forex",
+    "bsb_forex": "BSB_Forex",
+    "BSBForex": "BSB_Forex",
+    "iban_forex": "IBAN_Forex",
+    "IBANForex": "IBAN_Forex",
+    "sort_forex": "SORT_Forex",
+    "SortForex": "SORT_Forex",
+    "zengin_forex": "Zengin_Forex",
+    "ZenginForex": "Zengin_Forex",
+    "settlement_method_forex": "Settlement_Method_Forex",
+    "settlement method forex": "Settlement_Method_Forex",
+    "SettlementMethodForex": "Settlement_Method_Forex",
+}
+
+@lru_cache(maxsize=128)
+def resolve_csv_header(columns: tuple) -> tuple:
+    """
+    Model alias for each CSV column, in column order.
+    Headers are the same for every row of an upload, so each distinct header is resolved once.
+    """
+    targets = []
+    unmatched = []
+    for key in columns:
         # Normalize the key (remove extra spaces, convert to lowercase for comparison)
         normalized_key = key.strip().lower()
-        
-        # Add debugging for specific fields we're looking for
-        if "account" in normalized_key or "equity" in normalized_key or "forex" in normalized_key:
-            print(f"[DEBUG] Processing key: '{key}' -> normalized: '{normalized_key}' -> value: '{value}'")
-        
-        # Check if we have a mapping for this key
-        if normalized_key in column_mapping:
-            mapped_key = column_mapping[normalized_key]
-            normalized[mapped_key] = value
-            print(f"[DEBUG] Mapped '{key}' -> '{mapped_key}' with value '{value}'")
+        if normalized_key in COLUMN_MAPPING:
+            targets.append(COLUMN_MAPPING[normalized_key])
         else:
             # If no mapping, use the original key (but strip spaces)
-            normalized[key.strip()] = value
-            print(f"[DEBUG] No mapping found for '{key}', using original key")
-    
-    print(f"[DEBUG] Final normalized keys: {list(normalized.keys())}")
-    return normalized
+            targets.append(key.strip())
+            unmatched.append(key)
+    print(f"[DEBUG] Resolved CSV columns: {list(columns)} -> {targets}")
+    if unmatched:
+        print(f"[DEBUG] No mapping found for {unmatched}, using original keys")
+    return tuple(targets)
+
+def normalize_csv_data(data: dict) -> dict:
+    """
+    Normalize CSV data to handle spacing and minor variations in column names.
+    This ensures robust mapping from CSV to the Forex model.
+    """
+    targets = resolve_csv_header(tuple(data))
+    # Later columns win when two map to the same alias
+    return dict(zip(targets, data.values()))
 
 @router.post("/forex", response_model=Forex)
 async def add_forex(request: Request):
@@ -272,7 +276,7 @@ async def bulk_capture_forexs(request: Request):
     print(f"[DEBUG] Received {len(forexs_data)} trades for bulk processing")
     print(f"[DEBUG] Client ID from request body: '{client_id}'")
     
-    results = []
+    normalized_rows = []
     errors = []
 
     for i, forex_data in enumerate(forexs_data):
@@ -283,42 +287,33 @@ async def bulk_capture_forexs(request: Request):
             # Check if TradeID is present and not empty
             trade_id = forex_data.get("TradeID", "").strip()
             if not trade_id:
-                errors.append({
+                errors.append((i, {
                     "TradeID": "EMPTY", 
                     "error": "TradeID is required and cannot be empty"
-                })
+                }))
                 continue
 
             # Normalize the data to handle column name variations
-            normalized_data = normalize_csv_data(forex_data)
-
-            # Debug: Print the normalized data before creating Forex object
-            print(f"[DEBUG] Normalized data for TradeID {trade_id}: {normalized_data}")
-
-            # Create Forex object from normalized data
-            try:
-                forex = Forex.parse_obj(normalized_data)
-                print(f"[DEBUG] Forex object created successfully for TradeID {trade_id}")
-            except Exception as parse_error:
-                print(f"[DEBUG] Error parsing Forex object for TradeID {trade_id}: {parse_error}")
-                errors.append({"TradeID": trade_id, "error": f"Parsing error: {str(parse_error)}"})
-                continue
-
-            # Debug: Print the Forex object after parsing
-            print(f"[DEBUG] Forex object created for TradeID {trade_id}:")
-            print(f"[DEBUG] Account_Number_Equity: '{forex.Account_Number_Equity}'")
-            print(f"[DEBUG] Account_Number_Forex: '{forex.Account_Number_Forex}'")
-            print(f"[DEBUG] ABA_Equity: '{forex.ABA_Equity}'")
-            print(f"[DEBUG] BSB_Equity: '{forex.BSB_Equity}'")
-            print(f"[DEBUG] Settlement_Method_Equity: '{forex.Settlement_Method_Equity}'")
-
-            if forex_repository.get_forex(forex.TradeID):
-                raise Exception(f"TradeID '{forex.TradeID}' already exists")
-            forex_repository.save_forex(forex)
-            results.append(forex)
+            normalized_rows.append((i, trade_id, normalize_csv_data(forex_data)))
         except Exception as e:
             print(f"[DEBUG] Error processing trade {i+1}: {str(e)}")
-            errors.append({"TradeID": forex_data.get("TradeID", "Unknown"), "error": str(e)})
+            errors.append((i, {"TradeID": forex_data.get("TradeID", "Unknown"), "error": str(e)}))
+
+    # Coerce and validate the whole batch against the compiled schema; only valid rows become Forex objects
+    valid, invalid = forex_row_schema.validate_rows([row for _, _, row in normalized_rows])
+    parsed = [(normalized_rows[k][0], forex) for k, forex in valid]
+    for k, message in invalid:
+        i, trade_id, _ = normalized_rows[k]
+        print(f"[DEBUG] Error parsing Forex object for TradeID {trade_id}: {message}")
+        errors.append((i, {"TradeID": trade_id, "error": f"Parsing error: {message}"}))
+    print(f"[DEBUG] Parsed {len(parsed)} of {len(normalized_rows)} Forex objects")
+
+    # Duplicates are resolved for the whole request at once and new trades written in batches
+    results, save_errors = forex_repository.save_new_forexs([forex for _, forex in parsed])
+    saved_ids = {id(forex) for forex in results}
+    unsaved = iter(save_errors)
+    errors.extend((i, next(unsaved)) for i, forex in parsed if id(forex) not in saved_ids)
+    errors = [error for _, error in sorted(errors, key=lambda item: item[0])]
 
     print(f"[DEBUG] Processing complete. Results: {len(results)}, Errors: {len(errors)}")
 
@@ -346,9 +341,19 @@ async def bulk_capture_forexs(request: Request):
     return results
 
 @router.get("/forexs")
-def get_forexs():
+def get_forexs(page_size: Optional[int] = None, after: Optional[str] = None,
+               fields: Optional[str] = None, raw: bool = False):
+    """
+    Captured trades in TradeID order. page_size returns one page as
+    {"items", "next_after"}; fields (comma separated) or raw return the stored
+    documents without validation.
+    """
     print("[DEBUG] /forexs route called")
-    return [f.dict() for f in forex_repository.load_forexs()]
+    forexs, next_after = forex_repository.list_forexs(page_size=page_size, after=after,
+                                                      fields=parse_fields(fields), raw=raw)
+    if page_size:
+        return {"items": forexs, "next_after": next_after}
+    return forexs
 
 @router.get("/forexs/{TradeID}", response_model=Forex)
 async def get_forex(TradeID: str):
@@ -1,5 +1,7 @@
 import json
 import os
+from services.forex_capture.models import Forex
+from services.schema_compiler import compile_schema
 
 RULES_PATH = os.path.join(os.path.dirname(__file__), "forex_rules.json")
 
@@ -124,3 +126,7 @@ forex_schema = {
     "Zengin_Forex": str,
     "Settlement_Method_Forex": str,
 }
+
+# Compiled once for bulk captures. The allowed ProductType/BuySell values are
+# not enforced at capture (uploads use mixed case), so only the schema is compiled.
+forex_row_schema = compile_schema(forex_schema, model=Forex)
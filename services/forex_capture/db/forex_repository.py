@@ -2,14 +2,28 @@
 
 import json
 from services.forex_capture.models import Forex
-from typing import List, Optional
+from typing import List, Optional, Set
 import os
 from services.firebase_client import get_firestore_client
+from services.firestore_batch import BatchWriter
+from services.firestore_paging import page_documents
+from services.forex_capture.core.rules import forex_row_schema
 from services.forex_capture.services.unified_data_service import unified_data_service
 # Removed: from services.forex_termsheet_capture.db.termsheet_repository import save_termsheet
 
 FOREX_FILE = os.path.join(os.path.dirname(__file__), '../db/forex.json')
 
+# Documents requested per get_all call when checking for duplicates
+EXISTS_BATCH_SIZE = 300
+
+def invalid_trade_id(trade_id) -> Optional[str]:
+    """Why trade_id cannot be used as an fx_capture document ID, or None if it can"""
+    if not trade_id:
+        return "TradeID is required"
+    if '/' in str(trade_id):
+        return "TradeID may not contain '/'"
+    return None
+
 class ForexRepository:
     def __init__(self, file_path=FOREX_FILE):
         self.file_path = file_path
@@ -39,26 +53,81 @@ class ForexRepository:
         
         # Removed: logic that creates and stores termsheet in fx_termsheets
 
-    def save_forex_bulk(self, forexs: List[Forex], client_id: str = None):
+    def save_forex_bulk(self, forexs: List[Forex], client_id: str = None) -> List[dict]:
         """
-        Save multiple forex trades to fx_capture collection.
+        Save multiple forex trades to fx_capture collection in batched commits.
         Note: unified_data updates are handled by the calling API route to avoid duplication.
         
         Args:
             forexs: List of Forex trade objects to save
             client_id: The client ID (kept for compatibility but not used here)
+
+        Returns:
+            The writes that failed, as {"TradeID", "error"} entries
         """
         print(f"[DEBUG] Saving {len(forexs)} forex trades to fx_capture")
-        
-        # Save each trade to fx_capture collection (existing functionality)
-        for i, forex in enumerate(forexs):
-            print(f"[DEBUG] Saving trade {i+1}/{len(forexs)}: {forex.TradeID}")
-            forex_dict = forex.dict(by_alias=True)
-            self.db.collection(self.collection_name).document(forex.TradeID).set(forex_dict)
-        
-        # Note: unified_data updates are handled by the calling API route
-        # to prevent duplicate execution of the bulk update logic
-        print(f"[DEBUG] Saved {len(forexs)} trades to fx_capture. Unified data updates handled by API route.")
+        writer = BatchWriter(self.db)
+        for forex in forexs:
+            writer.set(self.collection_name, forex.TradeID, forex.dict(by_alias=True), ref=forex.TradeID)
+        errors = [{"TradeID": error["ref"], "error": error["error"]} for error in writer.flush()]
+        print(f"[DEBUG] Saved {writer.written} trades to fx_capture in {writer.batches_committed} batches. Unified data updates handled by API route.")
+        return errors
+
+    def existing_trade_ids(self, trade_ids: List[str]) -> Set[str]:
+        """TradeIDs that already have an fx_capture document, resolved with batched get_all reads"""
+        trade_ids = list(dict.fromkeys(str(trade_id) for trade_id in trade_ids if trade_id))
+        existing = set()
+        collection = self.db.collection(self.collection_name)
+        for start in range(0, len(trade_ids), EXISTS_BATCH_SIZE):
+            refs = [collection.document(trade_id) for trade_id in trade_ids[start:start + EXISTS_BATCH_SIZE]]
+            # Only existence matters, so fetch as little of each document as possible
+            for doc in self.db.get_all(refs, field_paths=['TradeID']):
+                if doc.exists:
+                    existing.add(doc.id)
+        return existing
+
+    def save_new_forexs(self, forexs: List[Forex]):
+        """
+        Save the trades whose TradeID is not captured yet.
+
+        Existence is checked for the whole list at once and the new trades are
+        written in batches. A TradeID that already exists, or repeats earlier in
+        the list, is reported as a duplicate like the one-by-one capture did.
+
+        Returns:
+            (saved trades, [{"TradeID", "error"}]) in input order
+        """
+        # A TradeID that cannot name a document would fail the whole get_all, so it is reported on its own
+        rejected = {}
+        for forex in forexs:
+            reason = invalid_trade_id(forex.TradeID)
+            if reason:
+                rejected[id(forex)] = reason
+        existing = self.existing_trade_ids([forex.TradeID for forex in forexs if id(forex) not in rejected])
+        seen = set()
+        new_forexs = []
+        duplicate_ids = set()
+        for forex in forexs:
+            if id(forex) in rejected:
+                continue
+            if forex.TradeID in existing or forex.TradeID in seen:
+                duplicate_ids.add(id(forex))
+            else:
+                seen.add(forex.TradeID)
+                new_forexs.append(forex)
+        failed = {error["TradeID"]: error["error"] for error in self.save_forex_bulk(new_forexs)}
+        saved = []
+        errors = []
+        for forex in forexs:
+            if id(forex) in rejected:
+                errors.append({"TradeID": forex.TradeID, "error": rejected[id(forex)]})
+            elif id(forex) in duplicate_ids:
+                errors.append({"TradeID": forex.TradeID, "error": f"TradeID '{forex.TradeID}' already exists"})
+            elif forex.TradeID in failed:
+                errors.append({"TradeID": forex.TradeID, "error": failed[forex.TradeID]})
+            else:
+                saved.append(forex)
+        return saved, errors
 
     def load_forexs(self) -> List[Forex]:
         docs = self.db.collection(self.collection_name).stream()
@@ -71,6 +140,36 @@ class ForexRepository:
                 print(f"[DEBUG] Document data: {doc.to_dict()}")
         return forexs
 
+    def list_forexs(self, page_size: int = None, after: str = None, fields: List[str] = None, raw: bool = False):
+        """
+        fx_capture documents for the listing endpoint, in TradeID order.
+
+        By default each document comes back as Forex.dict() would give it, built
+        straight from the stored values; only documents the compiled schema cannot
+        settle go through Forex.parse_obj, and invalid ones are skipped as in
+        load_forexs(). raw (or a fields projection) returns the stored documents
+        as they are.
+
+        Returns:
+            (documents, TradeID to pass as after for the next page or None)
+        """
+        docs, next_after = page_documents(self.db.collection(self.collection_name),
+                                          page_size=page_size, after=after, fields=fields)
+        if raw or fields:
+            return [data for _, data in docs], next_after
+        forexs = []
+        for doc_id, data in docs:
+            coerced = forex_row_schema.coerce_row(data)
+            if coerced is not None:
+                forexs.append(coerced[0])
+                continue
+            try:
+                forexs.append(Forex.parse_obj(data).dict())
+            except Exception as e:
+                print(f"[DEBUG] Skipping invalid forex doc {doc_id}: {e}")
+                print(f"[DEBUG] Document data: {data}")
+        return forexs, next_after
+
     def get_forex(self, TradeID: str) -> Optional[Forex]:
         print(f"[DEBUG] Checking for TradeID in Firestore: {TradeID}")
         doc = self.db.collection(self.collection_name).document(TradeID).get()
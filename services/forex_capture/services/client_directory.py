@@ -0,0 +1,149 @@
+import os
+import time
+import logging
+import threading
+from services.firebase_client import get_firestore_client
+
+logger = logging.getLogger(__name__)
+
+UNIFIED_DATA_COLLECTION = 'unified_data'
+CLIENT_ID_FIELD = 'ClientID_Forex'
+
+# Seconds a loaded directory is trusted before it is reloaded from Firestore
+DIRECTORY_TTL = int(os.environ.get('UNIFIED_DATA_DIRECTORY_TTL_SECONDS', '300'))
+# Keep the directory current with a snapshot listener instead of reloading on the TTL
+DIRECTORY_LISTEN = os.environ.get('UNIFIED_DATA_DIRECTORY_LISTEN', 'false').lower() in ('1', 'true', 'yes')
+
+class ClientDirectory:
+    """
+    In-process directory of the unified_data clients: ClientID_Forex to the
+    id of the client's document.
+
+    A client's document is the first one a ClientID_Forex query returns
+    (lowest document id), which is the one capture updates. The directory is
+    loaded with one projected scan of unified_data and reloaded once
+    DIRECTORY_TTL has passed; with DIRECTORY_LISTEN a snapshot listener applies
+    changes as they happen and the TTL only applies while the listener is down.
+
+    Only ids are cached. The client's data is always read fresh by lookup(),
+    since the Frontend rewrites these documents too, and a client missing from
+    the directory (or whose document moved) is looked up in Firestore before
+    it is reported unknown.
+    """
+
+    def __init__(self, firestore_db=None):
+        self._db = firestore_db
+        self._lock = threading.RLock()
+        self._clients = None
+        self._loaded_at = 0.0
+        self._watch = None
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = get_firestore_client()
+        return self._db
+
+    def _fresh(self):
+        if self._clients is None:
+            return False
+        if self._watch is not None:
+            return True
+        return time.monotonic() - self._loaded_at < DIRECTORY_TTL
+
+    def _load(self):
+        clients = {}
+        for doc in self.db.collection(UNIFIED_DATA_COLLECTION).select([CLIENT_ID_FIELD]).stream():
+            client_id = doc.to_dict().get(CLIENT_ID_FIELD)
+            if client_id and (client_id not in clients or doc.id < clients[client_id]):
+                clients[client_id] = doc.id
+        logger.info(f"Loaded {len(clients)} clients into the unified_data directory")
+        return dict(sorted(clients.items(), key=lambda item: item[1]))
+
+    def _ensure(self):
+        with self._lock:
+            if self._fresh():
+                return self._clients
+            self._clients = self._load()
+            self._loaded_at = time.monotonic()
+            if DIRECTORY_LISTEN and self._watch is None:
+                self._listen()
+            return self._clients
+
+    def _listen(self):
+        try:
+            self._watch = self.db.collection(UNIFIED_DATA_COLLECTION).on_snapshot(self._on_snapshot)
+        except Exception as e:
+            logger.warning(f"unified_data listener unavailable, falling back to a {DIRECTORY_TTL}s TTL: {e}")
+            self._watch = None
+
+    def _on_snapshot(self, docs, changes, read_time):
+        with self._lock:
+            if self._clients is None:
+                return
+            for change in changes:
+                doc = change.document
+                data = doc.to_dict() or {}
+                if getattr(change.type, 'name', change.type) == 'REMOVED':
+                    self._forget(doc.id)
+                else:
+                    self._apply(doc.id, data.get(CLIENT_ID_FIELD))
+
+    def _forget(self, doc_id):
+        if doc_id in self._clients.values():
+            # The client's next document is unknown without a scan, so reload on next use
+            self._clients = None
+
+    def _apply(self, doc_id, client_id):
+        for known_client, known_id in list(self._clients.items()):
+            if known_id == doc_id and known_client != client_id:
+                self._clients = None
+                return
+        if not client_id:
+            return
+        current = self._clients.get(client_id)
+        if current is None or doc_id <= current:
+            self._clients[client_id] = doc_id
+
+    def _query(self, client_id):
+        docs = self.db.collection(UNIFIED_DATA_COLLECTION).where(CLIENT_ID_FIELD, '==', client_id).limit(1).stream()
+        doc = next(iter(docs), None)
+        if doc is None:
+            return None
+        with self._lock:
+            if self._clients is not None:
+                self._clients[client_id] = doc.id
+        return doc.id, doc.to_dict()
+
+    def lookup(self, client_id):
+        """(document id, current data) of the client's unified_data document, or None if there is none"""
+        doc_id = self._ensure().get(client_id)
+        if doc_id is not None:
+            snapshot = self.db.collection(UNIFIED_DATA_COLLECTION).document(doc_id).get()
+            data = snapshot.to_dict() if snapshot.exists else None
+            if data is not None and data.get(CLIENT_ID_FIELD) == client_id:
+                return doc_id, data
+            # Deleted or reassigned since the directory was loaded
+            with self._lock:
+                if self._clients is not None and self._clients.get(client_id) == doc_id:
+                    del self._clients[client_id]
+        return self._query(client_id)
+
+    def client_ids(self):
+        """Distinct ClientID_Forex values, in document order"""
+        return list(self._ensure().keys())
+
+    def invalidate(self):
+        with self._lock:
+            self._clients = None
+
+    def close(self):
+        with self._lock:
+            if self._watch is not None:
+                try:
+                    self._watch.unsubscribe()
+                except Exception as e:
+                    logger.warning(f"Could not stop the unified_data listener: {e}")
+                self._watch = None
+
+client_directory = ClientDirectory()
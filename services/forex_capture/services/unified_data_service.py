@@ -1,5 +1,7 @@
 from services.firebase_client import get_firestore_client
 from services.forex_capture.models import Forex
+from services.firestore_batch import BatchWriter
+from services.forex_capture.services.client_directory import client_directory
 from typing import Dict, Any, Optional, List
 import logging
 import uuid
@@ -35,50 +37,22 @@ class UnifiedDataService:
             logger.info(f"[{execution_id}] Looking for unified_data document with ClientID_Forex: {client_id}")
             
             # Find the document in unified_data collection by ClientID_Forex
-            docs = self.db.collection(self.collection_name).where("ClientID_Forex", "==", client_id).stream()
-            doc_ref = None
-            
-            for doc in docs:
-                doc_ref = doc.reference
-                break
-            
-            if not doc_ref:
+            entry = client_directory.lookup(client_id)
+            if entry is None:
                 logger.warning(f"[{execution_id}] No unified_data document found for ClientID_Forex: {client_id}")
                 return False
             
-            # Get the existing document data
-            existing_doc = doc_ref.get()
-            if not existing_doc.exists:
-                logger.warning(f"[{execution_id}] Document reference exists but document doesn't exist for ClientID_Forex: {client_id}")
-                return False
-            
-            existing_data = existing_doc.to_dict()
-            logger.info(f"[{execution_id}] Found existing unified_data document: {existing_doc.id}")
+            doc_id, existing_data = entry
+            doc_ref = self.db.collection(self.collection_name).document(doc_id)
+            logger.info(f"[{execution_id}] Found existing unified_data document: {doc_id}")
             
             # Use the helper method to update the document
-            return self._update_single_document(forex_trade, doc_ref, existing_data, f"document {existing_doc.id}")
+            return self._update_single_document(forex_trade, doc_ref, existing_data, f"document {doc_id}")
             
         except Exception as e:
             logger.error(f"[{execution_id}] Error updating unified_data for trade {forex_trade.TradeID}: {str(e)}")
             return False
     
-    def _find_case_insensitive_field(self, data_dict: dict, field_name: str) -> str:
-        """
-        Find a field name in the data dictionary with case-insensitive matching
-        
-        Args:
-            data_dict: The dictionary to search in
-            field_name: The field name to find
-            
-        Returns:
-            The actual field name if found, None otherwise
-        """
-        field_name_lower = field_name.lower()
-        for key in data_dict.keys():
-            if key.lower() == field_name_lower:
-                return key
-        return None
-    
     def get_unified_data_by_client_id(self, client_id: str) -> Optional[Dict[str, Any]]:
         """
         Get unified_data document by ClientID_Forex
@@ -90,12 +64,8 @@ class UnifiedDataService:
             Dict containing the document data or None if not found
         """
         try:
-            docs = self.db.collection(self.collection_name).where("ClientID_Forex", "==", client_id).stream()
-            
-            for doc in docs:
-                return doc.to_dict()
-            
-            return None
+            entry = client_directory.lookup(client_id)
+            return entry[1] if entry else None
             
         except Exception as e:
             logger.error(f"Error getting unified_data for ClientID_Forex {client_id}: {str(e)}")
@@ -105,6 +75,10 @@ class UnifiedDataService:
         """
         Update the unified_data collection with multiple forex trades by creating duplicate documents.
         Creates one document per trade, preserving existing data in all documents.
+
+        Every document is merged in memory from a fresh read of the client's
+        original document and all of them are written in batched commits, so
+        the whole update costs one read plus one commit per few hundred trades.
         
         Args:
             forex_trades: List of Forex trade objects to use for updating unified_data
@@ -126,94 +100,64 @@ class UnifiedDataService:
                 return False
             
             client_id = client_id.strip()
-            logger.info(f"[{execution_id}] Processing {len(forex_trades)} trades for unified_data update with ClientID_Forex: {client_id}")
             
             # Find the original document in unified_data collection by ClientID_Forex
-            docs = self.db.collection(self.collection_name).where("ClientID_Forex", "==", client_id).stream()
-            original_doc_ref = None
-            
-            for doc in docs:
-                original_doc_ref = doc.reference
-                break
-            
-            if not original_doc_ref:
+            entry = client_directory.lookup(client_id)
+            if entry is None:
                 logger.warning(f"[{execution_id}] No unified_data document found for ClientID_Forex: {client_id}")
                 return False
+            original_id, original_data = entry
+            
+            writer = BatchWriter(self.db)
+            for i, forex_trade in enumerate(forex_trades):
+                merged_data, updated_fields = self._merge_trade(original_data, forex_trade.dict(by_alias=True))
+                if i == 0:
+                    # First trade fills the empty fields of the original document, leaving the rest untouched
+                    if updated_fields:
+                        filled = {field: merged_data[field] for field in updated_fields}
+                        writer.set(self.collection_name, original_id, filled, ref=forex_trade.TradeID, merge=True)
+                else:
+                    # Subsequent trades each get a copy of the original document under a new ID
+                    writer.set(self.collection_name, None, merged_data, ref=forex_trade.TradeID)
+            errors = writer.flush()
+            for error in errors:
+                logger.error(f"[{execution_id}] Error writing unified_data for trade {error['ref']}: {error['error']}")
             
-            # Get the original document data
-            original_doc = original_doc_ref.get()
-            if not original_doc.exists:
-                logger.warning(f"[{execution_id}] Document reference exists but document doesn't exist for ClientID_Forex: {client_id}")
-                return False
-            
-            original_data = original_doc.to_dict()
-            logger.info(f"[{execution_id}] Found original unified_data document: {original_doc.id}")
-            
-            # Create all duplicate documents first, then update each with trade data
-            document_refs = []
-            
-            # First trade will use the original document
-            document_refs.append((original_doc_ref, f"original document {original_doc.id}"))
-            
-            # Create duplicate documents for subsequent trades
-            for i in range(1, len(forex_trades)):
-                try:
-                    # Create duplicate data (copy of original, before any trade updates)
-                    duplicate_data = original_data.copy()
-                    
-                    # Create new document with random ID
-                    new_doc_ref = self.db.collection(self.collection_name).document()
-                    logger.info(f"[{execution_id}] Creating duplicate document {i+1} with ID: {new_doc_ref.id}")
-                    
-                    # Write the duplicate document to Firestore with original data
-                    new_doc_ref.set(duplicate_data)
-                    logger.info(f"[{execution_id}] Successfully created duplicate document {i+1} with ID: {new_doc_ref.id}")
-                    
-                    # Add to our list of documents to update
-                    document_refs.append((new_doc_ref, f"duplicate document {i+1}"))
-                    
-                except Exception as e:
-                    logger.error(f"[{execution_id}] Error creating duplicate document {i+1}: {str(e)}")
-                    return False
-            
-            # Now update each document with its respective trade data
-            success_count = 0
-            for i, (doc_ref, doc_description) in enumerate(document_refs):
-                try:
-                    forex_trade = forex_trades[i]
-                    
-                    # Get the current document data (either original or duplicate)
-                    if i == 0:
-                        # For original document, use original_data
-                        current_doc_data = original_data
-                        logger.info(f"[{execution_id}] Using original data for {doc_description}")
-                        logger.info(f"[{execution_id}] Original data TradeID: {current_doc_data.get('TradeID', 'NOT_FOUND')}")
-                    else:
-                        # For duplicate documents, get the data we just created
-                        current_doc_data = doc_ref.get().to_dict()
-                        logger.info(f"[{execution_id}] Using duplicate data for {doc_description}")
-                        logger.info(f"[{execution_id}] Duplicate data TradeID: {current_doc_data.get('TradeID', 'NOT_FOUND')}")
-                        logger.info(f"[{execution_id}] Duplicate data keys: {list(current_doc_data.keys())[:5]}...")
-                    
-                    logger.info(f"[{execution_id}] About to update {doc_description} with trade {forex_trade.TradeID}")
-                    success = self._update_single_document(forex_trade, doc_ref, current_doc_data, doc_description)
-                    
-                    if success:
-                        success_count += 1
-                        logger.info(f"[{execution_id}] Successfully processed trade {i+1}/{len(forex_trades)} in {doc_description}")
-                    else:
-                        logger.error(f"[{execution_id}] Failed to process trade {i+1}/{len(forex_trades)} in {doc_description}")
-                        
-                except Exception as e:
-                    logger.error(f"[{execution_id}] Error processing trade {i+1}/{len(forex_trades)} in {doc_description}: {str(e)}")
-            
-            logger.info(f"[{execution_id}] Bulk update complete: {success_count}/{len(forex_trades)} trades processed successfully")
-            return success_count == len(forex_trades)
+            logger.info(f"[{execution_id}] Bulk update complete: {len(forex_trades) - len(errors)}/{len(forex_trades)} trades processed successfully for ClientID_Forex: {client_id}")
+            return not errors
             
         except Exception as e:
             logger.error(f"[{execution_id}] Error in bulk unified_data update: {str(e)}")
             return False
     
+    def _merge_trade(self, existing_data: dict, trade_data: dict):
+        """
+        Fill the empty slots of existing_data from trade_data without overwriting existing values.
+        Field names are matched case-insensitively; values of "", None and "N/A" count as empty.
+        
+        Returns:
+            (merged data, names of the fields filled from the trade)
+        """
+        existing_fields = {}
+        for key in existing_data:
+            existing_fields.setdefault(key.lower(), key)
+        merged_data = existing_data.copy()
+        updated_fields = []
+        for field_name, field_value in trade_data.items():
+            # Skip empty values but allow TradeID to be updated
+            if not field_value or field_value == "":
+                continue
+            existing_field_name = existing_fields.get(field_name.lower())
+            # Only update if the field is empty, null, or doesn't exist in existing data
+            if (existing_field_name is None or
+                existing_data[existing_field_name] is None or
+                existing_data[existing_field_name] == "" or
+                existing_data[existing_field_name] == "N/A"):
+                # Use the original field name from trade data
+                merged_data[field_name] = field_value
+                updated_fields.append(field_name)
+        return merged_data, updated_fields
+    
     def _update_single_document(self, forex_trade: Forex, doc_ref, existing_data: dict, doc_description: str) -> bool:
         """
         Update a single document with trade data (existing logic)
@@ -231,64 +175,15 @@ class UnifiedDataService:
         execution_id = str(uuid.uuid4())[:8]
         
         try:
-            # Convert forex trade to dict for easier processing
-            trade_data = forex_trade.dict(by_alias=True)
-            
-            # Debug: Log the trade data being processed
-            logger.info(f"[{execution_id}] Processing trade data for TradeID: {trade_data.get('TradeID', 'NOT_FOUND')} in {doc_description}")
-            logger.info(f"[{execution_id}] Trade data keys: {list(trade_data.keys())[:5]}...")
-            logger.info(f"[{execution_id}] Existing data TradeID: {existing_data.get('TradeID', 'NOT_FOUND')}")
-            
-            # Create merged data - only fill empty slots, don't overwrite existing data
-            merged_data = existing_data.copy()
-            updated_fields = []
-            
-            for field_name, field_value in trade_data.items():
-                # Skip empty values but allow TradeID to be updated
-                if not field_value or field_value == "":
-                    logger.debug(f"[{execution_id}] Skipping empty field: {field_name}")
-                    continue
-                
-                # Check for case-insensitive field name matches
-                existing_field_name = self._find_case_insensitive_field(existing_data, field_name)
-                
-                # Only update if the field is empty, null, or doesn't exist in existing data
-                if (existing_field_name is None or 
-                    existing_data[existing_field_name] is None or 
-                    existing_data[existing_field_name] == "" or
-                    existing_data[existing_field_name] == "N/A"):
-                    
-                    # Use the original field name from trade data
-                    merged_data[field_name] = field_value
-                    updated_fields.append(field_name)
-                    logger.info(f"[{execution_id}] Will update field '{field_name}' to '{field_value}' in {doc_description}")
-                    
-                    # Special logging for TradeID updates
-                    if field_name == "TradeID":
-                        logger.info(f"[{execution_id}] Updating TradeID field to: {field_value} in {doc_description}")
-                        if existing_field_name:
-                            logger.info(f"[{execution_id}] Previous TradeID value was: {existing_data[existing_field_name]}")
-                        else:
-                            logger.info(f"[{execution_id}] TradeID field did not exist in unified_data, adding new field")
-                else:
-                    logger.info(f"[{execution_id}] Field '{field_name}' already has value: '{existing_data[existing_field_name]}', skipping update in {doc_description}")
+            merged_data, updated_fields = self._merge_trade(existing_data, forex_trade.dict(by_alias=True))
             
             if not updated_fields:
                 logger.info(f"[{execution_id}] No new fields to update in {doc_description}")
-                # For duplicate documents, we still want to confirm the document exists
-                if "duplicate document" in doc_description:
-                    logger.info(f"[{execution_id}] Duplicate document {doc_description} created successfully with original data")
                 return True
             
-            # Update the document with merged data
-            logger.info(f"[{execution_id}] Updating {doc_description} with merged data containing TradeID: {merged_data.get('TradeID', 'NOT_FOUND')}")
-            doc_ref.set(merged_data)
+            # Write only the filled fields, so concurrent edits to the rest of the document survive
+            doc_ref.set({field: merged_data[field] for field in updated_fields}, merge=True)
             logger.info(f"[{execution_id}] Successfully updated {doc_description} with {len(updated_fields)} new fields: {updated_fields}")
-            
-            # Log if TradeID was updated
-            if "TradeID" in updated_fields:
-                logger.info(f"[{execution_id}] TradeID field was updated in {doc_description}")
-            
             return True
             
         except Exception as e:
@@ -1,62 +1,70 @@
-# Placeholder for trade repository DB access logic 
+# Placeholder for trade repository DB access logic
 
-import json
-from services.forex_capture.models import Forex
-from typing import List, Optional
 import os
-from services.firebase_client import get_firestore_client
-from services.forex_termsheet_capture.db.termsheet_repository import save_termsheet
+from typing import List
+from services.forex_capture.models import Forex
+from services.firestore_batch import BatchWriter
+from services.forex_capture.db.forex_repository import ForexRepository as CaptureForexRepository
 
 FOREX_FILE = os.path.join(os.path.dirname(__file__), 'forex.json')
+TERMSHEET_COLLECTION = 'fx_termsheet'
+
+def build_termsheet(forex: Forex) -> dict:
+    """The fx_termsheet document derived from a captured trade, keyed by its TradeID"""
+    return {
+        'TermsheetID': forex.TradeID,
+        'TradeID': forex.TradeID,
+        'TradeDate': forex.TradeDate,
+        'Counterparty': forex.Counterparty,
+        'CurrencyPair': forex.CurrencyPair,
+        'BuySell': forex.BuySell,
+        'DealtCurrency': forex.DealtCurrency,
+        'BaseCurrency': forex.BaseCurrency,
+        'TermCurrency': forex.TermCurrency,
+        'NotionalAmount': forex.NotionalAmount,
+        'FXRate': forex.FXRate,
+        'ProductType': forex.ProductType,
+        'MaturityDate': forex.MaturityDate,
+        'SettlementDate': forex.SettlementDate,
+        'KYCCheck': forex.KYCCheck,
+        # Add more fields as needed
+    }
+
+class ForexRepository(CaptureForexRepository):
+    """
+    fx_capture repository of System A, which also stores a termsheet in
+    fx_termsheet for every captured trade. A trade and its termsheet are
+    always committed in the same batch, so neither is stored without the other.
+    """
 
-class ForexRepository:
     def __init__(self, file_path=FOREX_FILE):
-        self.file_path = file_path
-        self.db = get_firestore_client()
-        self.collection_name = "fx_capture"  # Use the premade collection for this service
-
-    def save_forex(self, forex: Forex):
-
-        self.db.collection(self.collection_name).document(forex.TradeID).set(forex.dict(by_alias=True))
-        # Create and store termsheet in fx_termsheets
-        termsheet = {
-            'TermsheetID': forex.TradeID,
-            'TradeID': forex.TradeID,
-            'TradeDate': forex.TradeDate,
-            'Counterparty': forex.Counterparty,
-            'CurrencyPair': forex.CurrencyPair,
-            'BuySell': forex.BuySell,
-            'DealtCurrency': forex.DealtCurrency,
-            'BaseCurrency': forex.BaseCurrency,
-            'TermCurrency': forex.TermCurrency,
-            'NotionalAmount': forex.NotionalAmount,
-            'FXRate': forex.FXRate,
-            'ProductType': forex.ProductType,
-            'MaturityDate': forex.MaturityDate,
-            'SettlementDate': forex.SettlementDate,
-            'KYCCheck': forex.KYCCheck,
-            # Add more fields as needed
-        }
-        save_termsheet(termsheet)
-
-    def load_forexs(self) -> List[Forex]:
-        docs = self.db.collection(self.collection_name).stream()
-        forexs = []
-        for doc in docs:
-            try:
-                forexs.append(Forex.parse_obj(doc.to_dict()))
-            except Exception as e:
-
-        return forexs
-
-    def get_forex(self, TradeID: str) -> Optional[Forex]:
-        doc = self.db.collection(self.collection_name).document(TradeID).get()
-        if doc.exists:
-            return Forex.parse_obj(doc.to_dict())
-        return None
-
-    def _load_forexs_raw(self) -> List[dict]:
-        docs = self.db.collection(self.collection_name).stream()
-        return [doc.to_dict() for doc in docs]
-
-forex_repository = ForexRepository() 
\ No newline at end of file
+        super().__init__(file_path=file_path)
+
+    def _writes(self, forex: Forex):
+        return [
+            (self.collection_name, forex.TradeID, forex.dict(by_alias=True)),
+            (TERMSHEET_COLLECTION, forex.TradeID, build_termsheet(forex)),
+        ]
+
+    def save_forex(self, forex: Forex, client_id: str = None):
+        """Store the trade in fx_capture and its termsheet in fx_termsheet in one atomic batch"""
+        batch = self.db.batch()
+        for collection, doc_id, data in self._writes(forex):
+            batch.set(self.db.collection(collection).document(doc_id), data)
+        batch.commit()
+
+    def save_forex_bulk(self, forexs: List[Forex], client_id: str = None) -> List[dict]:
+        """
+        Store many trades with their termsheets, as many pairs per batch as fit.
+
+        Returns:
+            The trades that failed, as {"TradeID", "error"} entries
+        """
+        writer = BatchWriter(self.db)
+        for forex in forexs:
+            writer.set_group(self._writes(forex), ref=forex.TradeID)
+        errors = [{"TradeID": error["ref"], "error": error["error"]} for error in writer.flush()]
+        print(f"[DEBUG] Saved {writer.written // 2} trades with termsheets in {writer.batches_committed} batches")
+        return errors
+
+forex_repository = ForexRepository()
@@ -1,16 +1,17 @@
 from typing import List
-from fastapi import APIRouter, HTTPException, File, UploadFile
+from fastapi import HTTPException
 from services.forex_capture.models import Forex
 from services.forex_capture.services.capture_service import forex_capture_service
 from services.forex_capture.db.forex_repository import forex_repository
-import csv
+from services.capture_host.engine import build_source_router
 from services.firebase_client import get_firestore_client
 
 REQUIRED_COLUMNS = [
     'Trade ID', 'Instrument', 'CurrencyPair', 'Quantity', 'Price', 'Buy/Sell', 'Settlement Date', 'Counterparty', 'Product Type'
 ]
 
-router = APIRouter()
+# Upload and health endpoints come from the shared capture engine
+router = build_source_router('forex_systemB')
 
 @router.post("/forex", response_model=Forex)
 async def add_forex(forex: Forex):
@@ -49,16 +50,7 @@ async def add_forex(forex: Forex):
 
 @router.post("/forexs/bulk", response_model=List[Forex])
 async def bulk_capture_forexs(forexs: List[Forex]):
-    results = []
-    errors = []
-    for forex in forexs:
-        try:
-            if forex_repository.get_forex(forex.TradeID):
-                raise Exception(f"TradeID '{forex.TradeID}' already exists")
-            forex_repository.save_forex(forex)
-            results.append(forex)
-        except Exception as e:
-            errors.append({"TradeID": forex.TradeID, "error": str(e)})
+    results, errors = forex_repository.save_new_forexs(forexs)
     if errors:
         raise HTTPException(status_code=400, detail=errors)
     return results
@@ -73,52 +65,3 @@ async def get_forex(TradeID: str):
     if forex:
         return forex
     raise HTTPException(status_code=404, detail="Forex not found")
-
-@router.post("/upload_systemB_csv")
-async def upload_systemB_csv(file: UploadFile = File(...)):
-    try:
-        db = get_firestore_client()
-        content = await file.read()
-        decoded = content.decode('utf-8').splitlines()
-        reader = csv.DictReader(decoded)
-        results = []
-        
-        for row in reader:
-            # Normalize keys: strip spaces, lower-case, remove underscores
-            norm_row = {k.strip().replace(' ', '').replace('_', '').lower(): v.strip() for k, v in row.items()}
-            
-            # Helper to get value by possible keys
-            def get_val(*keys):
-                for key in keys:
-                    k = key.strip().replace(' ', '').replace('_', '').lower()
-                    if k in norm_row:
-                        return norm_row[k]
-                return ''
-            
-            data = {
-                'Trade ID': get_val('Trade ID', 'TradeID'),
-                'Instrument': get_val('Instrument', 'CurrencyPair'),
-                'FX Rate': get_val('FX Rate', 'FXRate', 'FxRate', 'Rate'),
-                'Notional Amount': get_val('Notional Amount', 'NotionalAmount', 'NotionalA'),
-                'Buy/Sell': get_val('Buy/Sell', 'BuySell'),
-                'Settlement Date': get_val('Settlement Date', 'ValueDate', 'SettlementDate'),
-                'Counterparty': get_val('Counterparty'),
-                'Product Type': get_val('Product Type', 'ProductType'),
-            }
-            
-            doc_id = data['Trade ID'] or None
-            if doc_id:
-                db.collection('fx_systemB_capture').document(doc_id).set(data)
-            else:
-                db.collection('fx_systemB_capture').add(data)
-            results.append(data)
-        
-        return {"count": len(results), "stored": results}
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@router.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "ok"}
\ No newline at end of file
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException, Body
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from services.forex_termsheet_capture.services.capture_service import forex_termsheet_capture_service
 from services.forex_termsheet_capture.db.forex_repository import forex_repository
+from services.firestore_paging import parse_fields
 
 router = APIRouter()
 
@@ -12,9 +13,13 @@ async def capture_termsheets(termsheets: List[Dict[str, Any]] = Body(...)):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/forex-termsheets", response_model=List[Dict[str, Any]])
-async def list_termsheets():
-    return [f.dict() for f in forex_repository.load_forexs()]
+@router.get("/forex-termsheets")
+async def list_termsheets(page_size: Optional[int] = None, after: Optional[str] = None, fields: Optional[str] = None):
+    """Termsheets in TradeID order; page_size returns one page as {"items", "next_after"}"""
+    termsheets, next_after = forex_repository.list_forexs(page_size=page_size, after=after, fields=parse_fields(fields))
+    if page_size:
+        return {"items": termsheets, "next_after": next_after}
+    return termsheets
 
 @router.get("/forex-termsheets/{tradeId}", response_model=Dict[str, Any])
 async def get_termsheet_by_id(tradeId: str):
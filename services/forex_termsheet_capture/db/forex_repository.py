@@ -5,6 +5,8 @@ from services.forex_capture.models import Forex
 from typing import List, Optional
 import os
 from services.firebase_client import get_firestore_client
+from services.firestore_paging import page_documents
+from services.forex_capture.core.rules import forex_row_schema
 
 FOREXS_FILE = os.path.join(os.path.dirname(__file__), 'forexs.json')
 
@@ -20,6 +22,24 @@ class ForexRepository:
         docs = self.db.collection("forex_termsheet").stream()
         return [Forex.parse_obj(doc.to_dict()) for doc in docs]
 
+    def list_forexs(self, page_size: int = None, after: str = None, fields: List[str] = None):
+        """
+        forex_termsheet documents in TradeID order, as Forex.dict() would give them
+        (the stored documents as they are with a fields projection).
+
+        Returns:
+            (termsheets, TradeID to pass as after for the next page or None)
+        """
+        docs, next_after = page_documents(self.db.collection("forex_termsheet"),
+                                          page_size=page_size, after=after, fields=fields)
+        if fields:
+            return [data for _, data in docs], next_after
+        forexs = []
+        for _, data in docs:
+            coerced = forex_row_schema.coerce_row(data)
+            forexs.append(coerced[0] if coerced is not None else Forex.parse_obj(data).dict())
+        return forexs, next_after
+
     def get_forex(self, TradeID: str) -> Optional[Forex]:
         doc = self.db.collection("forex_termsheet").document(TradeID).get()
         if doc.exists:
@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from typing import List, Dict, Optional
 from services.forex_trade_validation.services.validation_runner import ValidationRunner
 from services.firebase_client import get_firestore_client
+from services.firestore_paging import parse_fields
 from datetime import datetime
 import re
 from services.forex_trade_validation.core.rules_config import load_rules_config
@@ -82,16 +83,22 @@ async def validate_single_trade(request: SingleTradeValidationRequest):
         raise HTTPException(status_code=500, detail=f"Validation error: {str(e)}")
 
 @router.get("/results")
-async def get_validation_results():
+async def get_validation_results(page_size: Optional[int] = None, after: Optional[str] = None,
+                                 fields: Optional[str] = None):
     """
-    Get all validation results.
+    Get validation results in TradeID order. With page_size only one page is
+    returned, and next_after is the TradeID to pass as after for the next one.
     """
     try:
-        results = validation_runner.repository.get_all_validated_trades()
-        return {
+        results, next_after = validation_runner.repository.page_validated_trades(
+            page_size=page_size, after=after, fields=parse_fields(fields))
+        response = {
             "results": results,
             "summary": validation_runner.get_validation_summary()
         }
+        if page_size:
+            response["next_after"] = next_after
+        return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving results: {str(e)}")
 
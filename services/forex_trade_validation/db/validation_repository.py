@@ -2,6 +2,7 @@ import json
 import os
 from typing import List, Dict
 from services.firebase_client import get_firestore_client
+from services.firestore_paging import page_documents
 
 class ValidationRepository:
     def __init__(self, db_path: str = "validated_trades.json"):
@@ -44,6 +45,50 @@ class ValidationRepository:
     
                 return []
 
+    def page_validated_trades(self, page_size: int = None, after: str = None, fields: List[str] = None):
+        """
+        Validated trades in TradeID order, one page at a time.
+
+        Returns (trades, TradeID to pass as after for the next page or None);
+        the whole local file, unpaged, when the database is unavailable.
+        """
+        try:
+            docs, next_after = page_documents(self.db.collection("forex_validation_results"),
+                                              page_size=page_size, after=after, fields=fields)
+            return [data for _, data in docs], next_after
+        except Exception:
+            try:
+                with open(self.db_path, 'r') as f:
+                    return json.load(f), None
+            except Exception:
+                return [], None
+
+    def count_validated_trades(self) -> Dict:
+        """
+        Total, passed and failed counts from Firestore count aggregations, so
+        no result document is read. Passed and failed count is_valid == True
+        and is_valid == False exactly; the local-file fallback keeps the
+        truthiness tests of get_passed_trades() and get_failed_trades().
+        """
+        try:
+            collection = self.db.collection("forex_validation_results")
+            return {
+                "total": self._count(collection),
+                "passed": self._count(collection.where("is_valid", "==", True)),
+                "failed": self._count(collection.where("is_valid", "==", False)),
+            }
+        except Exception:
+            trades = self.get_all_validated_trades()
+        return {
+            "total": len(trades),
+            "passed": sum(1 for trade in trades if trade.get("is_valid", False)),
+            "failed": sum(1 for trade in trades if not trade.get("is_valid", True)),
+        }
+
+    @staticmethod
+    def _count(query) -> int:
+        return int(query.count().get()[0][0].value)
+
     def get_trade_by_id(self, trade_id: str) -> Dict:
         """Retrieve a specific trade by its ID."""
         try:
@@ -74,15 +74,13 @@ class ValidationRunner:
         Returns:
             Dictionary with counts of passed, failed, and total trades
         """
-        all_trades = self.repository.get_all_validated_trades()
-        passed_trades = self.repository.get_passed_trades()
-        failed_trades = self.repository.get_failed_trades()
+        counts = self.repository.count_validated_trades()
         
         return {
-            "total_trades": len(all_trades),
-            "passed_trades": len(passed_trades),
-            "failed_trades": len(failed_trades),
-            "success_rate": len(passed_trades) / len(all_trades) * 100 if all_trades else 0
+            "total_trades": counts["total"],
+            "passed_trades": counts["passed"],
+            "failed_trades": counts["failed"],
+            "success_rate": counts["passed"] / counts["total"] * 100 if counts["total"] else 0
         }
 
     def get_failed_trades(self) -> List[Dict]:
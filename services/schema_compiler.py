@@ -0,0 +1,162 @@
+import re
+
+# Returned by a coercer when it cannot decide; the row is then handed to the model itself
+DEFER = object()
+_MISSING = object()
+
+def _coerce_str(value):
+    # Mirrors pydantic's str coercion: strings as is, numbers (and bools) through str()
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        try:
+            return str(value)
+        except ValueError:
+            return DEFER
+    return DEFER
+
+def _coerce_float(value):
+    if isinstance(value, float):
+        return value
+    if isinstance(value, (str, int)):
+        try:
+            return float(value)
+        except (ValueError, OverflowError):
+            return DEFER
+    return DEFER
+
+def _coerce_int(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, (str, float, bool)):
+        try:
+            return int(value)
+        except (ValueError, OverflowError):
+            return DEFER
+    return DEFER
+
+COERCERS = {str: _coerce_str, float: _coerce_float, int: _coerce_int}
+
+def normalize_rule_key(name):
+    return re.sub(r'[\s_]', '', name).lower()
+
+class CompiledSchema:
+    """
+    A column schema ({alias: type}, as in core/rules.py) compiled into one
+    coercer per column, plus the 'allowed'/'min' checks of a rules JSON.
+
+    validate_rows() coerces a batch of row dicts without building a model per
+    row. Coercion follows the model's own (pydantic) rules; a value the
+    compiled coercer cannot settle, such as None, a missing required column or
+    an unparseable number, makes the row fall back to model.parse_obj, so
+    accepted rows and error messages are exactly what the model would give.
+    materialize() then builds models for the surviving rows only.
+    """
+
+    def __init__(self, schema, model=None, rules=None):
+        self.model = model
+        self.rules = rules or {}
+        self.unique_trade_id = bool(self.rules.get('unique_trade_id'))
+        # (output key, input keys, coercer, required, default) per column
+        self.columns = []
+        if model is not None:
+            by_name = model.__config__.allow_population_by_field_name
+            for field in model.__fields__.values():
+                column_type = schema.get(field.alias, field.outer_type_)
+                keys = (field.alias, field.name) if by_name and field.alt_alias else (field.alias,)
+                coercer = COERCERS.get(column_type) if not field.allow_none else None
+                self.columns.append((field.name, keys, coercer, field.required, field.default))
+        else:
+            for alias, column_type in schema.items():
+                self.columns.append((alias, (alias,), COERCERS.get(column_type), True, None))
+        self.checks = self._compile_rules(schema)
+
+    def _compile_rules(self, schema):
+        # Rule keys name a column loosely ('trade_type' for TradeType); checks read the key coerce_row() produces
+        keys = {normalize_rule_key(alias): alias for alias in schema}
+        if self.model is not None:
+            keys = {}
+            for field in self.model.__fields__.values():
+                keys[normalize_rule_key(field.alias)] = field.name
+                keys.setdefault(normalize_rule_key(field.name), field.name)
+        checks = []
+        for rule_key, rule in self.rules.items():
+            if not isinstance(rule, dict):
+                continue
+            key = keys.get(normalize_rule_key(rule_key))
+            if key is None:
+                raise ValueError(f"Rule '{rule_key}' does not match any column of the schema")
+            label = self.model.__fields__[key].alias if self.model is not None else key
+            if 'min' in rule:
+                checks.append((key, lambda v, m=rule['min']: v >= m, f"{label} must be at least {rule['min']}"))
+            if 'allowed' in rule:
+                checks.append((key, lambda v, a=frozenset(rule['allowed']): v in a, f"{label} must be one of {rule['allowed']}"))
+        return checks
+
+    def coerce_row(self, row):
+        """(values keyed by model field name, fields set) or None when the row needs the model to decide"""
+        values = {}
+        fields_set = set()
+        get = row.get
+        for name, keys, coercer, required, default in self.columns:
+            raw = get(keys[0], _MISSING)
+            if raw is _MISSING and len(keys) > 1:
+                raw = get(keys[1], _MISSING)
+            if raw is _MISSING:
+                if required:
+                    return None
+                values[name] = default
+                continue
+            if coercer is _coerce_str and raw.__class__ is str:
+                values[name] = raw
+            else:
+                if coercer is None:
+                    return None
+                value = coercer(raw)
+                if value is DEFER:
+                    return None
+                values[name] = value
+            fields_set.add(name)
+        return values, fields_set
+
+    def check_rules(self, values):
+        """Messages of the rules a coerced row (or model.dict()) breaks, in rule order"""
+        return [message for key, ok, message in self.checks if not ok(values[key])]
+
+    def validate_rows(self, rows):
+        """
+        Coerce and check a batch of rows. Returns (valid, errors): valid holds
+        (index, model instance) for every accepted row (the coerced dict when
+        there is no model) and errors (index, message) for the others.
+        """
+        valid = []
+        errors = []
+        for index, row in enumerate(rows):
+            coerced = self.coerce_row(row)
+            if coerced is None:
+                if self.model is None:
+                    errors.append((index, "Row does not match the schema"))
+                    continue
+                try:
+                    instance = self.model.parse_obj(row)
+                except Exception as e:
+                    errors.append((index, str(e)))
+                    continue
+                values = instance.dict()
+            else:
+                instance = None
+                values = coerced[0]
+            broken = self.check_rules(values)
+            if broken:
+                errors.append((index, broken[0]))
+                continue
+            valid.append((index, instance if instance is not None else self.materialize(*coerced)))
+        return valid, errors
+
+    def materialize(self, values, fields_set=None):
+        if self.model is None:
+            return values
+        return self.model.construct(_fields_set=fields_set, **values)
+
+def compile_schema(schema, model=None, rules=None):
+    return CompiledSchema(schema, model=model, rules=rules)
@@ -0,0 +1,66 @@
+import json
+import math
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+import numpy as np
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def json_default(obj):
+    """Serialize the values the encoder does not handle natively"""
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, np.generic):
+        value = obj.item()
+        return None if isinstance(value, float) and not math.isfinite(value) else value
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        value = float(obj)
+        return value if math.isfinite(value) else None
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+def _sanitize(obj):
+    # Only used without orjson: the standard encoder rejects NaN/inf
+    if isinstance(obj, dict):
+        return {k: _sanitize(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_sanitize(item) for item in obj]
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, (np.generic, Decimal)) or obj is pd.NaT or obj is pd.NA:
+        return json_default(obj)
+    if isinstance(obj, np.ndarray):
+        return _sanitize(obj.tolist())
+    return obj
+
+class LifecycleJSONResponse(JSONResponse):
+    """
+    JSON response that writes NaN/inf as null and handles dates, NumPy and
+    pandas values in a single orjson pass, so records can be returned as they
+    come from pandas or Firestore without cleaning them first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(
+                content,
+                default=json_default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            )
+        return json.dumps(
+            _sanitize(content),
+            default=json_default,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
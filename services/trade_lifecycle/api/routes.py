@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Request, UploadFile, File, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi import APIRouter, Request, UploadFile, File, HTTPException, Query
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 import shutil
 import os
@@ -7,23 +7,31 @@ import pandas as pd
 from datetime import datetime
 import uuid
 import json
-import math
-from services.trade_lifecycle.main import load_trades, filter_trades_by_event, save_filtered_trades
+from typing import List, Optional
 from services.trade_lifecycle.core.maturity_logic import get_maturity_trades, approve_maturity_trade
 from services.trade_lifecycle.core.coupon_logic import get_coupon_trades, approve_coupon_trade, pay_coupon
-from services.trade_lifecycle.core.early_redemption_logic import get_early_redemption_trades, get_early_redemption_trade, mark_trade_redeemed, parse_date
+from services.trade_lifecycle.core.early_redemption_logic import get_early_redemption_trades, get_early_redemption_trade, mark_trade_redeemed, observations_due
+from services.trade_lifecycle.utils.datetime_utils import parse_date
+from services.trade_lifecycle.core.barrier_logic import barrier_monitor, read_price_series, BARRIER_PRICES_PATH
+from services.trade_lifecycle.db.event_calendar import event_calendar
+from services.trade_lifecycle.db.fx_capture_queries import query_fx_trades, typed_filters
+from services.trade_lifecycle.db.lifecycle_events import lifecycle_event_log
+from services.forex_capture.models import Forex
+from services.trade_lifecycle.core.maturity_forex_logic import (
+    MATURITY_FOREX_FILE, iter_maturity_forex_export, add_settlement_columns, stream_csv, stream_ndjson, stream_json_array
+)
 import logging
 import numpy as np
-from services.equity_capture.db.trade_repository import trade_repository
-from services.forex_capture.db.forex_repository import forex_repository
-from shared.models import Trade
-from services.forex_capture.models import Forex
 from services.firebase_client import get_firestore_client
+from services.trade_lifecycle.api.responses import LifecycleJSONResponse
+from services.trade_lifecycle.services.upload_pipeline import process_upload
+from services.trade_lifecycle.services.upload_jobs import upload_job_manager, UploadQueueFull
+from services.trade_lifecycle.services.event_scheduler import event_processor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(default_response_class=LifecycleJSONResponse)
 templates = Jinja2Templates(directory="frontend/templates")
 
 logger.info("ROUTES FILE LOADED")
@@ -45,18 +53,6 @@ CONSOLIDATED_COLUMNS = [
     "INTERNAL VALUE", "EXTERNAL VALUE", "REPORTEDTO", "REASON"
 ]
 
-def clean_for_json(obj):
-    if isinstance(obj, dict):
-        return {k: clean_for_json(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [clean_for_json(item) for item in obj]
-    elif isinstance(obj, float):
-        if math.isnan(obj) or math.isinf(obj):
-            return None
-        return obj
-    else:
-        return obj
-
 @router.get("/", response_class=HTMLResponse)
 def overview(request: Request):
     allowed_filenames = set()
@@ -81,84 +77,12 @@ def upload_file(request: Request, file: UploadFile = File(...)):
         file_location = f"data/{upload_id}_{file.filename}"
         with open(file_location, "wb") as buffer:
             shutil.copyfileobj(file.file, buffer)
-        df = load_trades(file_location)
-        filtered = filter_trades_by_event(df, event_column='event_type')
-        save_filtered_trades(filtered)
-        os.remove(file_location)
-
-        # Store only the trades that would be displayed in the lifecycle tab
-        firestore_db = get_firestore_client()
-        for event, trades_df in filtered.items():
-            for row in trades_df.to_dict(orient="records"):
-                # Decide which repository to use based on TradeType or TradeID
-                trade_id = str(row.get('Trade ID', '') or row.get('TradeID', ''))
-                trade_type = row.get('Trade Type', '') or row.get('TradeType', '')
-                
-                # Apply the same filtering logic as the lifecycle tab
-                # 1. Instrument filter - only upload Forex trades to fx_lifecycle
-                is_forex_trade = trade_id.upper().startswith('FX') or trade_type.upper() == 'FOREX'
-                
-                # 2. Event type filter - only upload trades with valid event types
-                valid_event_types = ['Maturity', 'Coupon Rate', 'Early Redemption', 'Barrier Monitoring']
-                event_type_normalized = event.replace('-', ' ').title()
-                is_valid_event = event_type_normalized in valid_event_types
-                
-                # Debug: Log the original row data
-                logger.info(f"Processing row for trade {trade_id}: {row}")
-                
-                # Only upload to fx_lifecycle if it's a Forex trade with a valid event type
-                if is_forex_trade and is_valid_event:
-                    # --- Store in fx_lifecycle collection ---
-                    lifecycle_doc_id = f"{trade_id}_{event}" if trade_id else str(uuid.uuid4())
-                    
-                    # Only store the specific fields that are displayed in the lifecycle tab
-                    lifecycle_data = {
-                        'TradeID': trade_id,
-                        'CurrencyPair': row.get('CurrencyPair', ''),
-                        'Symbol': row.get('Symbol', ''),
-                        'EventType': event,
-                        'event_type': event,
-                        'EventDate': row.get('MaturityDate', row.get('SettlementDate', row.get('TradeDate', ''))),
-                        'TradeDate': row.get('TradeDate', ''),
-                        'EventStatus': 'Pending',  # Default status
-                        'FXRate': row.get('FXRate', ''),
-                        'NotionalAmount': row.get('NotionalAmount', ''),
-                        'SettlementDate': row.get('SettlementDate', ''),
-                        'BuySell': row.get('BuySell', ''),
-                        'ApprovalStatus': 'Pending',  # Default status
-                        'uploaded_at': datetime.utcnow().isoformat()
-                    }
-                    
-                    try:
-                        firestore_db.collection('fx_lifecycle').document(lifecycle_doc_id).set(lifecycle_data)
-                        logger.info(f"Stored trade lifecycle data for {lifecycle_doc_id}")
-                        logger.info(f"Data stored: {lifecycle_data}")
-                    except Exception as e:
-                        logger.warning(f"Could not store trade lifecycle data for {lifecycle_doc_id}: {e}")
-                    # --- End fx_lifecycle storage ---
-                
-                # Store in appropriate repository based on trade type
-                if is_forex_trade:
-                    # Try to create Forex model and save
-                    try:
-                        forex = Forex(**{k.replace(' ', ''): v for k, v in row.items()})
-                        forex_repository.save_forex(forex)
-                    except Exception as e:
-                        logger.warning(f"Could not save forex trade {trade_id}: {e}")
-                else:
-                    # Try to create Trade model and save
-                    try:
-                        trade = Trade(**{k.replace(' ', '_'): v for k, v in row.items()})
-                        trade_repository.save_trade(trade)
-                    except Exception as e:
-                        logger.warning(f"Could not save equity trade {trade_id}: {e}")
-    
-        # Always overwrite Maturity_Forex.csv for testing
-        import logging
-        logging.basicConfig(level=logging.INFO)
-        logger = logging.getLogger(__name__)
-        logger.info(f"Overwriting filtered_trades/Maturity_Forex.csv with uploaded file: {file.filename}")
-        df.to_csv('filtered_trades/Maturity_Forex.csv', index=False)
+        try:
+            # Store only the trades that would be displayed in the lifecycle tab
+            write_result = process_upload(file_location, get_firestore_client())
+        finally:
+            os.remove(file_location)
+        logger.info(f"Processed lifecycle upload: {file.filename}")
 
         files = []
         for filename in os.listdir("filtered_trades"):
@@ -171,7 +95,9 @@ def upload_file(request: Request, file: UploadFile = File(...)):
             "request": request,
             "files": files,
             "events": EVENTS,
-            "success_message": f"File processed and trades sorted successfully!"
+            "success_message": f"File processed and trades sorted successfully!" + (
+                f" {len(write_result['errors'])} row(s) could not be stored." if write_result['errors'] else ""
+            )
         })
     except Exception as e:
         files = []
@@ -188,6 +114,93 @@ def upload_file(request: Request, file: UploadFile = File(...)):
             "error_message": f"Error processing file: {str(e)}"
         })
 
+@router.post("/upload/jobs")
+def submit_upload_job(file: UploadFile = File(...)):
+    """Accept an upload for background processing and return its job ID immediately"""
+    upload_id = str(uuid.uuid4())
+    file_location = f"data/{upload_id}_{file.filename}"
+    with open(file_location, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+    try:
+        job_id = upload_job_manager.submit(file_location, file.filename)
+    except UploadQueueFull as e:
+        os.remove(file_location)
+        return LifecycleJSONResponse({"error": f"Too many uploads in progress: {e}"}, status_code=429)
+    return LifecycleJSONResponse({
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/api/trade-lifecycle/upload/jobs/{job_id}"
+    }, status_code=202)
+
+@router.get("/upload/jobs/{job_id}")
+def get_upload_job(job_id: str):
+    """Progress, status and per-stage timings of a background upload"""
+    job = upload_job_manager.get(job_id)
+    if not job:
+        return LifecycleJSONResponse({"error": "Job not found"}, status_code=404)
+    return LifecycleJSONResponse(job)
+
+@router.get("/api/events/upcoming")
+def api_upcoming_events(days: int = 7, event_type: Optional[List[str]] = Query(None)):
+    """Lifecycle events due from today through the next `days` days, in date order"""
+    if days < 0:
+        return LifecycleJSONResponse({"error": "days must not be negative"}, status_code=400)
+    return LifecycleJSONResponse(event_calendar.upcoming(days, event_types=set(event_type) if event_type else None))
+
+@router.get("/api/events/due-today")
+def api_events_due_today(event_type: Optional[List[str]] = Query(None)):
+    return LifecycleJSONResponse(event_calendar.due_on(datetime.now().date(), event_types=set(event_type) if event_type else None))
+
+@router.post("/api/events/process")
+def api_process_events(day: Optional[str] = None):
+    """Materialize due Forex events into fx_lifecycle_due now; pairs already checkpointed are skipped"""
+    today = parse_date(day) if day else None
+    if day and today is None:
+        return LifecycleJSONResponse({"error": f"Invalid date: {day}"}, status_code=400)
+    return LifecycleJSONResponse({"processed": event_processor.run_once(today)})
+
+@router.get("/api/events/forex-due")
+def api_forex_due_events(day: Optional[str] = None, event_type: Optional[List[str]] = Query(None)):
+    """Forex events the scheduler materialized into fx_lifecycle_due for day (default today)"""
+    target = parse_date(day) if day else datetime.now().date()
+    if target is None:
+        return LifecycleJSONResponse({"error": f"Invalid date: {day}"}, status_code=400)
+    return LifecycleJSONResponse(event_processor.due_events(target, event_types=set(event_type) if event_type else None))
+
+@router.get("/api/events/checkpoints")
+def api_event_checkpoints(day: Optional[str] = None):
+    target = parse_date(day) if day else datetime.now().date()
+    if target is None:
+        return LifecycleJSONResponse({"error": f"Invalid date: {day}"}, status_code=400)
+    return LifecycleJSONResponse({"date": target.isoformat(), "checkpoints": event_processor.checkpoints(target)})
+
+@router.get("/api/barriers")
+def api_barrier_status():
+    """Knock-in/knock-out state of every barrier trade"""
+    return LifecycleJSONResponse(barrier_monitor.status())
+
+@router.post("/api/barriers/evaluate")
+def api_evaluate_barriers():
+    """Re-evaluate every barrier trade against the full local price series"""
+    if not os.path.exists(BARRIER_PRICES_PATH):
+        return LifecycleJSONResponse({"error": f"Price series not found: {BARRIER_PRICES_PATH}"}, status_code=404)
+    try:
+        ticks = read_price_series(BARRIER_PRICES_PATH)
+    except (ValueError, ImportError) as e:
+        return LifecycleJSONResponse({"error": str(e)}, status_code=400)
+    crossings = barrier_monitor.evaluate(ticks)
+    return LifecycleJSONResponse({"ticks": len(ticks), "crossed": list(crossings.values())})
+
+@router.post("/api/barriers/ticks")
+def api_append_barrier_ticks(file: UploadFile = File(...)):
+    """Evaluate newly appended ticks (CSV or Parquet) against the trades not yet hit and add them to the price series"""
+    try:
+        ticks = read_price_series(file.file, filename=file.filename)
+        crossings = barrier_monitor.append(ticks)
+    except (ValueError, ImportError) as e:
+        return LifecycleJSONResponse({"error": str(e)}, status_code=400)
+    return LifecycleJSONResponse({"ticks": len(ticks), "crossed": list(crossings.values())})
+
 @router.get("/event/maturity-forex", response_class=HTMLResponse)
 def maturity_forex_page(request: Request):
     from .routes import EVENTS  # Ensure EVENTS is imported if needed
@@ -232,152 +245,107 @@ def get_filtered_trades(event_type):
         df[col] = df[col].astype(str).str.strip()
     return df.to_dict(orient="records")
 
+FX_EVENT_TYPES = ["maturity-forex", "maturity", "coupon rate", "early-redemption"]
+# Query parameters that control paging/projection rather than filter on a trade field
+FX_QUERY_PARAMS = {"page_size", "after", "fields", "date_field", "date_from", "date_to"}
+FOREX_FIELDS = {field.alias for field in Forex.__fields__.values()}
+
+def parse_iso_date(value, name):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be YYYY-MM-DD")
+
 @router.get("/api/event/{event_type}")
-def api_event_trades(event_type: str):
-    logger.info(f"Debug: API called with event_type: '{event_type}'")
+def api_event_trades(
+    event_type: str,
+    request: Request,
+    page_size: Optional[int] = None,
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    date_field: str = 'MaturityDate',
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+):
+    """
+    Trades for a lifecycle event page. Forex events are served from fx_capture
+    with the filters pushed into the Firestore query:
+
+    - any Forex field as a query parameter (e.g. ?CurrencyPair=EUR/USD) is an equality filter
+    - fields=TradeID,CurrencyPair,... projects the returned documents
+    - date_from/date_to (YYYY-MM-DD) bound date_field (MaturityDate by default)
+    - page_size/after page through the results by TradeID; paged responses are
+      {"items": [...], "next_after": cursor}, otherwise the full list is returned
+    """
     normalized_event_type = event_type.lower()
-
-    # Handle maturity-forex specifically
-    if normalized_event_type == "maturity-forex":
-        # Get data directly from fx_capture Firestore collection
+    if normalized_event_type in FX_EVENT_TYPES:
+        filters = {
+            key: value for key, value in request.query_params.items()
+            if key not in FX_QUERY_PARAMS and key in FOREX_FIELDS
+        }
         try:
-            db = get_firestore_client()
-            logger.info(f"Debug: Firestore client created successfully")
-            
-            # Test if we can access any collection
-            collections = list(db.collections())
-            logger.info(f"Debug: Available collections: {[col.id for col in collections]}")
-            
-            # Check if fx_capture collection exists
-            fx_capture_ref = db.collection("fx_capture")
-            logger.info(f"Debug: fx_capture collection reference created")
-            
-            # Get all documents from fx_capture collection (like validation service)
-            docs = list(fx_capture_ref.stream())
-            logger.info(f"Debug: Retrieved {len(docs)} documents from fx_capture")
-            
-            trades = [doc.to_dict() for doc in docs]
-            logger.info(f"Debug: Total trades in fx_capture: {len(trades)}")
-            
-            # Show first few trade IDs for debugging
-            if trades:
-                first_trade = trades[0]
-                logger.info(f"Debug: First trade keys: {list(first_trade.keys())}")
-                logger.info(f"Debug: First trade TradeID: {first_trade.get('TradeID', 'NOT_FOUND')}")
-                logger.info(f"Debug: First trade ID field: {first_trade.get('id', 'NOT_FOUND')}")
-            else:
-                logger.info(f"Debug: No trades found in fx_capture collection")
-            
-            # Filter for FX trades (be more flexible with field names)
-            fx_trades = []
-            for trade in trades:
-                trade_id = trade.get('TradeID', trade.get('trade_id', trade.get('id', '')))
-                if str(trade_id).upper().startswith('FX'):
-                    fx_trades.append(trade)
-            
-            logger.info(f"Debug: Found {len(fx_trades)} FX trades from fx_capture collection")
-            logger.info(f"Debug: Returning {len(fx_trades)} FX trades (no validation filtering)")
-            
-            cleaned_trades = clean_for_json(fx_trades)
-            return JSONResponse(cleaned_trades)
-            
-        except Exception as e:
-            logger.error(f"Debug: Error in maturity-forex endpoint: {e}")
-            import traceback
-            logger.error(f"Debug: Full traceback: {traceback.format_exc()}")
-            return JSONResponse([])
-    
-    # Normal handling for other event types
-    if normalized_event_type in ["maturity", "coupon rate", "early-redemption"]:
-        # Get data directly from fx_capture Firestore collection for all forex events
-        db = get_firestore_client()
-        logger.info(f"Debug: Fetching data from fx_capture collection for {event_type}")
-        
+            filters = typed_filters(filters)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         try:
-            # Get all documents from fx_capture collection (like validation service)
-            trades = [doc.to_dict() for doc in db.collection("fx_capture").stream()]
-            logger.info(f"Debug: Total trades in fx_capture for {event_type}: {len(trades)}")
-            
-            # Filter for FX trades (be more flexible with field names)
-            fx_trades = []
-            for trade in trades:
-                trade_id = trade.get('TradeID', trade.get('trade_id', trade.get('id', '')))
-                if str(trade_id).upper().startswith('FX'):
-                    fx_trades.append(trade)
-            
-            logger.info(f"Debug: Found {len(fx_trades)} FX trades from fx_capture collection")
-            logger.info(f"Debug: Returning {len(fx_trades)} FX trades for {event_type}")
-            
-            cleaned_trades = clean_for_json(fx_trades)
-            return JSONResponse(cleaned_trades)
-            
+            trades, next_after = query_fx_trades(
+                get_firestore_client(),
+                fields=[f.strip() for f in fields.split(',') if f.strip()] if fields else None,
+                filters=filters,
+                date_field=date_field,
+                date_from=parse_iso_date(date_from, 'date_from'),
+                date_to=parse_iso_date(date_to, 'date_to'),
+                page_size=page_size,
+                after=after,
+            )
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Debug: Error fetching from fx_capture: {e}")
-            return JSONResponse([])
-    else:
-        logger.info(f"Debug: Using get_filtered_trades() for '{event_type}'")
-        trades = get_filtered_trades(event_type)
-        logger.info(f"Debug: Returning {len(trades)} trades")
-        cleaned_trades = clean_for_json(trades)
-        return JSONResponse(cleaned_trades)
+            logger.error(f"Error querying fx_capture for {event_type}: {e}")
+            return LifecycleJSONResponse([])
+        if page_size:
+            return LifecycleJSONResponse({"items": trades, "next_after": next_after})
+        return LifecycleJSONResponse(trades)
+    trades = get_filtered_trades(event_type)
+    return LifecycleJSONResponse(trades)
 
 @router.post("/api/event/maturity/approve/{trade_id}")
 def api_approve_maturity(trade_id: str):
     approve_maturity_trade(trade_id)
     # Log to fx_lifecycle only for Forex trades
     if trade_id.upper().startswith('FX'):
-        firestore_db = get_firestore_client()
-        log_data = {
-            'trade_id': trade_id,
-            'event_type': 'Maturity',
-            'action': 'approve',
-            'timestamp': datetime.utcnow().isoformat(),
-        }
         try:
-            firestore_db.collection('fx_lifecycle').document(str(uuid.uuid4())).set(log_data)
+            lifecycle_event_log.append(trade_id, 'Maturity', 'approve')
         except Exception as e:
             logger.warning(f"Could not log maturity approval for {trade_id}: {e}")
-    return JSONResponse({"status": "approved"})
+    return LifecycleJSONResponse({"status": "approved"})
 
 @router.post("/api/event/coupon/approve/{trade_id}")
 def api_approve_coupon(trade_id: str):
     approve_coupon_trade(trade_id)
     # Log to fx_lifecycle only for Forex trades
     if trade_id.upper().startswith('FX'):
-        firestore_db = get_firestore_client()
-        log_data = {
-            'trade_id': trade_id,
-            'event_type': 'Coupon Rate',
-            'action': 'approve',
-            'timestamp': datetime.utcnow().isoformat(),
-        }
         try:
-            firestore_db.collection('fx_lifecycle').document(str(uuid.uuid4())).set(log_data)
+            lifecycle_event_log.append(trade_id, 'Coupon Rate', 'approve')
         except Exception as e:
             logger.warning(f"Could not log coupon approval for {trade_id}: {e}")
-    return JSONResponse({"status": "approved"})
+    return LifecycleJSONResponse({"status": "approved"})
 
 @router.post("/api/event/coupon/pay/{trade_id}")
 def api_pay_coupon(trade_id: str):
     success = pay_coupon(trade_id)
     # Log to fx_lifecycle only for Forex trades
     if trade_id.upper().startswith('FX'):
-        firestore_db = get_firestore_client()
-        log_data = {
-            'trade_id': trade_id,
-            'event_type': 'Coupon Rate',
-            'action': 'pay_coupon',
-            'timestamp': datetime.utcnow().isoformat(),
-            'success': success,
-        }
         try:
-            firestore_db.collection('fx_lifecycle').document(str(uuid.uuid4())).set(log_data)
+            lifecycle_event_log.append(trade_id, 'Coupon Rate', 'pay_coupon', success=success)
         except Exception as e:
             logger.warning(f"Could not log coupon payment for {trade_id}: {e}")
     if success:
-        return JSONResponse({"status": "coupon paid"})
+        return LifecycleJSONResponse({"status": "coupon paid"})
     else:
-        return JSONResponse({"error": "Coupon payment failed or not due"}, status_code=400)
+        return LifecycleJSONResponse({"error": "Coupon payment failed or not due"}, status_code=400)
 
 
 @router.post("/api/event/approve")
@@ -386,7 +354,7 @@ async def approve_trade(request: Request):
     trade_id = data.get("TradeID")
     trade_type = data.get("TradeType")  # 'Equity' or 'Forex'
     if not trade_id or not trade_type:
-        return JSONResponse({"error": "Missing TradeID or TradeType"}, status_code=400)
+        return LifecycleJSONResponse({"error": "Missing TradeID or TradeType"}, status_code=400)
 
     if trade_type == "Equity":
         json_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../equity_capture/db/trades.json'))
@@ -405,57 +373,74 @@ async def approve_trade(request: Request):
     if updated:
         with open(json_path, "w") as f:
             json.dump(trades, f, indent=2)
-        return JSONResponse({"status": "ok"})
+        return LifecycleJSONResponse({"status": "ok"})
     else:
-        return JSONResponse({"error": "Trade not found"}, status_code=404)
+        return LifecycleJSONResponse({"error": "Trade not found"}, status_code=404)
 
 @router.get("/api/event/early-redemption")
 def api_early_redemption_trades():
     trades = get_early_redemption_trades()
-    return JSONResponse(trades)
+    return LifecycleJSONResponse(trades)
+
+@router.get("/api/event/early-redemption/observations")
+def api_early_redemption_observations(as_of: Optional[str] = None, since: Optional[str] = None, include_redeemed: bool = False):
+    """Observations due on or before as_of (default today) that have not been redeemed"""
+    as_of_date = parse_date(as_of) if as_of else datetime.now().date()
+    since_date = parse_date(since) if since else None
+    if as_of_date is None or (since and since_date is None):
+        return LifecycleJSONResponse({"error": "Invalid date"}, status_code=400)
+    return LifecycleJSONResponse(observations_due(as_of_date, since=since_date, include_redeemed=include_redeemed))
 
 @router.get("/api/event/early-redemption/trade/{trade_id}")
 def api_early_redemption_trade(trade_id: str):
     trade = get_early_redemption_trade(trade_id)
     if trade:
-        return JSONResponse(trade)
-    return JSONResponse({"error": "Trade not found"}, status_code=404)
+        return LifecycleJSONResponse(trade)
+    return LifecycleJSONResponse({"error": "Trade not found"}, status_code=404)
 
 @router.post("/api/event/early-redemption/redeem/{trade_id}")
 async def api_redeem_early_redemption(trade_id: str, request: Request):
     data = await request.json()
     entered_price = data.get('entered_price') if isinstance(data, dict) else None
-    trades = get_early_redemption_trades()
-    for trade in trades:
-        if str(trade.get('Trade ID', '')) == str(trade_id):
-            trade_date = trade.get('Trade Date', None)
-            obs_months = trade.get('Observation Dates', None)
-            if trade_date and obs_months is not None:
+    trade = get_early_redemption_trade(trade_id)
+    if trade:
+        trade_date = trade.get('Trade Date', None)
+        obs_months = trade.get('Observation Dates', None)
+        if trade_date and obs_months is not None:
+            try:
+                obs_months = int(obs_months)
+            except (ValueError, TypeError):
+                return LifecycleJSONResponse({'error': 'Invalid observation months'}, status_code=400)
+            trade_date_obj = parse_date(trade_date)
+            if not trade_date_obj:
+                return LifecycleJSONResponse({'error': 'Invalid trade date'}, status_code=400)
+            today = datetime.now().date()
+            mark_trade_redeemed(trade_id, trade_date_obj, obs_months, today, entered_price)
+            # Log to fx_lifecycle only for Forex trades
+            if trade_id.upper().startswith('FX'):
                 try:
-                    obs_months = int(obs_months)
-                except (ValueError, TypeError):
-                    return JSONResponse({'error': 'Invalid observation months'}, status_code=400)
-                trade_date_obj = parse_date(trade_date)
-                if not trade_date_obj:
-                    return JSONResponse({'error': 'Invalid trade date'}, status_code=400)
-                today = datetime.now().date()
-                mark_trade_redeemed(trade_id, trade_date_obj, obs_months, today, entered_price)
-                # Log to fx_lifecycle only for Forex trades
-                if trade_id.upper().startswith('FX'):
-                    firestore_db = get_firestore_client()
-                    log_data = {
-                        'trade_id': trade_id,
-                        'event_type': 'Early-Redemption',
-                        'action': 'redeem',
-                        'timestamp': datetime.utcnow().isoformat(),
-                        'entered_price': entered_price,
-                    }
-                    try:
-                        firestore_db.collection('fx_lifecycle').document(str(uuid.uuid4())).set(log_data)
-                    except Exception as e:
-                        logger.warning(f"Could not log early redemption for {trade_id}: {e}")
-                return JSONResponse({'status': 'redeemed'})
-    return JSONResponse({'error': 'Trade not found'}, status_code=404)
+                    lifecycle_event_log.append(trade_id, 'Early-Redemption', 'redeem', entered_price=entered_price)
+                except Exception as e:
+                    logger.warning(f"Could not log early redemption for {trade_id}: {e}")
+            return LifecycleJSONResponse({'status': 'redeemed'})
+    return LifecycleJSONResponse({'error': 'Trade not found'}, status_code=404)
+
+@router.get("/api/lifecycle/{trade_id}/state")
+def api_lifecycle_state(trade_id: str):
+    """Current lifecycle state of a trade from its snapshot"""
+    state = lifecycle_event_log.state(trade_id)
+    if state is None:
+        return LifecycleJSONResponse({"error": "No lifecycle actions recorded for this trade"}, status_code=404)
+    return LifecycleJSONResponse(state)
+
+@router.get("/api/lifecycle/{trade_id}/history")
+def api_lifecycle_history(trade_id: str):
+    """Every lifecycle action recorded for a trade, oldest first"""
+    return LifecycleJSONResponse(lifecycle_event_log.history(trade_id))
+
+@router.post("/api/lifecycle/compact")
+def api_compact_lifecycle():
+    return LifecycleJSONResponse({"compacted": lifecycle_event_log.compact()})
 
 @router.get("/download/Early-Redemption")
 def download_early_redemption_file():
@@ -508,38 +493,27 @@ def download_event_file(event_type: str):
 def api_maturity_forex_trades():
     """Fetch only necessary FX trade data from Firebase for maturity events UI table"""
     try:
-        db = get_firestore_client()
-        logger.info("Debug: Fetching minimal data from fx_capture collection for maturity-forex")
-        
-        # Query all trades and select only necessary fields
-        all_trades = []
-        for doc in db.collection("fx_capture").stream():
-            trade_data = doc.to_dict()
-            trade_id = trade_data.get('TradeID', trade_data.get('trade_id', trade_data.get('id', '')))
-            
-            # Extract only the fields needed for UI table - using frontend-expected field names
-            ui_trade = {
-                "TradeID": trade_id,
-                "Symbol": trade_data.get('CurrencyPair', ''),
-                "CurrencyPair": trade_data.get('CurrencyPair', ''),
-                "EventType": "Maturity",
-                "event_type": "Maturity",
-                "EventDate": trade_data.get('MaturityDate', trade_data.get('SettlementDate', '')),
-                "TradeDate": trade_data.get('TradeDate', ''),
-                "Instrument": "Forex"  # Add Instrument field for frontend filtering
-            }
-            all_trades.append(ui_trade)
-        
-        logger.info(f"Debug: Found {len(all_trades)} trades for maturity-forex UI table")
-        logger.info(f"Debug: Returning minimal data for {len(all_trades)} trades")
-        
-        return JSONResponse(all_trades)
-        
+        trades, _ = query_fx_trades(
+            get_firestore_client(),
+            fields=['TradeID', 'CurrencyPair', 'MaturityDate', 'SettlementDate', 'TradeDate'],
+        )
     except Exception as e:
-        logger.error(f"Debug: Error fetching from fx_capture: {e}")
-        import traceback
-        logger.error(f"Debug: Full traceback: {traceback.format_exc()}")
-        return JSONResponse([])
+        logger.error(f"Error fetching from fx_capture: {e}")
+        return LifecycleJSONResponse([])
+    # Extract only the fields needed for UI table - using frontend-expected field names
+    return LifecycleJSONResponse([
+        {
+            "TradeID": trade.get('TradeID', ''),
+            "Symbol": trade.get('CurrencyPair', ''),
+            "CurrencyPair": trade.get('CurrencyPair', ''),
+            "EventType": "Maturity",
+            "event_type": "Maturity",
+            "EventDate": trade.get('MaturityDate', trade.get('SettlementDate', '')),
+            "TradeDate": trade.get('TradeDate', ''),
+            "Instrument": "Forex"  # Add Instrument field for frontend filtering
+        }
+        for trade in trades
+    ])
 
 @router.get("/api/event/maturity-forex/trade/{trade_id}")
 def api_maturity_forex_trade(trade_id: str):
@@ -548,12 +522,11 @@ def api_maturity_forex_trade(trade_id: str):
     logger.info(f"Looking for trade {trade_id} in {filename}")
     if not os.path.exists(filename):
         logger.error(f"File {filename} not found!")
-        return JSONResponse({"error": "Trade not found"}, status_code=404)
+        return LifecycleJSONResponse({"error": "Trade not found"}, status_code=404)
     
     # Load and clean data
     df = pd.read_csv(filename)
     df.columns = df.columns.str.strip()
-    df = df.replace([np.inf, -np.inf], np.nan).fillna('')
     
     # Clean trade IDs in DataFrame and search parameter
     df['TradeID'] = df['TradeID'].astype(str).str.strip()
@@ -569,12 +542,12 @@ def api_maturity_forex_trade(trade_id: str):
     logger.info(f"Found trade? {not trade.empty}")
     
     if trade.empty:
-        return JSONResponse({"error": "Trade not found"}, status_code=404)
+        return LifecycleJSONResponse({"error": "Trade not found"}, status_code=404)
     
-    # Clean and return the trade data
-    trade_dict = trade.iloc[0].to_dict()
-    cleaned_trade = clean_for_json(trade_dict)
-    return JSONResponse(cleaned_trade)
+    trade = add_settlement_columns(trade.head(1).copy())
+    trade = trade.replace([np.inf, -np.inf], np.nan)
+    trade = trade.astype(object).where(trade.notna(), '')
+    return LifecycleJSONResponse(trade.iloc[0].to_dict())
 
 # Removed duplicate router and endpoint definitions
 
@@ -583,128 +556,43 @@ def api_maturity_forex_trade(trade_id: str):
 def approve_maturity_forex_trade(trade_id: str):
     # This function needs to be updated to use a repository for approvals
     # For now, it will just return a placeholder response
-    return JSONResponse({"status": "approved (placeholder)"})
+    return LifecycleJSONResponse({"status": "approved (placeholder)"})
 
 @router.get("/api/event/maturity-forex/approved/{trade_id}")
 def is_maturity_forex_trade_approved(trade_id: str):
     # This function needs to be updated to use a repository for approvals
     # For now, it will just return a placeholder response
-    return JSONResponse({"approved": False}) # Placeholder
+    return LifecycleJSONResponse({"approved": False}) # Placeholder
 
 @router.get("/api/event/maturity-forex/download-json")
 def download_maturity_forex_json():
-    filename = "filtered_trades/Maturity_Forex.csv"
-    if not os.path.exists(filename):
-        return JSONResponse([])
-    df = pd.read_csv(filename)
-    df.columns = df.columns.str.strip()
-    df['TradeID'] = df['TradeID'].astype(str).str.strip()
-    # Load approvals
-    # This function needs to be updated to use a repository for approvals
-    # For now, it will just return an empty list
-    approvals = [] # Placeholder
-    approvals_clean = {tid.strip().upper() for tid in approvals}
-    # Calculate final amount for each trade
-    def calc_final_amount(row):
-        try:
-            currency_pair = row.get('CurrencyPair', '')
-            dealt_currency = row.get('DealtCurrency', row.get('Dealt Currency', ''))
-            base_currency = row.get('BaseCurrency', row.get('Base Currency', ''))
-            term_currency = row.get('TermCurrency', row.get('Term Currency', ''))
-            notional_amount = float(row.get('NotionalAmount', row.get('Notional Amount', 0)))
-            fx_rate = float(row.get('FXRate', row.get('FX Rate', 0)))
-            if dealt_currency == base_currency:
-                if base_currency == currency_pair.split('/')[0]:
-                    other_amount = notional_amount * fx_rate
-                    other_currency = term_currency
-                else:
-                    return 'Base/currency pair mismatch'
-            elif dealt_currency == term_currency:
-                if term_currency == currency_pair.split('/')[1]:
-                    other_amount = notional_amount / fx_rate
-                    other_currency = base_currency
-                else:
-                    return 'Term/currency pair mismatch'
-            else:
-                return 'Dealt currency must be base or term'
-            if isinstance(other_amount, float):
-                return f"{other_amount:,.2f} {other_currency}"
-            else:
-                return str(other_amount)
-        except Exception as e:
-            return 'N/A'
-    trades = []
-    for row in df.to_dict(orient='records'):
-        trade_id_clean = str(row.get('TradeID', '')).strip().upper()
-        row['FinalAmount'] = calc_final_amount(row)
-        row['Approved'] = trade_id_clean in approvals_clean # Placeholder
-        trades.append(row)
-    # Write to a temp file and return as download
-    import tempfile, json
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.json', mode='w', encoding='utf-8') as tmpf:
-        json.dump(trades, tmpf, indent=2)
-        tmpf.flush()
-        tmpf_name = tmpf.name
-    from fastapi.responses import FileResponse
-    return FileResponse(tmpf_name, filename='maturity_forex_trades.json', media_type='application/json')
+    if not os.path.exists(MATURITY_FOREX_FILE):
+        return LifecycleJSONResponse([])
+    return StreamingResponse(
+        stream_json_array(iter_maturity_forex_export()),
+        media_type='application/json',
+        headers={'Content-Disposition': 'attachment; filename="maturity_forex_trades.json"'}
+    )
+
+@router.get("/api/event/maturity-forex/download-ndjson")
+def download_maturity_forex_ndjson():
+    if not os.path.exists(MATURITY_FOREX_FILE):
+        return LifecycleJSONResponse([])
+    return StreamingResponse(
+        stream_ndjson(iter_maturity_forex_export()),
+        media_type='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename="maturity_forex_trades.ndjson"'}
+    )
 
 @router.get("/api/event/maturity-forex/download-csv")
 def download_maturity_forex_csv():
-    filename = "filtered_trades/Maturity_Forex.csv"
-    if not os.path.exists(filename):
-        return JSONResponse([])
-    df = pd.read_csv(filename)
-    df.columns = df.columns.str.strip()
-    df['TradeID'] = df['TradeID'].astype(str).str.strip()
-    # Load approvals
-    # This function needs to be updated to use a repository for approvals
-    # For now, it will just return an empty set
-    approvals = set() # Placeholder
-    approvals_clean = {tid.strip().upper() for tid in approvals}
-    # Calculate final amount for each trade
-    def calc_final_amount(row):
-        try:
-            currency_pair = row.get('CurrencyPair', '')
-            dealt_currency = row.get('DealtCurrency', row.get('Dealt Currency', ''))
-            base_currency = row.get('BaseCurrency', row.get('Base Currency', ''))
-            term_currency = row.get('TermCurrency', row.get('Term Currency', ''))
-            notional_amount = float(row.get('NotionalAmount', row.get('Notional Amount', 0)))
-            fx_rate = float(row.get('FXRate', row.get('FX Rate', 0)))
-            if dealt_currency == base_currency:
-                if base_currency == currency_pair.split('/')[0]:
-                    other_amount = notional_amount * fx_rate
-                    other_currency = term_currency
-                else:
-                    return 'Base/currency pair mismatch'
-            elif dealt_currency == term_currency:
-                if term_currency == currency_pair.split('/')[1]:
-                    other_amount = notional_amount / fx_rate
-                    other_currency = base_currency
-                else:
-                    return 'Term/currency pair mismatch'
-            else:
-                return 'Dealt currency must be base or term'
-            if isinstance(other_amount, float):
-                return f"{other_amount:,.2f} {other_currency}"
-            else:
-                return str(other_amount)
-        except Exception as e:
-            return 'N/A'
-    trades = []
-    for row in df.to_dict(orient='records'):
-        trade_id_clean = str(row.get('TradeID', '')).strip().upper()
-        row['FinalAmount'] = calc_final_amount(row)
-        row['Approved'] = trade_id_clean in approvals_clean # Placeholder
-        trades.append(row)
-    # Write to a temp file and return as download
-    import tempfile
-    df_out = pd.DataFrame(trades)
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.csv', mode='w', encoding='utf-8', newline='') as tmpf:
-        df_out.to_csv(tmpf, index=False)
-        tmpf.flush()
-        tmpf_name = tmpf.name
-    from fastapi.responses import FileResponse
-    return FileResponse(tmpf_name, filename='maturity_forex_trades.csv', media_type='text/csv')
+    if not os.path.exists(MATURITY_FOREX_FILE):
+        return LifecycleJSONResponse([])
+    return StreamingResponse(
+        stream_csv(iter_maturity_forex_export()),
+        media_type='text/csv',
+        headers={'Content-Disposition': 'attachment; filename="maturity_forex_trades.csv"'}
+    )
 
 @router.get("/api/reconciliation/equity")
 def get_equity_reconciliation():
@@ -745,7 +633,7 @@ def get_equity_reconciliation():
                 'Reason': reason,
                 'Actions': '<button>Investigate</button>'
             })
-    return JSONResponse(recs)
+    return LifecycleJSONResponse(recs)
 
 @router.get("/api/consolidated-data")
 def get_consolidated_data():
@@ -784,7 +672,7 @@ def get_consolidated_data():
     for item in nwm_management:
         row = {col: item.get(col.replace(" ", ""), None) for col in CONSOLIDATED_COLUMNS}
         consolidated.append(row)
-    return JSONResponse(consolidated)
+    return LifecycleJSONResponse(consolidated)
 
 
 
@@ -2,6 +2,9 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from .api.routes import router
+from .services.event_scheduler import event_processor, snapshot_compactor, SCHEDULER_ENABLED, COMPACTION_ENABLED
+from .services.upload_jobs import upload_job_manager
+from .services.fx_capture_feed import fx_capture_feed, FX_CALENDAR_ENABLED
 import os
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -27,6 +30,37 @@ templates = Jinja2Templates(directory="frontend/templates")
 # Include the API router
 app.include_router(router, prefix="/api/trade-lifecycle")
 
+@app.on_event("startup")
+def recover_upload_jobs():
+    upload_job_manager.recover_interrupted()
+
+@app.on_event("startup")
+def start_fx_capture_feed():
+    if FX_CALENDAR_ENABLED:
+        fx_capture_feed.start()
+
+@app.on_event("shutdown")
+def stop_fx_capture_feed():
+    fx_capture_feed.close()
+
+@app.on_event("startup")
+def start_event_scheduler():
+    if SCHEDULER_ENABLED:
+        event_processor.start()
+
+@app.on_event("shutdown")
+def stop_event_scheduler():
+    event_processor.stop()
+
+@app.on_event("startup")
+def start_snapshot_compactor():
+    if COMPACTION_ENABLED:
+        snapshot_compactor.start()
+
+@app.on_event("shutdown")
+def stop_snapshot_compactor():
+    snapshot_compactor.stop()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("services.trade_lifecycle.app:app", host="0.0.0.0", port=8024, reload=True)
\ No newline at end of file
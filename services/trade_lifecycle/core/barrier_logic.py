@@ -0,0 +1,356 @@
+import os
+import re
+import logging
+import threading
+import numpy as np
+import pandas as pd
+from services.trade_lifecycle.db.event_calendar import event_calendar
+from services.trade_lifecycle.db.trade_index import trade_index, _trade_id_column
+from services.trade_lifecycle.db.lifecycle_store import lifecycle_store
+from services.trade_lifecycle.core.early_redemption_logic import parse_observation_months, observation_schedule
+from services.trade_lifecycle.utils.datetime_utils import parse_date
+
+logger = logging.getLogger(__name__)
+
+BARRIER_FILE = 'filtered_trades/Barrier-Monitoring.csv'
+BARRIER_EVENT = 'Barrier-Monitoring'
+BARRIER_NAMESPACE = 'barrier_status'
+WATERMARK_NAMESPACE = 'barrier_watermarks'
+
+# Local price history the barriers are evaluated against (CSV or Parquet)
+BARRIER_PRICES_PATH = os.environ.get('LIFECYCLE_BARRIER_PRICES_PATH', 'data/barrier_prices.csv')
+# Ticks per block when scanning for the first crossing
+BARRIER_BLOCK_SIZE = int(os.environ.get('LIFECYCLE_BARRIER_BLOCK_SIZE', '4096'))
+
+MATURITY_DATE_COLUMNS = ['Maturity Date', 'MaturityDate']
+TRADE_DATE_COLUMNS = ['Trade Date', 'TradeDate']
+UNDERLYING_COLUMNS = ['Underlying', 'Symbol', 'CurrencyPair']
+INITIAL_PRICE_COLUMNS = ['Initial Price', 'Price', 'FXRate']
+BARRIER_LEVEL_COLUMNS = ['Barrier Level', 'BarrierLevel']
+AUTOCALL_LEVEL_COLUMN = 'Auto-call level'
+BARRIER_TYPE_COLUMNS = ['Barrier Type', 'BarrierType']
+
+TICK_TIME_COLUMNS = ['timestamp', 'Timestamp', 'datetime', 'Datetime', 'date', 'Date', 'time', 'Time']
+TICK_SYMBOL_COLUMNS = ['symbol', 'Symbol', 'underlying', 'Underlying', 'CurrencyPair', 'ticker', 'Ticker']
+TICK_PRICE_COLUMNS = ['price', 'Price', 'close', 'Close', 'rate', 'Rate', 'FXRate']
+
+DAY_NS = 86_400 * 10**9
+
+def barrier_event_dates(trade):
+    """Barrier observation dates, or just the maturity date for trades without an observation schedule"""
+    obs_months = parse_observation_months(trade.get('Observation Dates', None))
+    if obs_months:
+        return observation_schedule(parse_date(trade.get('Trade Date', '')), obs_months)
+    for col in MATURITY_DATE_COLUMNS:
+        maturity_date = parse_date(trade.get(col, ''))
+        if maturity_date:
+            return [maturity_date]
+    return []
+
+event_calendar.register(BARRIER_EVENT, BARRIER_FILE, barrier_event_dates)
+
+def _first_value(trade, columns):
+    for col in columns:
+        value = trade.get(col)
+        if value is not None and not (isinstance(value, float) and np.isnan(value)) and str(value).strip():
+            return value
+    return None
+
+def _to_float(value):
+    try:
+        return float(str(value).replace(',', '').strip())
+    except (ValueError, TypeError):
+        return None
+
+def _parse_level(value, initial_price):
+    # '105%' is relative to the initial price, anything else is an absolute level
+    text = str(value).strip()
+    if text.endswith('%'):
+        pct = _to_float(text[:-1])
+        return pct / 100.0 * initial_price if pct is not None and initial_price else None
+    return _to_float(text)
+
+def _day_ns(value, end_of_day=False):
+    parsed = parse_date(value) if value is not None else None
+    if parsed is None:
+        return None
+    ns = pd.Timestamp(parsed).value
+    return ns + DAY_NS - 1 if end_of_day else ns
+
+def barrier_terms(trade):
+    """
+    Barrier terms for one trade row, or None when the row has no usable barrier.
+
+    The level comes from 'Barrier Level' or, failing that, 'Auto-call level'
+    (an auto-call is an up-and-out barrier); a trailing '%' makes it relative
+    to the initial price. 'Barrier Type' may say up/down and in/out; a missing
+    direction is taken from where the level sits against the initial price.
+    The barrier is monitored from the trade date through the maturity date.
+    """
+    underlying = _first_value(trade, UNDERLYING_COLUMNS)
+    initial_price = _to_float(_first_value(trade, INITIAL_PRICE_COLUMNS))
+    raw_level = _first_value(trade, BARRIER_LEVEL_COLUMNS)
+    autocall = raw_level is None
+    if autocall:
+        raw_level = _first_value(trade, [AUTOCALL_LEVEL_COLUMN])
+    if underlying is None or raw_level is None:
+        return None
+    level = _parse_level(raw_level, initial_price)
+    if level is None:
+        return None
+    # e.g. 'Down-and-In', 'knock out', 'KI'
+    words = set(re.split(r'[\s\-_/]+', str(_first_value(trade, BARRIER_TYPE_COLUMNS) or '').lower()))
+    if words & {'in', 'ki', 'knockin'}:
+        knock = 'in'
+    elif words & {'out', 'ko', 'knockout'}:
+        knock = 'out'
+    else:
+        knock = 'out' if autocall else 'in'
+    if 'up' in words:
+        direction = 'up'
+    elif 'down' in words:
+        direction = 'down'
+    else:
+        direction = 'up' if initial_price is None or level >= initial_price else 'down'
+    return {
+        'underlying': str(underlying).strip(),
+        'level': level,
+        'direction': direction,
+        'knock': knock,
+        'start_ns': _day_ns(_first_value(trade, TRADE_DATE_COLUMNS)),
+        'end_ns': _day_ns(_first_value(trade, MATURITY_DATE_COLUMNS), end_of_day=True),
+    }
+
+def _pick_column(columns, candidates, what):
+    for col in candidates:
+        if col in columns:
+            return col
+    raise ValueError(f"Price series has no {what} column (expected one of {candidates})")
+
+def _is_parquet(name):
+    return str(name).lower().endswith(('.parquet', '.pq'))
+
+def _parse_timestamps(values):
+    """Tick times as naive UTC; offsets are converted and times without one are taken as UTC"""
+    ts = pd.to_datetime(values, errors='coerce', utc=True, format='ISO8601')
+    # Anything not in ISO 8601 (e.g. 03/01/2024) is parsed value by value
+    retry = ts.isna() & values.notna()
+    if retry.any():
+        ts[retry] = pd.to_datetime(values[retry], errors='coerce', utc=True, format='mixed')
+    return ts.dt.tz_localize(None)
+
+def read_price_series(source, filename=None):
+    """
+    Load ticks from a CSV or Parquet file (path or file object) as a frame of
+    symbol, ts (int64 ns) and price, sorted by symbol then time.
+    """
+    name = filename or getattr(source, 'name', source)
+    if _is_parquet(name):
+        df = pd.read_parquet(source)
+    else:
+        df = pd.read_csv(source)
+    df.columns = df.columns.str.strip()
+    time_col = _pick_column(df.columns, TICK_TIME_COLUMNS, 'timestamp')
+    symbol_col = _pick_column(df.columns, TICK_SYMBOL_COLUMNS, 'symbol')
+    price_col = _pick_column(df.columns, TICK_PRICE_COLUMNS, 'price')
+    ticks = pd.DataFrame({
+        'symbol': df[symbol_col].astype(str).str.strip(),
+        'ts': _parse_timestamps(df[time_col]),
+        'price': pd.to_numeric(df[price_col], errors='coerce'),
+    }).dropna()
+    ticks['ts'] = ticks['ts'].astype('datetime64[ns]').astype('int64')
+    return ticks.sort_values(['symbol', 'ts'], kind='stable').reset_index(drop=True)
+
+def append_price_series(path, ticks):
+    """
+    Add ticks (as returned by read_price_series) to the price series at path,
+    in the file's own column names. CSV files are appended to; Parquet files
+    are rewritten, since Parquet cannot be appended in place.
+    """
+    if ticks.empty:
+        return
+    times = pd.to_datetime(ticks['ts'].to_numpy())
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        rows = pd.DataFrame({'timestamp': times, 'symbol': ticks['symbol'].to_numpy(), 'price': ticks['price'].to_numpy()})
+        if _is_parquet(path):
+            rows.to_parquet(path, index=False)
+        else:
+            rows.to_csv(path, index=False)
+        return
+    existing = pd.read_parquet(path) if _is_parquet(path) else pd.read_csv(path, nrows=0)
+    columns = list(existing.columns)
+    stripped = [col.strip() for col in columns]
+    time_col = columns[stripped.index(_pick_column(stripped, TICK_TIME_COLUMNS, 'timestamp'))]
+    symbol_col = columns[stripped.index(_pick_column(stripped, TICK_SYMBOL_COLUMNS, 'symbol'))]
+    price_col = columns[stripped.index(_pick_column(stripped, TICK_PRICE_COLUMNS, 'price'))]
+    if _is_parquet(path):
+        stored = existing[time_col].dtype
+        if isinstance(stored, pd.DatetimeTZDtype):
+            times = times.tz_localize('UTC').tz_convert(stored.tz)
+        elif not pd.api.types.is_datetime64_any_dtype(stored):
+            times = times.astype(str)
+    rows = pd.DataFrame({col: pd.Series([None] * len(ticks), dtype=object) for col in columns})
+    rows[time_col] = times
+    rows[symbol_col] = ticks['symbol'].to_numpy()
+    rows[price_col] = ticks['price'].to_numpy()
+    if _is_parquet(path):
+        tmp_path = f"{path}.tmp"
+        pd.concat([existing, rows], ignore_index=True).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    else:
+        rows.to_csv(path, mode='a', header=False, index=False)
+
+class _Series:
+    """One underlying's ticks with per-block extremes for fast first-crossing search"""
+
+    def __init__(self, ts, prices, block_size):
+        self.ts = ts
+        self.prices = prices
+        self.block_size = block_size
+        n_blocks = -(-len(prices) // block_size)
+        padded = np.full(n_blocks * block_size, np.nan)
+        padded[:len(prices)] = prices
+        blocks = padded.reshape(n_blocks, block_size)
+        self.block_max = np.nanmax(blocks, axis=1) if n_blocks else np.empty(0)
+        self.block_min = np.nanmin(blocks, axis=1) if n_blocks else np.empty(0)
+
+    def first_crossing(self, level, direction, start, end):
+        """Index of the first tick in [start, end) at or beyond level, or None"""
+        if start >= end:
+            return None
+        size = self.block_size
+        hits = (lambda values: values >= level) if direction == 'up' else (lambda values: values <= level)
+        head_end = min(end, (start // size + 1) * size)
+        hit = hits(self.prices[start:head_end])
+        if hit.any():
+            return start + int(hit.argmax())
+        if head_end >= end:
+            return None
+        first_block, last_block = head_end // size, -(-end // size)
+        extremes = self.block_max if direction == 'up' else self.block_min
+        block_hit = hits(extremes[first_block:last_block])
+        if not block_hit.any():
+            return None
+        block = first_block + int(block_hit.argmax())
+        lo = block * size
+        hit = hits(self.prices[lo:min(end, lo + size)])
+        # Only the last block can run past end, where its extreme may lie outside the window
+        return lo + int(hit.argmax()) if hit.any() else None
+
+class BarrierMonitor:
+    """
+    Knock-in/knock-out evaluation of every barrier trade against a price series.
+
+    Ticks are grouped by underlying into sorted arrays; for each trade the
+    first crossing inside its monitoring window is found by scanning block
+    maxima/minima and then a single block, so a trade costs a few NumPy passes
+    over block extremes rather than one over every tick. Crossings are
+    recorded in the lifecycle store together with a per-underlying watermark,
+    and append() only evaluates ticks newer than the watermark for trades that
+    have not been hit yet. Appended ticks are also added to the price series
+    file, so a later full evaluate() finds the same crossings.
+    """
+
+    def __init__(self, filename=BARRIER_FILE, block_size=BARRIER_BLOCK_SIZE, prices_path=BARRIER_PRICES_PATH):
+        self.filename = filename
+        self.block_size = max(1, block_size)
+        self.prices_path = prices_path
+        self._lock = threading.Lock()
+
+    def load_trades(self):
+        """{trade_id: terms} for every barrier trade with usable terms"""
+        rows = trade_index.get_rows(self.filename)
+        id_col = _trade_id_column(trade_index.get_columns(self.filename))
+        trades = {}
+        if not id_col:
+            return trades
+        for row in rows:
+            trade_id = str(row.get(id_col, '')).strip()
+            terms = barrier_terms(row)
+            if trade_id and terms and trade_id not in trades:
+                trades[trade_id] = terms
+        return trades
+
+    def _evaluate(self, ticks, trades, skip):
+        """New crossings {trade_id: status} for trades not in skip"""
+        by_underlying = {}
+        for trade_id, terms in trades.items():
+            if trade_id not in skip:
+                by_underlying.setdefault(terms['underlying'], []).append((trade_id, terms))
+        if not by_underlying or ticks.empty:
+            return {}
+        symbols = ticks['symbol'].to_numpy()
+        bounds = np.flatnonzero(np.r_[True, symbols[1:] != symbols[:-1], True])
+        all_ts = ticks['ts'].to_numpy()
+        all_prices = ticks['price'].to_numpy(dtype=float)
+        crossings = {}
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            members = by_underlying.get(symbols[lo])
+            if not members:
+                continue
+            series = _Series(all_ts[lo:hi], all_prices[lo:hi], self.block_size)
+            starts = np.searchsorted(series.ts, [terms['start_ns'] or np.iinfo(np.int64).min for _, terms in members], side='left')
+            ends = np.searchsorted(series.ts, [terms['end_ns'] or np.iinfo(np.int64).max for _, terms in members], side='right')
+            for (trade_id, terms), start, end in zip(members, starts, ends):
+                index = series.first_crossing(terms['level'], terms['direction'], int(start), int(end))
+                if index is None:
+                    continue
+                crossings[trade_id] = {
+                    **terms,
+                    'status': 'knocked_in' if terms['knock'] == 'in' else 'knocked_out',
+                    'hit_at': pd.Timestamp(int(series.ts[index])).isoformat(),
+                    'hit_price': float(series.prices[index]),
+                }
+        return crossings
+
+    def _save(self, crossings, ticks):
+        lifecycle_store.put_many(BARRIER_NAMESPACE, crossings, trade_id_for=lambda trade_id: trade_id)
+        if not ticks.empty:
+            last = ticks.groupby('symbol', sort=False)['ts'].max()
+            lifecycle_store.put_many(WATERMARK_NAMESPACE, {symbol: int(ts) for symbol, ts in last.items()})
+
+    def evaluate(self, ticks):
+        """Evaluate every barrier trade against the full series, replacing any earlier results"""
+        with self._lock:
+            trades = self.load_trades()
+            crossings = self._evaluate(ticks, trades, skip=set())
+            lifecycle_store.delete_namespace(BARRIER_NAMESPACE)
+            lifecycle_store.delete_namespace(WATERMARK_NAMESPACE)
+            self._save(crossings, ticks)
+            logger.info(f"Evaluated {len(trades)} barrier trades over {len(ticks)} ticks: {len(crossings)} crossed")
+            return crossings
+
+    def append(self, ticks):
+        """
+        Evaluate only ticks newer than each underlying's watermark and add them
+        to the price series file; returns the new crossings
+        """
+        with self._lock:
+            watermarks = lifecycle_store.items(WATERMARK_NAMESPACE)
+            if watermarks and not ticks.empty:
+                floor = ticks['symbol'].map(watermarks).fillna(np.iinfo(np.int64).min)
+                stale = ticks['ts'] <= floor
+                if stale.any():
+                    logger.warning(f"Ignoring {int(stale.sum())} ticks at or before the last evaluated tick")
+                    ticks = ticks[~stale]
+            append_price_series(self.prices_path, ticks)
+            trades = self.load_trades()
+            crossings = self._evaluate(ticks, trades, skip=set(lifecycle_store.items(BARRIER_NAMESPACE)))
+            self._save(crossings, ticks)
+            logger.info(f"Appended {len(ticks)} ticks: {len(crossings)} new barrier crossings")
+            return crossings
+
+    def status(self):
+        """Current state of every barrier trade"""
+        hit = lifecycle_store.items(BARRIER_NAMESPACE)
+        result = []
+        for trade_id, terms in self.load_trades().items():
+            if trade_id in hit:
+                result.append({'trade_id': trade_id, **hit[trade_id]})
+            else:
+                status = 'not_knocked_in' if terms['knock'] == 'in' else 'alive'
+                result.append({'trade_id': trade_id, **terms, 'status': status, 'hit_at': None, 'hit_price': None})
+        return result
+
+barrier_monitor = BarrierMonitor()
@@ -1,33 +1,24 @@
 import os
-import json
 from datetime import datetime, timedelta
-import pandas as pd
 import math
+from services.trade_lifecycle.db.trade_index import trade_index
+from services.trade_lifecycle.db.lifecycle_store import lifecycle_store
+from services.trade_lifecycle.db.event_calendar import event_calendar
+from services.trade_lifecycle.utils.datetime_utils import parse_date
 
 APPROVALS_FILE = 'coupon_approvals.json'
 PAYMENTS_FILE = 'coupon_payments.json'
 
-# Load or initialize approvals
-if os.path.exists(APPROVALS_FILE):
-    with open(APPROVALS_FILE, 'r') as f:
-        coupon_approvals = json.load(f)
-else:
-    coupon_approvals = {}
+APPROVALS_NAMESPACE = 'coupon_approvals'
+PAYMENTS_NAMESPACE = 'coupon_payments'
+COUPON_EVENT = 'Coupon Rate'
 
-# Load or initialize payments
-if os.path.exists(PAYMENTS_FILE):
-    with open(PAYMENTS_FILE, 'r') as f:
-        coupon_payments = json.load(f)
-else:
-    coupon_payments = {}
-
-def save_approvals():
-    with open(APPROVALS_FILE, 'w') as f:
-        json.dump(coupon_approvals, f, indent=2)
-
-def save_payments():
-    with open(PAYMENTS_FILE, 'w') as f:
-        json.dump(coupon_payments, f, indent=2)
+# Carry over any state from the legacy JSON files on first start
+lifecycle_store.import_json(APPROVALS_NAMESPACE, APPROVALS_FILE)
+lifecycle_store.import_json(
+    PAYMENTS_NAMESPACE, PAYMENTS_FILE,
+    trade_id_for=lambda key, value: value.get('trade_id') if isinstance(value, dict) else None
+)
 
 def safe_float(value):
     """Convert value to float safely, handling inf/nan values"""
@@ -41,38 +32,6 @@ def safe_float(value):
     except (ValueError, TypeError):
         return None
 
-def parse_date(date_str):
-    """Parse date string in various formats"""
-    if not date_str or str(date_str).lower() == 'nan':
-        return None
-    
-    date_str = str(date_str).strip()
-    
-    # Try YYYY-DD-MM format first (as seen in the data: 2025-23-07)
-    if date_str.count('-') == 2:
-        try:
-            parts = date_str.split('-')
-            if len(parts) == 3:
-                yyyy = int(parts[0])
-                dd = int(parts[1])
-                mm = int(parts[2])
-                # Check if this is YYYY-DD-MM format (day > 12)
-                if dd > 12 and mm <= 12:
-                    return datetime(yyyy, mm, dd).date()
-        except (ValueError, TypeError):
-            pass
-    
-    # Try standard formats
-    formats = ['%m/%d/%Y', '%Y-%m-%d', '%m/%d/%y', '%Y/%m/%d', '%d/%m/%Y']
-    
-    for fmt in formats:
-        try:
-            return datetime.strptime(date_str, fmt).date()
-        except ValueError:
-            continue
-    
-    return None
-
 def calculate_coupon_due_dates(trade_date, coupon_schedule):
     """Calculate when coupon payments are due based on schedule"""
     if not trade_date or not coupon_schedule or str(coupon_schedule).lower() == 'nan':
@@ -109,8 +68,11 @@ def calculate_coupon_due_dates(trade_date, coupon_schedule):
     
     return due_dates
 
-def is_coupon_due(trade_id, trade_date, coupon_schedule):
-    """Check if a coupon payment is currently due and within the allowed time window"""
+def is_coupon_due(trade_id, trade_date, coupon_schedule, due_dates=None):
+    """
+    Check if a coupon payment is currently due and within the allowed time window.
+    due_dates may be passed in when already known (e.g. from the event calendar).
+    """
     if not trade_id or not trade_date or not coupon_schedule or str(coupon_schedule).lower() == 'nan':
         return False
     
@@ -137,110 +99,140 @@ def is_coupon_due(trade_id, trade_date, coupon_schedule):
     if days_since_trade > time_limit_days:
         return False  # Too much time has passed
     
-    due_dates = calculate_coupon_due_dates(trade_date, coupon_schedule)
+    if due_dates is None:
+        due_dates = calculate_coupon_due_dates(trade_date, coupon_schedule)
     
     # Check if any due date is within the last 30 days (payment window)
     for due_date in due_dates:
         if due_date <= today <= due_date + timedelta(days=30):
             # Check if this payment hasn't been made yet
             payment_key = f"{trade_id}_{due_date.strftime('%Y-%m-%d')}"
-            if payment_key not in coupon_payments:
+            if lifecycle_store.get(PAYMENTS_NAMESPACE, payment_key) is None:
                 return True
     
     return False
 
-def get_coupon_trades():
-    filenames = ['filtered_trades/Coupon_Rate.csv', 'filtered_trades/Coupon Rate.csv']
-    filename = None
-    for fname in filenames:
+COUPON_FILENAMES = ['filtered_trades/Coupon_Rate.csv', 'filtered_trades/Coupon Rate.csv']
+COUPON_RATE_COLUMNS = ['coupon rate', 'couponrate', 'coupon_rate']
+COUPON_SCHEDULE_COLUMNS = ['coupon schedule', 'couponschedule', 'coupon_schedule', 'schedule']
+
+def get_coupon_filename():
+    for fname in COUPON_FILENAMES:
         if os.path.exists(fname):
-            filename = fname
+            return fname
+    return None
+
+def find_column(columns, candidates):
+    """Return the first column whose stripped, lower-cased name is in candidates"""
+    for col in columns:
+        if col.strip().lower() in candidates:
+            return col
+    return None
+
+def coupon_event_dates(trade):
+    schedule_col = find_column(trade.keys(), COUPON_SCHEDULE_COLUMNS)
+    coupon_schedule = trade.get(schedule_col, None) if schedule_col else None
+    return calculate_coupon_due_dates(trade.get('Trade Date', ''), coupon_schedule)
+
+event_calendar.register(COUPON_EVENT, COUPON_FILENAMES[0], coupon_event_dates)
+
+def calculate_coupon_payment(coupon_rate, trade_value):
+    coupon_payment = 0
+    if coupon_rate and trade_value and trade_value > 0:
+        try:
+            rate = safe_float(str(coupon_rate).replace('%', '').strip())
+            if rate is not None and rate > 0:
+                coupon_payment = (rate / 100) * trade_value
+                if math.isnan(coupon_payment) or math.isinf(coupon_payment):
+                    coupon_payment = 0
+        except (ValueError, TypeError):
+            coupon_payment = 0
+    return coupon_payment
+
+def get_last_payment_date(trade_id):
+    last_payment_date = None
+    for payment_data in lifecycle_store.find_by_trade(PAYMENTS_NAMESPACE, trade_id).values():
+        if payment_data.get('trade_id') == trade_id:
+            payment_date = payment_data.get('paid_date')
+            if payment_date:
+                if last_payment_date is None or payment_date > last_payment_date:
+                    last_payment_date = payment_date
+    return last_payment_date
+
+def build_coupon_trade(trade, rate_col, schedule_col, today=None):
+    """Compute the coupon schedule state for a single trade row (refresh the event calendar first)"""
+    today = today or datetime.now().date()
+    trade_id = str(trade.get('Trade ID', ''))
+    coupon_rate = trade.get(rate_col, None) if rate_col else None
+    coupon_schedule = trade.get(schedule_col, None) if schedule_col else None
+    trade_date = trade.get('Trade Date', '')
+    # Get trade value safely
+    trade_value = safe_float(trade.get('Trade Value', 0))
+    if trade_value is None:
+        trade_value = 0
+    coupon_payment = calculate_coupon_payment(coupon_rate, trade_value)
+    # Due dates come from the event calendar; trades it does not hold are computed here
+    due_dates = event_calendar.dates_for(COUPON_EVENT, trade_id, refresh=False)
+    if due_dates is None:
+        due_dates = calculate_coupon_due_dates(trade_date, coupon_schedule)
+    is_due = is_coupon_due(trade_id, trade_date, coupon_schedule, due_dates=due_dates)
+    # Get next due date
+    next_due_date = None
+    for due_date in due_dates:
+        if due_date > today:
+            next_due_date = due_date
             break
+    last_payment_date = get_last_payment_date(trade_id)
+    return {
+        **trade,
+        'Coupon Rate': coupon_rate if coupon_rate is not None else 'N/A',
+        'Coupon Schedule': coupon_schedule if coupon_schedule is not None else 'N/A',
+        'Trade Date': trade_date,
+        'Trade Value': trade_value,
+        'Coupon Payment': coupon_payment,
+        'Coupon Paid': last_payment_date if last_payment_date else 'Not Paid',
+        'Coupon Due': is_due,
+        'Next Due Date': next_due_date.strftime('%Y-%m-%d') if next_due_date else 'N/A',
+        'Payment Status': 'Due' if is_due else 'Not Due'
+    }
+
+def get_coupon_trades():
+    filename = get_coupon_filename()
     if not filename:
         return []
-    df = pd.read_csv(filename)
-    df.columns = df.columns.str.strip()
-    trades = []
-    for trade in df.to_dict(orient='records'):
-        trade_id = str(trade.get('Trade ID', ''))
-        # Get coupon rate (handle case sensitivity and whitespace)
-        coupon_rate = None
-        for col in df.columns:
-            if col.strip().lower() in ['coupon rate', 'couponrate', 'coupon_rate']:
-                coupon_rate = trade.get(col, None)
-                break
-        # Get coupon schedule (handle case sensitivity and whitespace)
-        coupon_schedule = None
-        for col in df.columns:
-            if col.strip().lower() in ['coupon schedule', 'couponschedule', 'coupon_schedule', 'schedule']:
-                coupon_schedule = trade.get(col, None)
-                break
-        # Get trade date
-        trade_date = trade.get('Trade Date', '')
-        # Get trade value safely
-        trade_value = safe_float(trade.get('Trade Value', 0))
-        if trade_value is None:
-            trade_value = 0
-        # Calculate coupon payment amount (simplified calculation)
-        coupon_payment = 0
-        if coupon_rate and trade_value and trade_value > 0:
-            try:
-                rate = safe_float(str(coupon_rate).replace('%', '').strip())
-                if rate is not None and rate > 0:
-                    coupon_payment = (rate / 100) * trade_value
-                    if math.isnan(coupon_payment) or math.isinf(coupon_payment):
-                        coupon_payment = 0
-            except (ValueError, TypeError):
-                coupon_payment = 0
-        approved = coupon_approvals.get(trade_id, False)
-        # Calculate coupon due dates and check if payment is due
-        due_dates = calculate_coupon_due_dates(trade_date, coupon_schedule)
-        is_due = is_coupon_due(trade_id, trade_date, coupon_schedule)
-        # Get next due date
-        next_due_date = None
-        today = datetime.now().date()
-        for due_date in due_dates:
-            if due_date > today:
-                next_due_date = due_date
-                break
-        # Get the last payment date for this trade
-        last_payment_date = None
-        for payment_key, payment_data in coupon_payments.items():
-            if payment_data.get('trade_id') == trade_id:
-                payment_date = payment_data.get('paid_date')
-                if payment_date:
-                    if last_payment_date is None or payment_date > last_payment_date:
-                        last_payment_date = payment_date
-        trades.append({
-            **trade,
-            'Coupon Rate': coupon_rate if coupon_rate is not None else 'N/A',
-            'Coupon Schedule': coupon_schedule if coupon_schedule is not None else 'N/A',
-            'Trade Date': trade_date,
-            'Trade Value': trade_value,
-            'Coupon Payment': coupon_payment,
-            'Coupon Paid': last_payment_date if last_payment_date else 'Not Paid',
-            'Coupon Due': is_due,
-            'Next Due Date': next_due_date.strftime('%Y-%m-%d') if next_due_date else 'N/A',
-            'Payment Status': 'Due' if is_due else 'Not Due'
-        })
-    return trades
+    columns = trade_index.get_columns(filename)
+    rate_col = find_column(columns, COUPON_RATE_COLUMNS)
+    schedule_col = find_column(columns, COUPON_SCHEDULE_COLUMNS)
+    today = datetime.now().date()
+    event_calendar.refresh()
+    return [
+        build_coupon_trade(trade, rate_col, schedule_col, today)
+        for trade in trade_index.get_rows(filename)
+    ]
+
+def get_coupon_trade(trade_id):
+    """Look up a single coupon trade by Trade ID and compute only its state"""
+    filename = get_coupon_filename()
+    if not filename:
+        return None
+    trade = trade_index.get_trade(filename, trade_id)
+    if trade is None:
+        return None
+    columns = trade_index.get_columns(filename)
+    event_calendar.refresh()
+    return build_coupon_trade(
+        trade,
+        find_column(columns, COUPON_RATE_COLUMNS),
+        find_column(columns, COUPON_SCHEDULE_COLUMNS),
+    )
 
 def approve_coupon_trade(trade_id):
-    coupon_approvals[trade_id] = True
-    save_approvals()
+    lifecycle_store.put(APPROVALS_NAMESPACE, trade_id, True, trade_id=trade_id)
     return True
 
 def pay_coupon(trade_id):
     """Pay a coupon for a specific trade"""
-    # Find the trade to get its details
-    trades = get_coupon_trades()
-    target_trade = None
-    
-    for trade in trades:
-        if str(trade.get('Trade ID', '')) == trade_id:
-            target_trade = trade
-            break
-    
+    target_trade = get_coupon_trade(trade_id)
     if not target_trade:
         return False
     
@@ -255,13 +247,12 @@ def pay_coupon(trade_id):
         if due_date <= today <= due_date + timedelta(days=30):
             # This payment is due, mark it as paid
             payment_key = f"{trade_id}_{due_date.strftime('%Y-%m-%d')}"
-            coupon_payments[payment_key] = {
+            lifecycle_store.put(PAYMENTS_NAMESPACE, payment_key, {
                 'trade_id': trade_id,
                 'due_date': due_date.strftime('%Y-%m-%d'),
                 'paid_date': today.strftime('%Y-%m-%d'),
                 'amount': target_trade.get('Coupon Payment', 0)
-            }
-            save_payments()
+            }, trade_id=trade_id)
             return True
     
     return False 
\ No newline at end of file
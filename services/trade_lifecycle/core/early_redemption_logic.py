@@ -1,49 +1,50 @@
 import os
-import pandas as pd
+import threading
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
-import json
+import numpy as np
+import pandas as pd
+from services.trade_lifecycle.db.trade_index import trade_index, _file_signature, _trade_id_column
+from services.trade_lifecycle.db.lifecycle_store import lifecycle_store
+from services.trade_lifecycle.db.event_calendar import event_calendar, CALENDAR_HORIZON_YEARS
+from services.trade_lifecycle.utils.datetime_utils import parse_date, parse_date_column
 
 REDEEMED_FILE = 'redeemed_status.json'
+REDEEMED_NAMESPACE = 'redeemed_status'
+EARLY_REDEMPTION_FILE = 'filtered_trades/Early-Redemption.csv'
+EARLY_REDEMPTION_EVENT = 'Early-Redemption'
+
+# Carry over any state from the legacy JSON file on first start
+lifecycle_store.import_json(
+    REDEEMED_NAMESPACE, REDEEMED_FILE,
+    trade_id_for=lambda key, value: key.split('|', 1)[0]
+)
 
-def parse_date(date_str):
-    """Parse date string in various formats"""
-    if not date_str or str(date_str).strip() == '':
+def parse_observation_months(value):
+    try:
+        obs_months = int(value)
+    except (ValueError, TypeError):
         return None
-    
-    date_str = str(date_str).strip()
-    
-    # Try YYYY-DD-MM format first (as seen in the data: 2025-23-07)
-    if date_str.count('-') == 2:
-        try:
-            parts = date_str.split('-')
-            if len(parts) == 3:
-                yyyy = int(parts[0])
-                dd = int(parts[1])
-                mm = int(parts[2])
-                # Check if this is YYYY-DD-MM format (day > 12)
-                if dd > 12 and mm <= 12:
-                    return datetime(yyyy, mm, dd).date()
-        except (ValueError, TypeError):
-            pass
-    
-    # Try standard formats
-    for fmt in ('%m/%d/%Y', '%Y-%m-%d', '%m/%d/%y', '%Y/%m/%d', '%d/%m/%Y'):
-        try:
-            return datetime.strptime(date_str, fmt).date()
-        except Exception:
-            continue
-    return None
+    return obs_months if obs_months > 0 else None
 
-def load_redeemed_status():
-    if os.path.exists(REDEEMED_FILE):
-        with open(REDEEMED_FILE, 'r') as f:
-            return json.load(f)
-    return {}
+def observation_schedule(trade_date, obs_months, horizon_years=CALENDAR_HORIZON_YEARS):
+    """Observation dates every obs_months months after trade_date, up to the calendar horizon"""
+    if not trade_date or not obs_months:
+        return []
+    return [
+        trade_date + relativedelta(months=period_months)
+        for period_months in range(obs_months, horizon_years * 12 + 1, obs_months)
+    ]
+
+def early_redemption_event_dates(trade):
+    trade_date = parse_date(trade.get('Trade Date', ''))
+    return observation_schedule(trade_date, parse_observation_months(trade.get('Observation Dates', None)))
 
-def save_redeemed_status(status):
-    with open(REDEEMED_FILE, 'w') as f:
-        json.dump(status, f)
+def redemption_key(trade_id, period_months):
+    return f"{trade_id}|{period_months}"
+
+def load_redeemed_status():
+    return lifecycle_store.items(REDEEMED_NAMESPACE)
 
 def mark_trade_redeemed(trade_id, trade_date, obs_months, today, entered_price):
     # Calculate the period in months for this redemption
@@ -53,64 +54,190 @@ def mark_trade_redeemed(trade_id, trade_date, obs_months, today, entered_price):
     if obs_months > 0 and total_months >= obs_months:
         periods = total_months // obs_months
         period_months = periods * obs_months
-        key = f"{trade_id}|{period_months}"
-        status = load_redeemed_status()
-        status[key] = {
+        lifecycle_store.put(REDEEMED_NAMESPACE, redemption_key(trade_id, period_months), {
             'redeemed': True,
             'last_redeemed_date': today.isoformat(),
             'entered_price': entered_price
-        }
-        save_redeemed_status(status)
+        }, trade_id=trade_id)
+
+class ObservationIndex:
+    """
+    Every observation date of every early-redemption trade, sorted by date.
+
+    Built from the partition in one vectorized pass (observation n of a trade
+    falls n * 'Observation Dates' months after its trade date, clipped to the
+    month end like relativedelta) and rebuilt only when the file changes.
+    Trade IDs are read and keyed as the Trade ID index keys them, and the
+    event calendar's Early-Redemption events are loaded from this index.
+    """
+
+    def __init__(self, filename=EARLY_REDEMPTION_FILE, horizon_years=CALENDAR_HORIZON_YEARS):
+        self.filename = filename
+        self.horizon_years = horizon_years
+        self._lock = threading.Lock()
+        self._signature = False
+        self._frame = self._empty()
+
+    @staticmethod
+    def _empty():
+        return pd.DataFrame({
+            'trade_id': pd.Series(dtype=object),
+            'period_months': pd.Series(dtype='int64'),
+            'observation_date': pd.Series(dtype='datetime64[D]'),
+        })
+
+    def _build(self):
+        df = pd.read_csv(self.filename)
+        df.columns = df.columns.str.strip()
+        id_col = _trade_id_column(df.columns)
+        if not id_col or not {'Trade Date', 'Observation Dates'}.issubset(df.columns):
+            return self._empty()
+        # Same keys as the Trade ID index, which reads the file with inferred types
+        df['Trade ID'] = df[id_col].astype(str).str.strip()
+        # Keep the first occurrence, matching the Trade ID index
+        df = df[df['Trade ID'] != ''].drop_duplicates('Trade ID')
+        trade_dates = parse_date_column(df['Trade Date'])
+        obs_months = pd.to_numeric(df['Observation Dates'], errors='coerce')
+        valid = trade_dates.notna() & (obs_months >= 1)
+        trade_ids = df['Trade ID'].to_numpy()[valid.to_numpy()]
+        base = trade_dates[valid].to_numpy().astype('datetime64[D]')
+        step = obs_months[valid].to_numpy().astype('int64')
+        counts = (self.horizon_years * 12) // step
+        rows = np.repeat(np.arange(len(step)), counts)
+        nth = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+        period_months = nth * step[rows]
+        month = base[rows].astype('datetime64[M]') + period_months
+        day_of_month = (base[rows] - base[rows].astype('datetime64[M]').astype('datetime64[D]')).astype('int64')
+        month_length = ((month + 1).astype('datetime64[D]') - month.astype('datetime64[D]')).astype('int64')
+        observation_date = month.astype('datetime64[D]') + np.minimum(day_of_month, month_length - 1)
+        frame = pd.DataFrame({
+            'trade_id': trade_ids[rows],
+            'period_months': period_months,
+            'observation_date': observation_date,
+        })
+        return frame.sort_values(['observation_date', 'trade_id'], kind='stable').reset_index(drop=True)
+
+    def frame(self):
+        """The (trade_id, period_months, observation_date) index, rebuilt if the partition changed"""
+        with self._lock:
+            signature = _file_signature(self.filename) if os.path.exists(self.filename) else None
+            if signature != self._signature:
+                self._frame = self._build() if signature else self._empty()
+                self._signature = signature
+            return self._frame
+
+    def between(self, start=None, end=None):
+        """Observations dated start..end inclusive (either bound may be open), in date order"""
+        frame = self.frame()
+        dates = frame['observation_date'].to_numpy()
+        lo = 0 if start is None else np.searchsorted(dates, np.datetime64(start, 'D'), side='left')
+        hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(end, 'D'), side='right')
+        return frame.iloc[lo:hi]
+
+    def dates_by_trade(self):
+        """{trade_id: observation dates} of every trade, as the event calendar holds them"""
+        frame = self.frame()
+        dates = pd.Series(frame['observation_date'].dt.date.to_numpy(), index=frame['trade_id'].to_numpy())
+        return {trade_id: list(group) for trade_id, group in dates.groupby(level=0, sort=False)}
+
+observation_index = ObservationIndex()
+
+event_calendar.register(
+    EARLY_REDEMPTION_EVENT, EARLY_REDEMPTION_FILE, early_redemption_event_dates,
+    loader=lambda filename: observation_index.dates_by_trade()
+)
+
+def observations_due(as_of, since=None, include_redeemed=False):
+    """
+    Observations falling on or before as_of (and on or after since), with
+    their redemption status read in one keyed lookup. Redeemed observations
+    are left out unless include_redeemed is set.
+    """
+    due = observation_index.between(since, as_of)
+    keys = [redemption_key(trade_id, period) for trade_id, period in zip(due['trade_id'], due['period_months'])]
+    redeemed_status = lifecycle_store.get_many(REDEEMED_NAMESPACE, keys)
+    result = []
+    for key, trade_id, period, observation_date in zip(keys, due['trade_id'], due['period_months'], due['observation_date']):
+        info = redeemed_status.get(key, {})
+        info = info if isinstance(info, dict) else {'redeemed': bool(info)}
+        if info.get('redeemed', False) and not include_redeemed:
+            continue
+        result.append({
+            'trade_id': trade_id,
+            'period_months': int(period),
+            'observation_date': observation_date.date().isoformat(),
+            'redeemed': info.get('redeemed', False),
+            'last_redeemed_date': info.get('last_redeemed_date'),
+            'entered_price': info.get('entered_price'),
+        })
+    return result
+
+def _due_period(trade, today):
+    """Months since the trade date if today is one of its observation days, else None (refresh the event calendar first)"""
+    trade_date = parse_date(trade.get('Trade Date', ''))
+    obs_months = trade.get('Observation Dates', None)
+    try:
+        obs_months = int(obs_months)
+    except (ValueError, TypeError):
+        obs_months = None
+    if trade_date and obs_months is not None and obs_months > 0:
+        year_diff = today.year - trade_date.year
+        month_diff = today.month - trade_date.month
+        total_months = year_diff * 12 + month_diff
+        if total_months >= obs_months:
+            periods = total_months // obs_months
+            period_months = periods * obs_months
+            # Observation days come from the event calendar; trades it does not hold are computed here
+            observation_dates = event_calendar.dates_for(EARLY_REDEMPTION_EVENT, trade.get('Trade ID', ''), refresh=False)
+            if observation_dates is None:
+                observation_dates = [trade_date + relativedelta(months=period_months)]
+            if today in observation_dates:
+                return period_months
+    return None
+
+def build_early_redemption_trade(trade, today, redeemed_status, due_period=None):
+    """
+    Compute the observation/redemption state for a single trade row. Without
+    due_period it is derived from the event calendar (refresh it first).
+    """
+    if due_period is None:
+        due_period = _due_period(trade, today)
+    check_accessible = False
+    redeemed = False
+    last_redeemed_date = None
+    entered_price = None
+    if due_period is not None:
+        redeemed_info = redeemed_status.get(redemption_key(trade.get('Trade ID', ''), due_period), {})
+        redeemed = redeemed_info.get('redeemed', False) if isinstance(redeemed_info, dict) else redeemed_info
+        last_redeemed_date = redeemed_info.get('last_redeemed_date') if isinstance(redeemed_info, dict) else None
+        entered_price = redeemed_info.get('entered_price') if isinstance(redeemed_info, dict) else None
+        if not redeemed:
+            check_accessible = True
+    return {
+        **trade,
+        'Check Accessible': check_accessible,
+        'Redeemed': redeemed,
+        'Last Redeemed Date': last_redeemed_date,
+        'Entered Price': entered_price,
+        'Coupon Rate': trade.get('Coupon rate', ''),
+        'Coupon Schedule': trade.get('Coupon schedule', '')
+    }
 
 def get_early_redemption_trades():
-    filename = 'filtered_trades/Early-Redemption.csv'
-    if not os.path.exists(filename):
+    if not os.path.exists(EARLY_REDEMPTION_FILE):
         return []
-    df = pd.read_csv(filename)
-    df.columns = df.columns.str.strip()
-    trades = []
     today = datetime.now().date()
-    redeemed_status = load_redeemed_status()
-    for trade in df.to_dict(orient='records'):
-        trade_date = parse_date(trade.get('Trade Date', ''))
-        obs_months = trade.get('Observation Dates', None)
-        try:
-            obs_months = int(obs_months)
-        except (ValueError, TypeError):
-            obs_months = None
-        check_accessible = False
-        redeemed = False
-        period_months = None
-        last_redeemed_date = None
-        entered_price = None
-        coupon_rate = trade.get('Coupon rate', '')
-        coupon_schedule = trade.get('Coupon schedule', '')
-        if trade_date and obs_months is not None and obs_months > 0:
-            year_diff = today.year - trade_date.year
-            month_diff = today.month - trade_date.month
-            total_months = year_diff * 12 + month_diff
-            if total_months >= obs_months:
-                periods = total_months // obs_months
-                period_months = periods * obs_months
-                period_date = trade_date + relativedelta(months=period_months)
-                if today == period_date:
-                    key = f"{trade.get('Trade ID','')}|{period_months}"
-                    redeemed_info = redeemed_status.get(key, {})
-                    redeemed = redeemed_info.get('redeemed', False) if isinstance(redeemed_info, dict) else redeemed_info
-                    last_redeemed_date = redeemed_info.get('last_redeemed_date') if isinstance(redeemed_info, dict) else None
-                    entered_price = redeemed_info.get('entered_price') if isinstance(redeemed_info, dict) else None
-                    if not redeemed:
-                        check_accessible = True
-        trades.append({
-            **trade,
-            'Check Accessible': check_accessible,
-            'Redeemed': redeemed,
-            'Last Redeemed Date': last_redeemed_date,
-            'Entered Price': entered_price,
-            'Coupon Rate': coupon_rate,
-            'Coupon Schedule': coupon_schedule
-        })
-    return trades
+    due_today = observation_index.between(today, today)
+    due_periods = dict(zip(due_today['trade_id'], due_today['period_months'].astype(int)))
+    redeemed_status = lifecycle_store.get_many(
+        REDEEMED_NAMESPACE, [redemption_key(trade_id, period) for trade_id, period in due_periods.items()]
+    )
+    return [
+        build_early_redemption_trade(
+            trade, today, redeemed_status, due_period=due_periods.get(str(trade.get('Trade ID', '')).strip())
+        )
+        for trade in trade_index.get_rows(EARLY_REDEMPTION_FILE)
+    ]
 
 def calculate_months_difference(start_date, end_date):
     """Calculate the number of months between two dates using calendar months"""
@@ -129,8 +256,10 @@ def calculate_months_difference(start_date, end_date):
     return total_months
 
 def get_early_redemption_trade(trade_id):
-    trades = get_early_redemption_trades()
-    for trade in trades:
-        if str(trade.get('Trade ID', '')) == str(trade_id):
-            return trade
-    return None 
\ No newline at end of file
+    """Look up a single early-redemption trade by Trade ID and compute only its state"""
+    trade = trade_index.get_trade(EARLY_REDEMPTION_FILE, trade_id)
+    if trade is None:
+        return None
+    redeemed_status = lifecycle_store.find_by_trade(REDEEMED_NAMESPACE, trade.get('Trade ID', trade_id))
+    event_calendar.refresh()
+    return build_early_redemption_trade(trade, datetime.now().date(), redeemed_status)
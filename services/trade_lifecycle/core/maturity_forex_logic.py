@@ -0,0 +1,77 @@
+import os
+import json
+import pandas as pd
+from services.trade_lifecycle.core.settlement_logic import column_or_default, compute_settlements, format_settlement_amounts
+
+MATURITY_FOREX_FILE = 'filtered_trades/Maturity_Forex.csv'
+
+# Rows read from Maturity_Forex.csv per chunk while streaming an export
+EXPORT_CHUNK_ROWS = int(os.environ.get('LIFECYCLE_EXPORT_CHUNK_ROWS', '10000'))
+
+EXPORT_SETTLEMENT_COLUMNS = ['SettlementAmount', 'SettlementCurrency', 'SettlementDirection']
+
+def add_settlement_columns(df):
+    """Add FinalAmount and the numeric settlement columns to a frame of maturing FX trades"""
+    settlements = compute_settlements(df)
+    df['FinalAmount'] = format_settlement_amounts(settlements)
+    for col in EXPORT_SETTLEMENT_COLUMNS:
+        df[col] = settlements[col]
+    return df
+
+def calculate_final_amounts(df):
+    """
+    Settlement amount in the other currency for every row of df, as display
+    strings ('1,234.56 USD') or the reason the amount could not be computed.
+    """
+    return format_settlement_amounts(compute_settlements(df))
+
+def iter_maturity_forex_export(filename=MATURITY_FOREX_FILE, chunksize=EXPORT_CHUNK_ROWS):
+    """
+    Yield Maturity_Forex.csv in chunks with FinalAmount, the settlement columns and Approved added.
+    At least one (possibly empty) frame is yielded so the columns are always known.
+    """
+    # Approvals are not tracked for forex maturities yet
+    approvals_clean = set()
+    yielded = False
+    for df in pd.read_csv(filename, chunksize=chunksize):
+        df.columns = df.columns.str.strip()
+        if 'TradeID' in df.columns:
+            df['TradeID'] = df['TradeID'].astype(str).str.strip()
+        add_settlement_columns(df)
+        df['Approved'] = column_or_default(df, 'TradeID').astype(str).str.upper().isin(approvals_clean)
+        yielded = True
+        yield df
+    if not yielded:
+        df = pd.read_csv(filename, nrows=0)
+        df.columns = df.columns.str.strip()
+        yield df.reindex(columns=list(df.columns) + ['FinalAmount', *EXPORT_SETTLEMENT_COLUMNS, 'Approved'])
+
+def stream_csv(frames):
+    """Render frames as one CSV document, a chunk at a time"""
+    header = True
+    for df in frames:
+        yield df.to_csv(index=False, header=header)
+        header = False
+
+def _json_rows(frames):
+    """Serialized rows, one list per frame so responses are written a chunk at a time"""
+    for df in frames:
+        # Missing values become null rather than the invalid JSON token NaN
+        df = df.astype(object).where(df.notna(), None)
+        yield [json.dumps(row, default=str) for row in df.to_dict(orient='records')]
+
+def stream_ndjson(frames):
+    """Render frames as newline-delimited JSON, one object per row"""
+    for rows in _json_rows(frames):
+        if rows:
+            yield '\n'.join(rows) + '\n'
+
+def stream_json_array(frames):
+    """Render frames as a single JSON array without building it in memory"""
+    yield '['
+    first = True
+    for rows in _json_rows(frames):
+        if rows:
+            yield ('\n' if first else ',\n') + ',\n'.join(rows)
+            first = False
+    yield '\n]\n'
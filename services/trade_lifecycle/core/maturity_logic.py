@@ -1,96 +1,68 @@
 import os
-import json
 from datetime import datetime
 import pandas as pd
-import math
+from services.trade_lifecycle.db.lifecycle_store import lifecycle_store
+from services.trade_lifecycle.db.trade_index import trade_index
+from services.trade_lifecycle.db.event_calendar import event_calendar
+from services.trade_lifecycle.utils.datetime_utils import parse_date
+from services.trade_lifecycle.core.settlement_logic import compute_settlements
 
 APPROVALS_FILE = 'maturity_approvals.json'
+APPROVALS_NAMESPACE = 'maturity_approvals'
+MATURITY_FILE = 'filtered_trades/Maturity.csv'
+MATURITY_EVENT = 'Maturity'
 
-# Load or initialize approvals
-if os.path.exists(APPROVALS_FILE):
-    with open(APPROVALS_FILE, 'r') as f:
-        maturity_approvals = json.load(f)
-else:
-    maturity_approvals = {}
+# Carry over any state from the legacy JSON file on first start
+lifecycle_store.import_json(APPROVALS_NAMESPACE, APPROVALS_FILE)
 
-def save_approvals():
-    with open(APPROVALS_FILE, 'w') as f:
-        json.dump(maturity_approvals, f, indent=2)
+def find_maturity_column(columns):
+    """Find the correct maturity date column (case/whitespace robust)"""
+    for name in ('maturity date', 'settlement date'):
+        for col in columns:
+            if col.strip().lower() == name:
+                return col
+    return None
 
-def safe_float(value):
-    """Convert value to float safely, handling inf/nan values"""
-    if value is None:
-        return None
-    try:
-        result = float(str(value).replace(',', ''))
-        if math.isnan(result) or math.isinf(result):
-            return None
-        return result
-    except (ValueError, TypeError):
-        return None
+def maturity_event_dates(trade):
+    maturity_col = find_maturity_column(trade.keys())
+    maturity_date = parse_date(trade.get(maturity_col, '')) if maturity_col else None
+    return [maturity_date] if maturity_date else []
+
+event_calendar.register(MATURITY_EVENT, MATURITY_FILE, maturity_event_dates)
 
 def get_maturity_trades():
-    filename = 'filtered_trades/Maturity.csv'
-    if not os.path.exists(filename):
-        filename = 'filtered_trades/Maturity.csv'
+    filename = MATURITY_FILE
     if not os.path.exists(filename):
         return []
-    df = pd.read_csv(filename)
-    df.columns = df.columns.str.strip()
-    # Find the correct maturity date column (case/whitespace robust)
-    maturity_col = None
-    for col in df.columns:
-        if col.strip().lower() == 'maturity date':
-            maturity_col = col
-            break
-    if not maturity_col:
-        for col in df.columns:
-            if col.strip().lower() == 'settlement date':
-                maturity_col = col
-                break
+    columns = trade_index.get_columns(filename)
+    maturity_col = find_maturity_column(columns)
     trades = []
     today = datetime.now().date()
+    maturity_approvals = lifecycle_store.items(APPROVALS_NAMESPACE)
+    event_calendar.refresh()
     # Find the trade ID column robustly
     trade_id_col = None
-    for col in df.columns:
+    for col in columns:
         col_clean = col.replace(' ', '').replace('_', '').lower()
         if col_clean in ['tradeid', 'trade_id'] or ('trade' in col_clean and 'id' in col_clean):
             trade_id_col = col
             break
     if not trade_id_col:
         # fallback to first column
-        trade_id_col = df.columns[0]
-    for trade in df.to_dict(orient='records'):
+        trade_id_col = columns[0]
+    for trade in trade_index.get_rows(filename):
         trade_id = str(trade.get(trade_id_col, '')).strip()
         # Exclude FX trades from equity maturity page
         if trade_id.upper().startswith('FX'):
             continue
         maturity_date_str = str(trade.get(maturity_col, '')) if maturity_col else ''
         maturity_date_str = maturity_date_str.strip()
-        maturity_date = None
-        if maturity_date_str:
-            # Try YYYY-DD-MM format first (as seen in the data: 2025-23-07)
-            if maturity_date_str.count('-') == 2:
-                try:
-                    parts = maturity_date_str.split('-')
-                    if len(parts) == 3:
-                        yyyy = int(parts[0])
-                        dd = int(parts[1])
-                        mm = int(parts[2])
-                        # Check if this is YYYY-DD-MM format (day > 12)
-                        if dd > 12 and mm <= 12:
-                            maturity_date = datetime(yyyy, mm, dd).date()
-                except (ValueError, TypeError):
-                    pass
-            
-            # If YYYY-DD-MM didn't work, try standard formats
-            if not maturity_date:
-                for fmt in ('%m/%d/%Y', '%Y-%m-%d', '%m/%d/%y'):
-                    try:
-                        maturity_date = datetime.strptime(maturity_date_str, fmt).date()
-                        break
-                    except Exception:
-                        continue
+        # The calendar already holds the parsed maturity date of every indexed trade
+        maturity_dates = event_calendar.dates_for(MATURITY_EVENT, trade_id, refresh=False)
+        if maturity_dates is None:
+            maturity_date = parse_date(maturity_date_str)
+        else:
+            maturity_date = maturity_dates[0] if maturity_dates else None
         maturity_reached = 'No'
         days_diff = '0'
         if maturity_date:
@@ -103,16 +75,10 @@ def get_maturity_trades():
         approved = maturity_approvals.get(trade_id, False)
         # Get coupon rate (handle case sensitivity and whitespace)
         coupon_rate = None
-        for col in df.columns:
+        for col in columns:
             if col.strip().lower() in ['coupon rate', 'couponrate', 'coupon_rate']:
                 coupon_rate = trade.get(col, None)
                 break
-        # Calculate final amount (Trade Value + any additional calculations)
-        trade_value = safe_float(trade.get('Trade Value', 0))
-        if trade_value is None:
-            trade_value = 0
-        # For now, final amount is the same as trade value
-        final_amount = trade_value
         trades.append({
             **trade,
             'Maturity Date': maturity_date_str,
@@ -121,11 +87,18 @@ def get_maturity_trades():
             'Approved': approved,
             'Approval Status': 'Approved' if approved else 'Not Approved',
             'Coupon Rate': coupon_rate if coupon_rate is not None else 'N/A',
-            'Final Amount': final_amount
         })
+    # Final amounts for the whole run in one pass
+    if trades:
+        settlements = compute_settlements(pd.DataFrame(trades))
+        for trade, amount, currency, direction in zip(
+            trades, settlements['SettlementAmount'], settlements['SettlementCurrency'], settlements['SettlementDirection']
+        ):
+            trade['Final Amount'] = float(amount)
+            trade['Settlement Currency'] = currency
+            trade['Settlement Direction'] = direction
     return trades
 
 def approve_maturity_trade(trade_id):
-    maturity_approvals[trade_id] = True
-    save_approvals()
+    lifecycle_store.put(APPROVALS_NAMESPACE, trade_id, True, trade_id=trade_id)
     return True 
\ No newline at end of file
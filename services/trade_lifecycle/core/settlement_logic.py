@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+SETTLEMENT_OK = 'ok'
+SETTLEMENT_COLUMNS = ['SettlementAmount', 'SettlementCurrency', 'SettlementDirection', 'SettlementStatus',
+                      'BaseMismatch', 'TermMismatch', 'DealtMismatch']
+
+def column_or_default(df, name, alt=None, default=''):
+    """The first of name/alt present in df, or a constant column of default"""
+    for col in (name, alt):
+        if col and col in df.columns:
+            return df[col]
+    return pd.Series(default, index=df.index, dtype=object)
+
+def _direction(side):
+    # Buying the dealt currency (or the equity) means paying the settlement amount
+    side = side.astype(str).str.strip().str.lower()
+    return pd.Series(np.select([side == 'buy', side == 'sell'], ['Pay', 'Receive'], default=''), index=side.index)
+
+def _fx_settlements(df):
+    currency_pair = column_or_default(df, 'CurrencyPair')
+    dealt = column_or_default(df, 'DealtCurrency', 'Dealt Currency')
+    base = column_or_default(df, 'BaseCurrency', 'Base Currency')
+    term = column_or_default(df, 'TermCurrency', 'Term Currency')
+    notional_raw = column_or_default(df, 'NotionalAmount', 'Notional Amount', default=0)
+    rate_raw = column_or_default(df, 'FXRate', 'FX Rate', default=0)
+
+    notional = pd.to_numeric(notional_raw, errors='coerce')
+    rate = pd.to_numeric(rate_raw, errors='coerce')
+    # Values present but not numeric cannot be priced at all
+    bad_number = (notional.isna() & notional_raw.notna()) | (rate.isna() & rate_raw.notna())
+
+    pair_is_text = currency_pair.map(lambda v: isinstance(v, str))
+    pair_parts = currency_pair.where(pair_is_text).str.split('/')
+    pair_base = pair_parts.str[0]
+    pair_term = pair_parts.str[1]
+
+    dealt_base = dealt == base
+    dealt_term = ~dealt_base & (dealt == term)
+    base_ok = dealt_base & pair_is_text & (base == pair_base)
+    term_ok = dealt_term & pair_is_text & pair_term.notna() & (term == pair_term)
+    base_mismatch = dealt_base & pair_is_text & ~base_ok
+    term_mismatch = dealt_term & pair_is_text & pair_term.notna() & ~term_ok
+
+    # Base-dealt trades multiply by the rate, term-dealt trades divide
+    amount = np.where(base_ok, notional * rate, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        amount = np.where(term_ok, notional / rate.replace(0, np.nan), amount)
+
+    status = np.select(
+        [
+            bad_number,
+            dealt_base & ~pair_is_text,
+            base_ok,
+            dealt_base,
+            dealt_term & (~pair_is_text | pair_term.isna() | (term_ok & (rate == 0))),
+            term_ok,
+            dealt_term,
+        ],
+        ['N/A', 'N/A', SETTLEMENT_OK, 'Base/currency pair mismatch', 'N/A', SETTLEMENT_OK, 'Term/currency pair mismatch'],
+        default='Dealt currency must be base or term',
+    )
+    priced = status == SETTLEMENT_OK
+    return pd.DataFrame({
+        'SettlementAmount': np.where(priced, amount, np.nan),
+        'SettlementCurrency': np.where(priced, np.where(base_ok, term, base), None),
+        'SettlementDirection': _direction(column_or_default(df, 'BuySell', 'Buy/Sell')),
+        'SettlementStatus': status,
+        'BaseMismatch': base_mismatch.to_numpy(dtype=bool),
+        'TermMismatch': term_mismatch.to_numpy(dtype=bool),
+        'DealtMismatch': (~dealt_base & ~dealt_term).to_numpy(dtype=bool),
+    }, index=df.index)
+
+def _equity_settlements(df):
+    # Equity trades settle their trade value in the trade currency; unpriced values settle as 0
+    amount = pd.to_numeric(
+        column_or_default(df, 'Trade Value', 'TradeValue', default=0).astype(str).str.replace(',', '', regex=False),
+        errors='coerce'
+    )
+    amount = amount.where(np.isfinite(amount), np.nan).fillna(0.0)
+    no_flag = np.zeros(len(df), dtype=bool)
+    return pd.DataFrame({
+        'SettlementAmount': amount.to_numpy(dtype=float),
+        'SettlementCurrency': column_or_default(df, 'Currency', default=None).to_numpy(dtype=object),
+        'SettlementDirection': _direction(column_or_default(df, 'Trade Type', 'BuySell')),
+        'SettlementStatus': SETTLEMENT_OK,
+        'BaseMismatch': no_flag,
+        'TermMismatch': no_flag,
+        'DealtMismatch': no_flag,
+    }, index=df.index)
+
+def compute_settlements(df):
+    """
+    Settlement of every maturing trade in df, computed column-wise in one pass.
+
+    FX rows (those with a CurrencyPair) settle NotionalAmount converted at
+    FXRate into the currency opposite the dealt one; equity rows settle their
+    Trade Value. A file may mix both kinds, so each row is classified on its own. Returns a frame aligned with df holding
+    SETTLEMENT_COLUMNS: the amount and its currency (NaN/None when it cannot be
+    priced), Pay/Receive from the trade side, SettlementStatus ('ok' or why the
+    amount is missing) and the base/term/dealt currency mismatch flags.
+    """
+    if 'CurrencyPair' not in df.columns:
+        return _equity_settlements(df)
+    pair = df['CurrencyPair']
+    is_fx = (pair.notna() & (pair.astype(str).str.strip() != '')).to_numpy(dtype=bool)
+    if is_fx.all():
+        return _fx_settlements(df)
+    if not is_fx.any():
+        return _equity_settlements(df)
+    fx_positions = np.flatnonzero(is_fx)
+    equity_positions = np.flatnonzero(~is_fx)
+    combined = pd.concat([_fx_settlements(df.iloc[fx_positions]), _equity_settlements(df.iloc[equity_positions])])
+    # Back to df's row order (positionally, since df's index may repeat labels)
+    combined = combined.iloc[np.argsort(np.concatenate([fx_positions, equity_positions]), kind='stable')]
+    combined.index = df.index
+    return combined
+
+def format_settlement_amounts(settlements):
+    """'1,234.56 USD' for priced rows, the SettlementStatus reason otherwise"""
+    result = settlements['SettlementStatus'].to_numpy(dtype=object).copy()
+    priced = result == SETTLEMENT_OK
+    result[priced] = [
+        f"{value:,.2f} {currency}"
+        for value, currency in zip(settlements['SettlementAmount'].to_numpy()[priced],
+                                   settlements['SettlementCurrency'].to_numpy()[priced])
+    ]
+    return pd.Series(result, index=settlements.index)
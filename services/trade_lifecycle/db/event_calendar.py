@@ -0,0 +1,146 @@
+import os
+import bisect
+import logging
+import threading
+from datetime import date, timedelta
+from services.trade_lifecycle.db.trade_index import trade_index, _file_signature
+
+logger = logging.getLogger(__name__)
+
+# Open-ended schedules (observations, coupons) are expanded this far past the trade date
+CALENDAR_HORIZON_YEARS = int(os.environ.get('LIFECYCLE_CALENDAR_HORIZON_YEARS', '10'))
+
+class EventCalendar:
+    """
+    Date-sorted index of lifecycle events as (event date, event type, trade ID).
+
+    Each event type registers the partition it is derived from and a function
+    returning a trade row's event dates. A partition's events are recomputed
+    only when its file changes (an upload, or another worker rewriting it).
+    Trades captured outside the partitions are set one at a time with
+    set_trade()/remove_trade(); they take precedence over a partition row of
+    the same trade and are kept when the partition is reloaded. Range queries
+    are answered by binary search over the sorted keys.
+    """
+
+    def __init__(self):
+        self._sources = {}
+        self._signatures = {}
+        self._by_trade = {}
+        self._captured = {}
+        self._keys = []
+        self._lock = threading.RLock()
+
+    def register(self, event_type, filename, extractor, loader=None):
+        """
+        extractor(row) returns the event dates (datetime.date) for one trade row.
+        An event type with a vectorized index passes loader(filename) instead,
+        returning {trade_id: event dates} for the whole partition.
+        """
+        with self._lock:
+            self._sources[event_type] = (filename, extractor, loader)
+            self._signatures.pop(event_type, None)
+
+    def event_types(self):
+        with self._lock:
+            return list(self._sources)
+
+    def _insert(self, event_type, trade_id, dates):
+        self._by_trade[(event_type, trade_id)] = dates
+        for day in dates:
+            bisect.insort(self._keys, (day.toordinal(), event_type, trade_id))
+
+    def _remove(self, event_type, trade_id):
+        for day in self._by_trade.pop((event_type, trade_id), []):
+            key = (day.toordinal(), event_type, trade_id)
+            pos = bisect.bisect_left(self._keys, key)
+            if pos < len(self._keys) and self._keys[pos] == key:
+                del self._keys[pos]
+
+    def _read_partition(self, event_type, filename, extractor):
+        by_trade = {}
+        for row in trade_index.get_rows(filename):
+            trade_id = str(row.get('Trade ID', row.get('TradeID', ''))).strip()
+            # Keep the first occurrence, matching the Trade ID index
+            if not trade_id or trade_id in by_trade:
+                continue
+            try:
+                by_trade[trade_id] = sorted(set(extractor(row)))
+            except Exception as e:
+                logger.warning(f"Could not compute {event_type} dates for trade {trade_id}: {e}")
+        return by_trade
+
+    def _load_partition(self, event_type, filename, extractor, loader):
+        if loader is not None:
+            by_trade = {trade_id: sorted(set(dates)) for trade_id, dates in loader(filename).items()}
+        else:
+            by_trade = self._read_partition(event_type, filename, extractor)
+        by_trade.update({key[1]: dates for key, dates in self._captured.items() if key[0] == event_type})
+        self._keys = [key for key in self._keys if key[1] != event_type]
+        self._by_trade = {key: dates for key, dates in self._by_trade.items() if key[0] != event_type}
+        for trade_id, dates in by_trade.items():
+            self._by_trade[(event_type, trade_id)] = dates
+            self._keys.extend((day.toordinal(), event_type, trade_id) for day in dates)
+        self._keys.sort()
+
+    def refresh(self):
+        """Recompute the events of every partition whose file changed since it was last read"""
+        with self._lock:
+            for event_type, (filename, extractor, loader) in self._sources.items():
+                signature = _file_signature(filename) if os.path.exists(filename) else None
+                if self._signatures.get(event_type, False) == signature:
+                    continue
+                self._load_partition(event_type, filename, extractor, loader)
+                self._signatures[event_type] = signature
+
+    def set_trade(self, event_type, trade_id, dates):
+        """Replace the events of a single captured trade"""
+        trade_id = str(trade_id).strip()
+        dates = sorted(set(dates))
+        with self._lock:
+            self._captured[(event_type, trade_id)] = dates
+            self._remove(event_type, trade_id)
+            self._insert(event_type, trade_id, dates)
+
+    def remove_trade(self, event_type, trade_id):
+        """Drop a captured trade's events; a partition row of the same trade comes back on the next refresh()"""
+        trade_id = str(trade_id).strip()
+        with self._lock:
+            if self._captured.pop((event_type, trade_id), None) is None:
+                return
+            self._remove(event_type, trade_id)
+            self._signatures.pop(event_type, None)
+
+    def dates_for(self, event_type, trade_id, refresh=True):
+        """
+        Sorted event dates of one trade, or None if the trade is not in the calendar.
+        Pass refresh=False when looking up many trades after a single refresh().
+        """
+        if refresh:
+            self.refresh()
+        with self._lock:
+            dates = self._by_trade.get((event_type, str(trade_id).strip()))
+        return list(dates) if dates is not None else None
+
+    def between(self, start, end, event_types=None):
+        """Events dated start..end inclusive, in date order"""
+        self.refresh()
+        with self._lock:
+            lo = bisect.bisect_left(self._keys, (start.toordinal(),))
+            hi = bisect.bisect_left(self._keys, (end.toordinal() + 1,))
+            keys = self._keys[lo:hi]
+        return [
+            {'date': date.fromordinal(ordinal).isoformat(), 'event_type': event_type, 'trade_id': trade_id}
+            for ordinal, event_type, trade_id in keys
+            if event_types is None or event_type in event_types
+        ]
+
+    def upcoming(self, days, today=None, event_types=None):
+        """Events due from today through the next days days"""
+        today = today or date.today()
+        return self.between(today, today + timedelta(days=days), event_types)
+
+    def due_on(self, day, event_types=None):
+        return self.between(day, day, event_types)
+
+event_calendar = EventCalendar()
@@ -0,0 +1,99 @@
+from services.firestore_paging import field_path, MAX_PAGE_SIZE
+from services.forex_capture.models import Forex
+from services.schema_compiler import COERCERS, DEFER
+from services.trade_lifecycle.utils.datetime_utils import parse_date
+
+FX_CAPTURE_COLLECTION = 'fx_capture'
+TRADE_ID_FIELD = 'TradeID'
+FX_ID_PREFIX = 'FX'
+
+# Documents read per round trip when the whole result is requested
+SCAN_BATCH_SIZE = 500
+
+# fx_capture documents are stored by alias, with the Forex model's types
+_FILTER_TYPES = {field.alias: field.outer_type_ for field in Forex.__fields__.values()}
+
+def typed_filters(filters):
+    """
+    Equality filters with their query-string values converted to the stored
+    type of the field (e.g. NotionalAmount=1000 -> 1000.0), so they can match.
+    Raises ValueError for a value the field's type cannot hold.
+    """
+    typed = {}
+    for field, value in (filters or {}).items():
+        field_type = _FILTER_TYPES.get(field)
+        coercer = COERCERS.get(field_type)
+        converted = coercer(value) if coercer else value
+        if converted is DEFER:
+            raise ValueError(f"{field} must be a valid {field_type.__name__}")
+        typed[field] = converted
+    return typed
+
+def fx_trade_range(db):
+    """fx_capture query over the FX trade IDs"""
+    # Every FX trade ID sorts between 'FX' and 'FX\uf8ff'
+    return db.collection(FX_CAPTURE_COLLECTION) \
+        .where(TRADE_ID_FIELD, '>=', FX_ID_PREFIX) \
+        .where(TRADE_ID_FIELD, '<', FX_ID_PREFIX + '\uf8ff')
+
+def _base_query(db, filters):
+    query = fx_trade_range(db)
+    for field, value in (filters or {}).items():
+        query = query.where(field_path(field), '==', value)
+    return query.order_by(TRADE_ID_FIELD)
+
+def _in_window(trade, date_field, date_from, date_to):
+    if not (date_from or date_to):
+        return True
+    event_date = parse_date(trade.get(date_field))
+    if event_date is None:
+        return False
+    if date_from and event_date < date_from:
+        return False
+    if date_to and event_date > date_to:
+        return False
+    return True
+
+def query_fx_trades(db, fields=None, filters=None, date_field='MaturityDate', date_from=None, date_to=None,
+                    page_size=None, after=None):
+    """
+    FX trades from fx_capture, filtered, projected and paged by Firestore.
+
+    The TradeID prefix range, equality filters, field projection and cursor
+    run as one query ordered by TradeID (equality filters need a composite
+    index with TradeID); filters must already hold the stored types, as
+    returned by typed_filters(). Dates in fx_capture are free-form strings
+    that do not sort chronologically, so a date window is checked on the
+    projected rows, reading further pages until page_size rows pass it.
+
+    Returns (trades, next_after); next_after is None once the range is exhausted.
+    """
+    window = bool(date_from or date_to)
+    selected = None
+    if fields:
+        selected = list(dict.fromkeys([TRADE_ID_FIELD, *fields, *([date_field] if window else [])]))
+    if page_size:
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    batch_size = page_size or SCAN_BATCH_SIZE
+    trades = []
+    cursor = after
+    base = _base_query(db, filters)
+    if selected:
+        base = base.select([field_path(field) for field in selected])
+    while True:
+        query = base
+        if cursor:
+            query = query.start_after({TRADE_ID_FIELD: cursor})
+        docs = list(query.limit(batch_size).stream())
+        for doc in docs:
+            trade = doc.to_dict()
+            cursor = trade.get(TRADE_ID_FIELD, doc.id)
+            if not _in_window(trade, date_field, date_from, date_to):
+                continue
+            if selected and window and date_field not in fields:
+                trade.pop(date_field, None)
+            trades.append(trade)
+            if page_size and len(trades) >= page_size:
+                return trades, cursor
+        if len(docs) < batch_size:
+            return trades, None
@@ -0,0 +1,140 @@
+import uuid
+import logging
+from datetime import datetime
+from services.firebase_client import get_firestore_client
+from services.firestore_batch import BatchWriter
+from services.firestore_paging import field_path
+from services.trade_lifecycle.db.lifecycle_store import lifecycle_store
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOG_COLLECTION = 'fx_lifecycle'
+SNAPSHOT_COLLECTION = 'fx_lifecycle_snapshots'
+COMPACTION_NAMESPACE = 'lifecycle_compaction'
+
+# EventStatus recorded for each action
+ACTION_STATUS = {
+    'approve': 'Approved',
+    'pay_coupon': 'Paid',
+    'redeem': 'Redeemed',
+}
+
+def event_status(event):
+    if event.get('action') == 'pay_coupon' and not event.get('success', True):
+        return 'Payment Failed'
+    return ACTION_STATUS.get(event.get('action'), event.get('action'))
+
+def snapshot_update(event):
+    """The snapshot fields one action sets: the latest state of its event type plus the trade-level summary"""
+    details = {k: v for k, v in event.items() if k not in ('trade_id', 'TradeID', 'event_type', 'EventType')}
+    status = event_status(event)
+    return {
+        'TradeID': event['trade_id'],
+        'EventType': event['event_type'],
+        'EventStatus': status,
+        'LastAction': event.get('action'),
+        'UpdatedAt': event.get('timestamp'),
+        'events': {event['event_type']: {**details, 'status': status}},
+    }
+
+def fold_events(trade_id, events):
+    """Replay a trade's actions, oldest first, into its snapshot"""
+    snapshot = {'TradeID': trade_id, 'events': {}}
+    for event in sorted(events, key=lambda e: e.get('timestamp') or ''):
+        if not event.get('event_type'):
+            continue
+        update = snapshot_update({**event, 'trade_id': trade_id})
+        snapshot.update({k: v for k, v in update.items() if k != 'events'})
+        snapshot['events'].update(update['events'])
+    snapshot['EventCount'] = len(events)
+    return snapshot
+
+class LifecycleEventLog:
+    """
+    Approvals, coupon payments and redemptions as an append-only log in
+    fx_lifecycle, with the current state of each trade in one
+    fx_lifecycle_snapshots document.
+
+    An action is appended and folded into its trade's snapshot in the same
+    batch, so reading the state is a single document fetch. compact()
+    periodically replays the log of every trade with new actions and rewrites
+    its snapshot, which also backfills snapshots for actions logged before
+    snapshots existed. The log itself is never rewritten, so the full history
+    stays available for audit.
+    """
+
+    def __init__(self, firestore_db=None):
+        self._db = firestore_db
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = get_firestore_client()
+        return self._db
+
+    def append(self, trade_id, event_type, action, **details):
+        """Record one action and update the trade's snapshot; returns the event id"""
+        timestamp = datetime.utcnow().isoformat()
+        # Log entries keep only trade_id: readers of fx_lifecycle key its scheduled
+        # and uploaded event documents by TradeID and must not pick these up
+        event = {
+            'trade_id': trade_id,
+            'event_type': event_type,
+            'action': action,
+            'timestamp': timestamp,
+            **details,
+        }
+        # Ids sort by trade and then time, so the log reads in order per trade
+        event_id = f"{trade_id}_{timestamp.replace(':', '').replace('-', '').replace('.', '')}_{uuid.uuid4().hex[:8]}"
+        batch = self.db.batch()
+        batch.set(self.db.collection(EVENT_LOG_COLLECTION).document(event_id), event)
+        update = snapshot_update({**event, 'id': event_id})
+        # Merging on explicit paths replaces events.<type> as a whole, so keys of earlier actions do not linger
+        merge_fields = [key for key in update if key != 'events'] + [f"events.{field_path(event_type)}"]
+        batch.set(self.db.collection(SNAPSHOT_COLLECTION).document(str(trade_id)), update, merge=merge_fields)
+        batch.commit()
+        return event_id
+
+    def state(self, trade_id):
+        """Current lifecycle state of a trade, or None if it has no recorded actions"""
+        doc = self.db.collection(SNAPSHOT_COLLECTION).document(str(trade_id)).get()
+        return doc.to_dict() if doc.exists else None
+
+    def history(self, trade_id):
+        """Every action recorded for a trade, oldest first"""
+        docs = self.db.collection(EVENT_LOG_COLLECTION).where('trade_id', '==', trade_id).stream()
+        events = [{'id': doc.id, **doc.to_dict()} for doc in docs]
+        return sorted(events, key=lambda e: e.get('timestamp') or '')
+
+    def compact(self):
+        """Rebuild the snapshot of every trade with actions since the last compaction; returns how many were rewritten"""
+        watermark = lifecycle_store.get(COMPACTION_NAMESPACE, EVENT_LOG_COLLECTION, '')
+        # Only action entries carry 'timestamp'; scheduled and uploaded event documents are skipped
+        query = self.db.collection(EVENT_LOG_COLLECTION).where('timestamp', '>', watermark).order_by('timestamp')
+        touched = set()
+        latest = watermark
+        for doc in query.stream():
+            event = doc.to_dict()
+            if event.get('trade_id'):
+                touched.add(event['trade_id'])
+            latest = max(latest, event.get('timestamp') or '')
+        if not touched:
+            return 0
+        compacted_at = datetime.utcnow().isoformat()
+        writer = BatchWriter(self.db)
+        for trade_id in touched:
+            history = self.history(trade_id)
+            snapshot = fold_events(trade_id, history)
+            snapshot['CompactedAt'] = compacted_at
+            snapshot['CompactedThrough'] = history[-1].get('timestamp') if history else None
+            writer.set(SNAPSHOT_COLLECTION, str(trade_id), snapshot, ref=trade_id)
+        errors = writer.flush()
+        if errors:
+            # Keep the watermark so the failed trades are retried next time
+            logger.warning(f"Could not compact {len(errors)} of {len(touched)} lifecycle snapshots")
+        else:
+            lifecycle_store.put(COMPACTION_NAMESPACE, EVENT_LOG_COLLECTION, latest)
+        logger.info(f"Compacted lifecycle snapshots for {len(touched) - len(errors)} trades")
+        return len(touched) - len(errors)
+
+lifecycle_event_log = LifecycleEventLog()
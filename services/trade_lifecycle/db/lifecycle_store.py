@@ -0,0 +1,199 @@
+import os
+import json
+import sqlite3
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+LIFECYCLE_DB_PATH = os.environ.get('LIFECYCLE_DB_PATH', 'lifecycle_state.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lifecycle_state (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    trade_id TEXT,
+    value TEXT NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now')),
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_lifecycle_state_trade ON lifecycle_state (namespace, trade_id);
+CREATE TABLE IF NOT EXISTS lifecycle_imports (
+    namespace TEXT PRIMARY KEY,
+    source TEXT NOT NULL
+);
+"""
+
+class LifecycleStore:
+    """
+    Transactional key/value store for lifecycle approvals, payments and
+    redemptions, backed by SQLite in WAL mode.
+
+    Every write is a single-row upsert committed in its own transaction, so
+    concurrent uvicorn workers no longer overwrite each other's JSON files and
+    readers always see a consistent snapshot.
+    """
+
+    def __init__(self, db_path=LIFECYCLE_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=30000')
+            self._local.conn = conn
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(SCHEMA)
+                    self._initialized = True
+        return conn
+
+    def get(self, namespace, key, default=None):
+        row = self._connect().execute(
+            'SELECT value FROM lifecycle_state WHERE namespace = ? AND key = ?',
+            (namespace, str(key))
+        ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def get_many(self, namespace, keys):
+        """Fetch several keys in one read, returning {key: value} for those present"""
+        keys = [str(k) for k in keys]
+        result = {}
+        conn = self._connect()
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f'SELECT key, value FROM lifecycle_state WHERE namespace = ? AND key IN ({placeholders})',
+                [namespace, *chunk]
+            ).fetchall()
+            result.update({key: json.loads(value) for key, value in rows})
+        return result
+
+    def items(self, namespace):
+        rows = self._connect().execute(
+            'SELECT key, value FROM lifecycle_state WHERE namespace = ?',
+            (namespace,)
+        ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def find_by_trade(self, namespace, trade_id):
+        rows = self._connect().execute(
+            'SELECT key, value FROM lifecycle_state WHERE namespace = ? AND trade_id = ?',
+            (namespace, str(trade_id))
+        ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def put(self, namespace, key, value, trade_id=None):
+        self._connect().execute(
+            """
+            INSERT INTO lifecycle_state (namespace, key, trade_id, value)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (namespace, key) DO UPDATE SET
+                trade_id = excluded.trade_id,
+                value = excluded.value,
+                updated_at = strftime('%Y-%m-%dT%H:%M:%f', 'now')
+            """,
+            (namespace, str(key), None if trade_id is None else str(trade_id), json.dumps(value))
+        )
+
+    def put_many(self, namespace, values, trade_id_for=None):
+        """Upsert {key: value} in a single transaction"""
+        rows = [
+            (namespace, str(key), None if trade_id_for is None else str(trade_id_for(key)), json.dumps(value))
+            for key, value in values.items()
+        ]
+        if not rows:
+            return
+        conn = self._connect()
+        conn.execute('BEGIN')
+        try:
+            conn.executemany(
+                """
+                INSERT INTO lifecycle_state (namespace, key, trade_id, value)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (namespace, key) DO UPDATE SET
+                    trade_id = excluded.trade_id,
+                    value = excluded.value,
+                    updated_at = strftime('%Y-%m-%dT%H:%M:%f', 'now')
+                """,
+                rows
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def delete_namespace(self, namespace):
+        self._connect().execute('DELETE FROM lifecycle_state WHERE namespace = ?', (namespace,))
+
+    def put_if_absent(self, namespace, key, value, trade_id=None):
+        """Insert key only if it does not exist yet; returns True when this call inserted it"""
+        cursor = self._connect().execute(
+            'INSERT OR IGNORE INTO lifecycle_state (namespace, key, trade_id, value) VALUES (?, ?, ?, ?)',
+            (namespace, str(key), None if trade_id is None else str(trade_id), json.dumps(value))
+        )
+        return cursor.rowcount == 1
+
+    def replace_if(self, namespace, key, expected, value):
+        """Overwrite key only if it still holds expected (as last read); returns True on success"""
+        cursor = self._connect().execute(
+            """
+            UPDATE lifecycle_state SET value = ?, updated_at = strftime('%Y-%m-%dT%H:%M:%f', 'now')
+            WHERE namespace = ? AND key = ? AND value = ?
+            """,
+            (json.dumps(value), namespace, str(key), json.dumps(expected))
+        )
+        return cursor.rowcount == 1
+
+    def import_json(self, namespace, path, trade_id_for=None):
+        """
+        One-time import of a legacy JSON state file into namespace.
+
+        The import is recorded in lifecycle_imports inside the same transaction,
+        so only the first worker to start performs it.
+        """
+        if not os.path.exists(path):
+            return 0
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            done = conn.execute(
+                'SELECT 1 FROM lifecycle_imports WHERE namespace = ?', (namespace,)
+            ).fetchone()
+            if done:
+                conn.execute('COMMIT')
+                return 0
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+            except (ValueError, OSError) as e:
+                logger.warning(f"Could not import {path} into {namespace}: {e}")
+                data = {}
+            if not isinstance(data, dict):
+                data = {}
+            for key, value in data.items():
+                trade_id = trade_id_for(key, value) if trade_id_for else key
+                conn.execute(
+                    'INSERT OR IGNORE INTO lifecycle_state (namespace, key, trade_id, value) VALUES (?, ?, ?, ?)',
+                    (namespace, str(key), None if trade_id is None else str(trade_id), json.dumps(value))
+                )
+            conn.execute(
+                'INSERT INTO lifecycle_imports (namespace, source) VALUES (?, ?)',
+                (namespace, os.path.abspath(path))
+            )
+            conn.execute('COMMIT')
+            return len(data)
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+lifecycle_store = LifecycleStore()
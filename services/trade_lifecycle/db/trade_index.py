@@ -0,0 +1,96 @@
+import os
+import threading
+import pandas as pd
+
+TRADE_ID_COLUMNS = ('Trade ID', 'TradeID')
+
+def _file_signature(filename):
+    stat = os.stat(filename)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _trade_id_column(columns):
+    for col in TRADE_ID_COLUMNS:
+        if col in columns:
+            return col
+    return None
+
+class TradeIndex:
+    """
+    Trade ID -> row lookup kept alongside the filtered_trades event partitions.
+
+    Each partition CSV is indexed once and re-read only when its mtime/size
+    changes, so other workers rewriting a partition are picked up on the
+    next lookup without a full scan per request.
+    """
+
+    def __init__(self):
+        self._partitions = {}
+        self._lock = threading.Lock()
+
+    def index_frame(self, filename, df):
+        """Index a partition that has just been written to filename"""
+        df = df.copy()
+        df.columns = df.columns.str.strip()
+        entry = self._build_entry(df)
+        with self._lock:
+            self._partitions[os.path.abspath(filename)] = (_file_signature(filename), entry)
+        return entry
+
+    def _build_entry(self, df):
+        columns = list(df.columns)
+        rows = df.to_dict(orient='records')
+        id_col = _trade_id_column(columns)
+        by_id = {}
+        if id_col:
+            for row in rows:
+                trade_id = str(row.get(id_col, '')).strip()
+                # Keep the first occurrence, matching the old linear scans
+                if trade_id and trade_id not in by_id:
+                    by_id[trade_id] = row
+        return {'columns': columns, 'rows': rows, 'by_id': by_id}
+
+    def _get_entry(self, filename):
+        key = os.path.abspath(filename)
+        if not os.path.exists(filename):
+            with self._lock:
+                self._partitions.pop(key, None)
+            return None
+        signature = _file_signature(filename)
+        with self._lock:
+            cached = self._partitions.get(key)
+        if cached and cached[0] == signature:
+            return cached[1]
+        df = pd.read_csv(filename)
+        df.columns = df.columns.str.strip()
+        entry = self._build_entry(df)
+        with self._lock:
+            self._partitions[key] = (signature, entry)
+        return entry
+
+    def get_columns(self, filename):
+        entry = self._get_entry(filename)
+        return list(entry['columns']) if entry else []
+
+    def get_rows(self, filename):
+        """Return copies of every row in the partition, in file order"""
+        entry = self._get_entry(filename)
+        if not entry:
+            return []
+        return [dict(row) for row in entry['rows']]
+
+    def get_trade(self, filename, trade_id):
+        """Return a copy of the row for trade_id, or None"""
+        entry = self._get_entry(filename)
+        if not entry:
+            return None
+        row = entry['by_id'].get(str(trade_id).strip())
+        return dict(row) if row is not None else None
+
+    def invalidate(self, filename=None):
+        with self._lock:
+            if filename is None:
+                self._partitions.clear()
+            else:
+                self._partitions.pop(os.path.abspath(filename), None)
+
+trade_index = TradeIndex()
@@ -1,5 +1,19 @@
 import pandas as pd
 import os
+import uuid
+from services.trade_lifecycle.db.trade_index import trade_index
+
+EVENTS = ['Early-Redemption', 'Barrier-Monitoring', 'Coupon Rate', 'Maturity']
+
+# Uploads are read this many rows at a time, so memory is bounded by the chunk, not the file
+UPLOAD_CHUNK_ROWS = int(os.environ.get('LIFECYCLE_UPLOAD_CHUNK_ROWS', '50000'))
+
+# Identifier and category columns are always read as text, so every chunk of
+# an upload gets the same dtype regardless of which values it happens to hold
+TEXT_COLUMNS = [
+    'Trade ID', 'TradeID', 'Order ID', 'Client ID', 'ISIN', 'Symbol', 'Trade Type', 'TradeType',
+    'TraderID', 'Counterparty', 'CurrencyPair', 'BuySell', 'Currency', 'event_type'
+]
 
 def load_trades(file_path):
     ext = os.path.splitext(file_path)[1]
@@ -10,22 +24,116 @@ def load_trades(file_path):
     else:
         raise ValueError("Unsupported file type")
 
+def _text_dtypes(columns):
+    return {col: str for col in columns if str(col).strip() in TEXT_COLUMNS}
+
+def _with_text_columns(df):
+    # Excel cells keep their native types, so cast the text columns by hand
+    for col in _text_dtypes(df.columns):
+        df[col] = df[col].map(lambda v: v if pd.isna(v) else str(v))
+    return df
+
+def _excel_frame(rows, columns):
+    return _with_text_columns(pd.DataFrame.from_records(rows, columns=columns))
+
+def _iter_excel_chunks(file_path, chunksize):
+    from openpyxl import load_workbook
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            yield pd.DataFrame()
+            return
+        columns = [str(col) if col is not None else f"Unnamed: {i}" for i, col in enumerate(header)]
+        batch = []
+        yielded = False
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            batch.append(row[:len(columns)])
+            if len(batch) >= chunksize:
+                yield _excel_frame(batch, columns)
+                yielded = True
+                batch = []
+        if batch or not yielded:
+            yield _excel_frame(batch, columns)
+    finally:
+        workbook.close()
+
+def iter_trade_chunks(file_path, chunksize=UPLOAD_CHUNK_ROWS):
+    """
+    Yield the trades in file_path as DataFrames of at most chunksize rows.
+    At least one (possibly empty) frame is yielded so callers always see the columns.
+    """
+    ext = os.path.splitext(file_path)[1]
+    if ext == '.csv':
+        columns = pd.read_csv(file_path, nrows=0).columns
+        yielded = False
+        for chunk in pd.read_csv(file_path, chunksize=chunksize, dtype=_text_dtypes(columns)):
+            yielded = True
+            yield chunk
+        if not yielded:
+            yield pd.DataFrame(columns=columns)
+    elif ext == '.xlsx':
+        yield from _iter_excel_chunks(file_path, chunksize)
+    elif ext == '.xls':
+        # The legacy .xls reader has no streaming mode; read it once and slice
+        df = _with_text_columns(pd.read_excel(file_path))
+        for start in range(0, max(len(df), 1), chunksize):
+            yield df.iloc[start:start + chunksize]
+    else:
+        raise ValueError("Unsupported file type")
+
 def filter_trades_by_event(df, event_column='event_type'):
-    import pandas as pd
-    events = ['Early-Redemption', 'Barrier-Monitoring', 'Coupon Rate', 'Maturity']
-    filtered = {event: pd.DataFrame(columns=df.columns) for event in events}
-    for idx, row in df.iterrows():
-        event = row.get(event_column, '')
-        if pd.isna(event) or not str(event).strip():
-            event = 'Maturity'
-        else:
-            event = str(event).strip()
-        if event in filtered:
-            filtered[event] = pd.concat([filtered[event], pd.DataFrame([row])], ignore_index=True)
-    return filtered
+    if event_column in df.columns:
+        labels = df[event_column].fillna('').astype(str).str.strip()
+    else:
+        labels = pd.Series('', index=df.index)
+    # Rows without an event are treated as Maturity
+    labels = labels.where(labels != '', 'Maturity')
+    return {event: df[labels == event].reset_index(drop=True) for event in EVENTS}
+
+def partition_path(event, output_dir='filtered_trades'):
+    return os.path.join(output_dir, f"{event.replace(' ', '_')}.csv")
 
 def save_filtered_trades(filtered, output_dir='filtered_trades'):
     os.makedirs(output_dir, exist_ok=True)
     for event, trades in filtered.items():
-        trades.to_csv(os.path.join(output_dir, f"{event.replace(' ', '_')}.csv"), index=False) 
+        path = partition_path(event, output_dir)
+        trades.to_csv(path, index=False)
+        # Keep the Trade ID index in step with the partition just written
+        trade_index.index_frame(path, trades)
+
+class StagedCsvWriter:
+    """
+    Appends DataFrame chunks to temporary copies of CSV files and swaps them
+    into place together on commit(), so readers never see a half-written upload.
+    """
+
+    def __init__(self):
+        self._staged = {}
+
+    def write(self, path, df):
+        staged = self._staged.get(path)
+        if staged is None:
+            directory, name = os.path.split(path)
+            os.makedirs(directory or '.', exist_ok=True)
+            staged = os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+            self._staged[path] = staged
+            df.to_csv(staged, index=False)
+        else:
+            df.to_csv(staged, mode='a', header=False, index=False)
+
+    def commit(self):
+        for path, staged in self._staged.items():
+            os.replace(staged, path)
+            # The partition index re-reads the file on its next lookup
+            trade_index.invalidate(path)
+        self._staged = {}
 
+    def discard(self):
+        for staged in self._staged.values():
+            if os.path.exists(staged):
+                os.remove(staged)
+        self._staged = {}
@@ -0,0 +1,190 @@
+import os
+import time
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from services.firebase_client import get_firestore_client
+from services.firestore_batch import BatchWriter
+from services.trade_lifecycle.db.lifecycle_store import lifecycle_store
+from services.trade_lifecycle.db.event_calendar import event_calendar
+from services.trade_lifecycle.db.lifecycle_events import lifecycle_event_log
+# Importing the event modules registers their partitions with the calendar
+from services.trade_lifecycle.core import maturity_logic, coupon_logic, early_redemption_logic, barrier_logic  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+# Kept apart from fx_lifecycle, whose {TradeID}_{EventType} documents carry the approval status
+DUE_EVENTS_COLLECTION = 'fx_lifecycle_due'
+CHECKPOINT_NAMESPACE = 'event_checkpoints'
+
+SCHEDULER_ENABLED = os.environ.get('LIFECYCLE_SCHEDULER_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+# Seconds between runs; daily by default
+SCHEDULER_INTERVAL = int(os.environ.get('LIFECYCLE_SCHEDULER_INTERVAL_SECONDS', '86400'))
+# Days before today that are (re)checked on each run, so downtime is caught up
+SCHEDULER_CATCHUP_DAYS = int(os.environ.get('LIFECYCLE_SCHEDULER_CATCHUP_DAYS', '3'))
+# fx_lifecycle snapshot compaction runs on its own timer, whether or not the scheduler does
+COMPACTION_ENABLED = os.environ.get('LIFECYCLE_COMPACTION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+COMPACTION_INTERVAL = int(os.environ.get('LIFECYCLE_COMPACTION_INTERVAL_SECONDS', '3600'))
+# A 'running' checkpoint older than this is assumed to belong to a dead worker
+CHECKPOINT_LEASE_SECONDS = int(os.environ.get('LIFECYCLE_CHECKPOINT_LEASE_SECONDS', '1800'))
+
+def checkpoint_key(day, event_type):
+    return f"{day.isoformat()}|{event_type}"
+
+def is_forex_event(event):
+    # Same test the upload pipeline uses for fx_lifecycle; calendar events only carry the trade ID
+    return event['trade_id'].upper().startswith('FX')
+
+def build_due_event_doc(event, materialized_at):
+    trade_id = event['trade_id']
+    return {
+        'TradeID': trade_id,
+        'EventType': event['event_type'],
+        'event_type': event['event_type'],
+        'EventDate': event['date'],
+        'EventStatus': 'Due',
+        'ApprovalStatus': 'Pending',
+        'Instrument': 'Forex',
+        'materialized_at': materialized_at,
+        'source': 'event_scheduler'
+    }
+
+class EventProcessor:
+    """
+    Materializes the calendar's due Forex events into fx_lifecycle_due, one
+    (date, event type) at a time.
+
+    Each pair is claimed and then checkpointed in the lifecycle store, so a
+    restart (or a second worker) skips what is already done and only resumes
+    pairs that never finished. Documents are keyed by trade, event and date,
+    so finishing an interrupted pair rewrites the same documents.
+    """
+
+    def __init__(self, firestore_db=None):
+        self._db = firestore_db
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = get_firestore_client()
+        return self._db
+
+    def _claim(self, key):
+        now = time.time()
+        claim = {'status': 'running', 'claimed_at': now}
+        if lifecycle_store.put_if_absent(CHECKPOINT_NAMESPACE, key, claim):
+            return True
+        current = lifecycle_store.get(CHECKPOINT_NAMESPACE, key)
+        if current and current.get('status') == 'running' and now - current.get('claimed_at', 0) > CHECKPOINT_LEASE_SECONDS:
+            logger.warning(f"Resuming stale event checkpoint {key}")
+            return lifecycle_store.replace_if(CHECKPOINT_NAMESPACE, key, current, claim)
+        return False
+
+    def process_day(self, day, event_type):
+        """Materialize one event type's events due on day; returns the checkpoint, or None if skipped"""
+        key = checkpoint_key(day, event_type)
+        if not self._claim(key):
+            return None
+        start = time.perf_counter()
+        events = [event for event in event_calendar.due_on(day, event_types={event_type}) if is_forex_event(event)]
+        writer = BatchWriter(self.db)
+        materialized_at = datetime.utcnow().isoformat()
+        for event in events:
+            doc_id = f"{event['trade_id']}_{event_type}_{event['date']}"
+            writer.set(DUE_EVENTS_COLLECTION, doc_id, build_due_event_doc(event, materialized_at), ref=event['trade_id'], merge=True)
+        errors = writer.flush()
+        checkpoint = {
+            'status': 'done' if not errors else 'failed',
+            'events': len(events),
+            'written': writer.written,
+            'errors': len(errors),
+            'seconds': round(time.perf_counter() - start, 3),
+            'finished_at': datetime.utcnow().isoformat()
+        }
+        if errors:
+            # Leave the pair claimable by the next run
+            lifecycle_store.put(CHECKPOINT_NAMESPACE, key, {**checkpoint, 'status': 'running', 'claimed_at': 0})
+            logger.warning(f"{event_type} on {day}: {len(errors)} of {len(events)} events could not be stored; will retry")
+        else:
+            lifecycle_store.put(CHECKPOINT_NAMESPACE, key, checkpoint)
+        logger.info(f"Processed {len(events)} {event_type} events due {day} in {checkpoint['seconds']}s")
+        return checkpoint
+
+    def run_once(self, today=None):
+        """Process today and the catch-up window; returns {date|event_type: checkpoint} for the pairs run here"""
+        today = today or date.today()
+        event_calendar.refresh()
+        processed = {}
+        for offset in range(SCHEDULER_CATCHUP_DAYS, -1, -1):
+            day = today - timedelta(days=offset)
+            for event_type in event_calendar.event_types():
+                try:
+                    checkpoint = self.process_day(day, event_type)
+                except Exception as e:
+                    logger.error(f"Event processing failed for {event_type} on {day}: {e}")
+                    lifecycle_store.put(CHECKPOINT_NAMESPACE, checkpoint_key(day, event_type), {'status': 'running', 'claimed_at': 0, 'error': str(e)})
+                    continue
+                if checkpoint is not None:
+                    processed[checkpoint_key(day, event_type)] = checkpoint
+        return processed
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Scheduled event processing failed: {e}")
+            self._stop.wait(SCHEDULER_INTERVAL)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='lifecycle-event-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def due_events(self, day, event_types=None):
+        """Forex events materialized as due on day, ordered by event type and trade"""
+        docs = self.db.collection(DUE_EVENTS_COLLECTION).where('EventDate', '==', day.isoformat()).stream()
+        events = [doc.to_dict() for doc in docs]
+        if event_types is not None:
+            events = [event for event in events if event.get('EventType') in event_types]
+        return sorted(events, key=lambda event: (event.get('EventType', ''), event.get('TradeID', '')))
+
+    def checkpoints(self, day):
+        """Checkpoint per registered event type for day (None where not yet processed)"""
+        keys = {event_type: checkpoint_key(day, event_type) for event_type in event_calendar.event_types()}
+        found = lifecycle_store.get_many(CHECKPOINT_NAMESPACE, keys.values())
+        return {event_type: found.get(key) for event_type, key in keys.items()}
+
+event_processor = EventProcessor()
+
+class SnapshotCompactor:
+    """Rebuilds the fx_lifecycle snapshots of recently changed trades every COMPACTION_INTERVAL seconds"""
+
+    def __init__(self, interval=COMPACTION_INTERVAL):
+        self.interval = interval
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                lifecycle_event_log.compact()
+            except Exception as e:
+                logger.error(f"Lifecycle snapshot compaction failed: {e}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='lifecycle-snapshot-compactor', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+snapshot_compactor = SnapshotCompactor()
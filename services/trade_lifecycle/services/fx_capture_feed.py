@@ -0,0 +1,100 @@
+import os
+import logging
+import threading
+from services.firebase_client import get_firestore_client
+from services.trade_lifecycle.db.event_calendar import event_calendar
+from services.trade_lifecycle.db.fx_capture_queries import fx_trade_range, query_fx_trades, TRADE_ID_FIELD
+from services.trade_lifecycle.core.maturity_logic import MATURITY_EVENT
+from services.trade_lifecycle.utils.datetime_utils import parse_date
+
+logger = logging.getLogger(__name__)
+
+FX_CALENDAR_ENABLED = os.environ.get('LIFECYCLE_FX_CALENDAR_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+MATURITY_DATE_FIELD = 'MaturityDate'
+
+def fx_maturity_dates(trade):
+    maturity_date = parse_date(trade.get(MATURITY_DATE_FIELD, ''))
+    return [maturity_date] if maturity_date else []
+
+class FxCaptureFeed:
+    """
+    Keeps the event calendar's Maturity events of captured Forex trades in
+    step with fx_capture.
+
+    Trades are captured by other services, so the calendar follows their
+    writes through a snapshot listener on the FX trade IDs: every trade that
+    is captured, amended or deleted is applied on its own with
+    set_trade()/remove_trade(). If the listener cannot be started the trades
+    are loaded once with a projected scan instead.
+    """
+
+    def __init__(self, firestore_db=None):
+        self._db = firestore_db
+        self._lock = threading.Lock()
+        self._trade_ids = {}
+        self._watch = None
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = get_firestore_client()
+        return self._db
+
+    def _apply(self, doc_id, trade):
+        trade_id = str(trade.get(TRADE_ID_FIELD) or doc_id).strip()
+        previous = self._trade_ids.get(doc_id)
+        if previous is not None and previous != trade_id:
+            event_calendar.remove_trade(MATURITY_EVENT, previous)
+        self._trade_ids[doc_id] = trade_id
+        event_calendar.set_trade(MATURITY_EVENT, trade_id, fx_maturity_dates(trade))
+
+    def _forget(self, doc_id):
+        trade_id = self._trade_ids.pop(doc_id, None)
+        if trade_id is not None:
+            event_calendar.remove_trade(MATURITY_EVENT, trade_id)
+
+    def _on_snapshot(self, docs, changes, read_time):
+        with self._lock:
+            for change in changes:
+                doc = change.document
+                if getattr(change.type, 'name', change.type) == 'REMOVED':
+                    self._forget(doc.id)
+                else:
+                    self._apply(doc.id, doc.to_dict() or {})
+
+    def load(self):
+        """Apply every captured FX trade and drop the ones no longer in fx_capture; returns how many were loaded"""
+        trades, _ = query_fx_trades(self.db, fields=[MATURITY_DATE_FIELD])
+        with self._lock:
+            seen = set()
+            for trade in trades:
+                doc_id = trade.get(TRADE_ID_FIELD)
+                seen.add(doc_id)
+                self._apply(doc_id, trade)
+            for doc_id in set(self._trade_ids) - seen:
+                self._forget(doc_id)
+        logger.info(f"Loaded {len(trades)} captured FX trades into the event calendar")
+        return len(trades)
+
+    def start(self):
+        if self._watch is not None:
+            return
+        try:
+            self._watch = fx_trade_range(self.db).on_snapshot(self._on_snapshot)
+        except Exception as e:
+            logger.warning(f"fx_capture listener unavailable, loading the captured FX trades once: {e}")
+            self._watch = None
+            try:
+                self.load()
+            except Exception as e:
+                logger.error(f"Could not load the captured FX trades into the event calendar: {e}")
+
+    def close(self):
+        if self._watch is not None:
+            try:
+                self._watch.unsubscribe()
+            except Exception as e:
+                logger.warning(f"Could not stop the fx_capture listener: {e}")
+            self._watch = None
+
+fx_capture_feed = FxCaptureFeed()
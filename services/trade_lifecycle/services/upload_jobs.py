@@ -0,0 +1,179 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from services.firebase_client import get_firestore_client
+from services.trade_lifecycle.db.lifecycle_store import lifecycle_store
+from services.trade_lifecycle.services.upload_pipeline import process_upload, UploadProgress
+
+logger = logging.getLogger(__name__)
+
+JOBS_NAMESPACE = 'upload_jobs'
+# At most this many uploads are processed at once; the rest wait on disk
+UPLOAD_JOB_WORKERS = int(os.environ.get('LIFECYCLE_UPLOAD_JOB_WORKERS', '2'))
+# Uploads beyond this many queued/running jobs are rejected
+UPLOAD_JOB_QUEUE_LIMIT = int(os.environ.get('LIFECYCLE_UPLOAD_JOB_QUEUE_LIMIT', '10'))
+# Keep at most this many error details on the job record
+MAX_JOB_ERRORS = 50
+# Minimum seconds between persisted row-progress updates
+PROGRESS_INTERVAL = 0.5
+
+class UploadQueueFull(Exception):
+    pass
+
+class _JobProgress(UploadProgress):
+    """Publishes upload progress to the job record in the lifecycle store"""
+
+    def __init__(self, manager, job_id):
+        super().__init__()
+        self.manager = manager
+        self.job_id = job_id
+        self._last_saved = 0.0
+
+    def changed(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_saved < PROGRESS_INTERVAL:
+            return
+        self._last_saved = now
+        self.manager._update(
+            self.job_id,
+            stages=dict(self.stages),
+            rows_total=self.rows_total,
+            rows_processed=self.rows_processed,
+            error_count=len(self.errors),
+        )
+
+def _worker_alive(pid):
+    # This process has not queued anything yet when it recovers, so its own PID
+    # on a record can only be a reused PID of a dead worker
+    if not pid or pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class UploadJobManager:
+    """
+    Runs lifecycle uploads in a bounded background pool.
+
+    Job records live in the lifecycle store so any worker can answer a
+    status poll, whichever worker accepted the upload.
+    """
+
+    def __init__(self, max_workers=UPLOAD_JOB_WORKERS, queue_limit=UPLOAD_JOB_QUEUE_LIMIT):
+        self.max_workers = max(1, max_workers)
+        self.queue_limit = max(self.max_workers, queue_limit)
+        self._executor = None
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='lifecycle-upload')
+        return self._executor
+
+    def _update(self, job_id, **fields):
+        record = lifecycle_store.get(JOBS_NAMESPACE, job_id) or {}
+        record.update(fields)
+        lifecycle_store.put(JOBS_NAMESPACE, job_id, record)
+        return record
+
+    def submit(self, file_location, filename):
+        """Queue a saved upload and return its job ID"""
+        with self._lock:
+            if self._active >= self.queue_limit:
+                raise UploadQueueFull(f"{self._active} uploads already queued or running")
+            self._active += 1
+        job_id = str(uuid.uuid4())
+        try:
+            lifecycle_store.put(JOBS_NAMESPACE, job_id, {
+                'job_id': job_id,
+                'filename': filename,
+                'status': 'queued',
+                'created_at': datetime.utcnow().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+                'rows_total': None,
+                'rows_processed': 0,
+                'stages': {},
+                'error_count': 0,
+                'errors': [],
+                'error': None,
+                # Lets recover_interrupted() tell jobs of a live worker from orphaned ones
+                'pid': os.getpid(),
+                'file_location': file_location,
+            })
+            self._pool().submit(self._run, job_id, file_location)
+        except Exception as e:
+            with self._lock:
+                self._active -= 1
+            if lifecycle_store.get(JOBS_NAMESPACE, job_id) is not None:
+                self._update(job_id, status='failed', finished_at=datetime.utcnow().isoformat(), error=str(e))
+            raise
+        return job_id
+
+    def recover_interrupted(self):
+        """
+        Fail the jobs left queued or running by a worker that is no longer
+        alive (e.g. before a restart) and remove their staged uploads.
+        Returns the IDs of the jobs that were failed.
+        """
+        recovered = []
+        for job_id, record in lifecycle_store.items(JOBS_NAMESPACE).items():
+            if record.get('status') not in ('queued', 'running') or _worker_alive(record.get('pid')):
+                continue
+            failed = dict(record, status='failed', finished_at=datetime.utcnow().isoformat(),
+                          error='Interrupted by a service restart')
+            # Another worker starting at the same time may have failed it already
+            if not lifecycle_store.replace_if(JOBS_NAMESPACE, job_id, record, failed):
+                continue
+            file_location = record.get('file_location')
+            if file_location and os.path.exists(file_location):
+                os.remove(file_location)
+            recovered.append(job_id)
+        if recovered:
+            logger.warning(f"Marked {len(recovered)} interrupted upload jobs as failed")
+        return recovered
+
+    def _run(self, job_id, file_location):
+        progress = _JobProgress(self, job_id)
+        self._update(job_id, status='running', started_at=datetime.utcnow().isoformat())
+        try:
+            result = process_upload(file_location, get_firestore_client(), progress=progress)
+            self._update(
+                job_id,
+                status='completed',
+                finished_at=datetime.utcnow().isoformat(),
+                stages=dict(progress.stages),
+                rows_total=progress.rows_total,
+                rows_processed=progress.rows_processed,
+                written=result['written'],
+                error_count=len(result['errors']),
+                errors=result['errors'][:MAX_JOB_ERRORS],
+            )
+        except Exception as e:
+            logger.error(f"Upload job {job_id} failed: {e}")
+            self._update(
+                job_id,
+                status='failed',
+                finished_at=datetime.utcnow().isoformat(),
+                stages=dict(progress.stages),
+                error=str(e),
+            )
+        finally:
+            if os.path.exists(file_location):
+                os.remove(file_location)
+            with self._lock:
+                self._active -= 1
+
+    def get(self, job_id):
+        return lifecycle_store.get(JOBS_NAMESPACE, job_id)
+
+upload_job_manager = UploadJobManager()
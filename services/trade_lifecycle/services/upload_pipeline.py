@@ -0,0 +1,219 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from services.firestore_batch import BatchWriter
+from services.equity_capture.db.trade_repository import trade_repository
+from services.forex_capture.db.forex_repository import forex_repository
+from shared.models import Trade
+from services.forex_capture.models import Forex
+from services.trade_lifecycle.core.maturity_forex_logic import MATURITY_FOREX_FILE
+from services.trade_lifecycle.db.event_calendar import event_calendar
+from services.trade_lifecycle.main import (
+    iter_trade_chunks, filter_trades_by_event, partition_path, StagedCsvWriter
+)
+
+logger = logging.getLogger(__name__)
+
+LIFECYCLE_COLLECTION = 'fx_lifecycle'
+VALID_EVENT_TYPES = ['Maturity', 'Coupon Rate', 'Early Redemption', 'Barrier Monitoring']
+
+# Full row dumps are only logged when explicitly asked for
+LOG_UPLOAD_ROWS = os.environ.get('LIFECYCLE_LOG_UPLOAD_ROWS', '').lower() in ('1', 'true', 'yes')
+UPLOAD_BATCH_SIZE = int(os.environ.get('LIFECYCLE_UPLOAD_BATCH_SIZE', '400'))
+UPLOAD_FLUSH_WORKERS = int(os.environ.get('LIFECYCLE_UPLOAD_FLUSH_WORKERS', '4'))
+
+# Partition files are shared by every upload; only one may rewrite them at a time
+_partition_lock = threading.Lock()
+
+class UploadProgress:
+    """Row counters and per-stage timings for one upload. Override changed() to publish them."""
+
+    def __init__(self):
+        self.stages = {}
+        self.rows_total = None
+        self.rows_processed = 0
+        self.errors = []
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage; entering the same stage again (once per chunk) adds to its total"""
+        start = time.perf_counter()
+        previous = self.stages.get(name, {}).get('seconds') or 0
+        self.stages[name] = {'status': 'running', 'seconds': previous}
+        self.changed(force=True)
+        try:
+            yield
+        except Exception:
+            self.stages[name] = {'status': 'failed', 'seconds': round(previous + time.perf_counter() - start, 3)}
+            self.changed(force=True)
+            raise
+        self.stages[name] = {'status': 'done', 'seconds': round(previous + time.perf_counter() - start, 3)}
+        self.changed(force=True)
+
+    def set_total(self, rows_total):
+        self.rows_total = rows_total
+        self.changed(force=True)
+
+    def advance(self, rows):
+        self.rows_processed += rows
+        self.changed()
+
+    def add_errors(self, errors):
+        self.errors.extend(errors)
+
+    def changed(self, force=False):
+        pass
+
+def new_batch_writer(firestore_db):
+    return BatchWriter(firestore_db, batch_size=UPLOAD_BATCH_SIZE, max_workers=UPLOAD_FLUSH_WORKERS)
+
+def build_lifecycle_doc(event, row, trade_id, uploaded_at):
+    # Only store the specific fields that are displayed in the lifecycle tab
+    return {
+        'TradeID': trade_id,
+        'CurrencyPair': row.get('CurrencyPair', ''),
+        'Symbol': row.get('Symbol', ''),
+        'EventType': event,
+        'event_type': event,
+        'EventDate': row.get('MaturityDate', row.get('SettlementDate', row.get('TradeDate', ''))),
+        'TradeDate': row.get('TradeDate', ''),
+        'EventStatus': 'Pending',  # Default status
+        'FXRate': row.get('FXRate', ''),
+        'NotionalAmount': row.get('NotionalAmount', ''),
+        'SettlementDate': row.get('SettlementDate', ''),
+        'BuySell': row.get('BuySell', ''),
+        'ApprovalStatus': 'Pending',  # Default status
+        'uploaded_at': uploaded_at
+    }
+
+def queue_row_writes(writer, event, row, uploaded_at=None):
+    """
+    Queue the Firestore writes for one uploaded row and return the per-row
+    errors raised while building its model (writes are reported on flush).
+    """
+    uploaded_at = uploaded_at or datetime.utcnow().isoformat()
+    trade_id = str(row.get('Trade ID', '') or row.get('TradeID', ''))
+    trade_type = row.get('Trade Type', '') or row.get('TradeType', '')
+    ref = trade_id or None
+
+    if LOG_UPLOAD_ROWS:
+        logger.debug(f"Processing row for trade {trade_id}: {row}")
+
+    # Only Forex trades with a valid event type go to fx_lifecycle
+    is_forex_trade = trade_id.upper().startswith('FX') or str(trade_type).upper() == 'FOREX'
+    event_type_normalized = event.replace('-', ' ').title()
+    is_valid_event = event_type_normalized in VALID_EVENT_TYPES
+
+    if is_forex_trade and is_valid_event:
+        lifecycle_doc_id = f"{trade_id}_{event}" if trade_id else str(uuid.uuid4())
+        writer.set(LIFECYCLE_COLLECTION, lifecycle_doc_id, build_lifecycle_doc(event, row, trade_id, uploaded_at), ref=ref)
+
+    # Build the capture model once and queue it for the matching repository
+    try:
+        if is_forex_trade:
+            forex = Forex(**{k.replace(' ', ''): v for k, v in row.items()})
+            writer.set(forex_repository.collection_name, forex.TradeID, forex.dict(by_alias=True), ref=ref)
+        else:
+            trade = Trade(**{k.replace(' ', '_'): v for k, v in row.items()})
+            writer.set(trade_repository.collection_name, trade.trade_id, trade.dict(by_alias=True), ref=ref)
+    except Exception as e:
+        kind = 'forex' if is_forex_trade else 'equity'
+        logger.warning(f"Could not build {kind} trade {trade_id}: {e}")
+        return [{"ref": ref, "collection": None, "doc_id": trade_id, "error": str(e)}]
+    return []
+
+class FirestoreFanOut:
+    """
+    Queues the Firestore writes for successive partition chunks and commits
+    them in batches whenever enough are pending, so only a bounded number of
+    writes is held in memory however large the upload is.
+    """
+
+    def __init__(self, firestore_db, progress=None):
+        self.writer = new_batch_writer(firestore_db)
+        self.progress = progress
+        self.uploaded_at = datetime.utcnow().isoformat()
+        self.errors = []
+        self._queued_rows = 0
+
+    def add(self, filtered):
+        for event, trades_df in filtered.items():
+            for row in trades_df.to_dict(orient="records"):
+                self.errors.extend(queue_row_writes(self.writer, event, row, self.uploaded_at))
+                self._queued_rows += 1
+                if self.writer.pending_count() >= self.writer.batch_size * self.writer.max_workers:
+                    self.flush()
+
+    def flush(self):
+        self.errors.extend(self.writer.flush())
+        if self.progress:
+            self.progress.advance(self._queued_rows)
+        self._queued_rows = 0
+
+    def finish(self):
+        """Commit the remaining writes and return {'written': int, 'errors': [...]}"""
+        self.flush()
+        for error in self.errors:
+            logger.warning(f"Could not store trade {error['ref']} in {error['collection']}: {error['error']}")
+        logger.info(f"Stored {self.writer.written} lifecycle upload documents in {self.writer.batches_committed} batches ({len(self.errors)} errors)")
+        return {'written': self.writer.written, 'errors': self.errors}
+
+def store_filtered_trades(filtered, firestore_db, progress=None):
+    """
+    Fan the event partitions out to Firestore in batched commits.
+
+    Returns {'written': int, 'errors': [...]} where each error names the
+    row (TradeID) and collection that could not be stored.
+    """
+    fan_out = FirestoreFanOut(firestore_db, progress=progress)
+    fan_out.add(filtered)
+    return fan_out.finish()
+
+def process_upload(file_location, firestore_db, progress=None):
+    """
+    Run the full lifecycle upload pipeline for a file already saved to disk.
+
+    The file is streamed in chunks: each chunk is split by event, appended to
+    staged copies of the partitions and Maturity_Forex.csv, and queued for
+    Firestore. The staged files replace the live ones once the whole file has
+    been processed. rows_total is known only after the last chunk has been
+    read. Returns the Firestore write result.
+    """
+    progress = progress or UploadProgress()
+    fan_out = FirestoreFanOut(firestore_db, progress=progress)
+    staged = StagedCsvWriter()
+    rows_total = 0
+    try:
+        chunks = iter_trade_chunks(file_location)
+        while True:
+            with progress.stage('read'):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            with progress.stage('partition'):
+                filtered = filter_trades_by_event(chunk, event_column='event_type')
+            rows_total += sum(len(trades) for trades in filtered.values())
+            with progress.stage('write_partitions'):
+                for event, trades in filtered.items():
+                    staged.write(partition_path(event), trades)
+                # Always overwrite Maturity_Forex.csv for testing
+                staged.write(MATURITY_FOREX_FILE, chunk)
+            with progress.stage('firestore'):
+                fan_out.add(filtered)
+        progress.set_total(rows_total)
+        with progress.stage('firestore'):
+            result = fan_out.finish()
+            progress.add_errors(result['errors'])
+        with progress.stage('commit_partitions'):
+            with _partition_lock:
+                staged.commit()
+        with progress.stage('event_calendar'):
+            event_calendar.refresh()
+    except Exception:
+        staged.discard()
+        raise
+    return result